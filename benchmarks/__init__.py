@@ -0,0 +1 @@
+# Benchmarks (repo root에서 `python -m benchmarks.<name>` 으로 실행)
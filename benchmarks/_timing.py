@@ -0,0 +1,58 @@
+"""벤치마크 공용 시간 측정/출력 도구"""
+
+import math
+import statistics
+import time
+from typing import Callable, List, Sequence
+
+
+def measure(fn: Callable[[], object], repeat: int) -> List[float]:
+    """fn을 repeat번 호출하고 호출별 소요 시간(밀리초) 리스트를 반환"""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q 분위수 (0 < q <= 1, 가장 가까운 순위 값; 빈 입력이면 0.0)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(max(math.ceil(len(ordered) * q), 1), len(ordered)) - 1]
+
+
+def report(
+    label: str,
+    latencies: Sequence[float],
+    width: int = 36,
+    precision: int = 3,
+    show_mean: bool = False,
+    show_max: bool = False
+) -> None:
+    """
+    지연 시간 요약 한 줄 출력 (p50/p99, 선택적으로 mean/max)
+
+    Args:
+        label: 측정 이름
+        latencies: 밀리초 단위 측정값
+        width: label 칸 너비
+        precision: 소수점 자릿수
+        show_mean: 평균도 출력
+        show_max: 최댓값도 출력
+    """
+    digits = precision + 7
+
+    def fmt(value: float) -> str:
+        return f"{value:{digits}.{precision}f}ms"
+
+    parts = []
+    if show_mean:
+        parts.append(f"mean={fmt(statistics.mean(latencies))}")
+    parts.append(f"p50={fmt(statistics.median(latencies))}")
+    parts.append(f"p99={fmt(percentile(latencies, 0.99))}")
+    if show_max:
+        parts.append(f"max={fmt(max(latencies))}")
+    print(f"  {label:<{width}} " + " ".join(parts))
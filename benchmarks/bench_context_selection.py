@@ -0,0 +1,96 @@
+"""ContextAssembler 메모리 선택 벤치마크 (insert(0) 루프 vs 배치 계산 vs TokenizedHistory)
+
+대화 기록 길이(1만 / 10만 / 100만 메시지)와 토큰 예산별로 "예산 안의 최근 메시지" 선택 시간을 비교합니다.
+- legacy: 최신 메시지부터 한 개씩 토큰 수를 세고 selected.insert(0, ...) (이전 구현)
+- list: 리스트를 받아 최신 메시지부터 배치로 세다가 예산을 넘으면 슬라이스 (현재 구현)
+- history: TokenizedHistory 누적합 이진 탐색 + 슬라이스 (메시지 추가 시 1회만 토큰화)
+그리고 TokenizedHistory에 한 턴(2개 메시지)을 추가하는 비용도 측정합니다.
+
+실행:
+    python -m benchmarks.bench_context_selection
+    python -m benchmarks.bench_context_selection --sizes 10000 100000 --budgets 4096 131072
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from benchmarks._timing import measure, report
+from src.prompt.context_assembler import ContextAssembler
+from src.prompt.token_budget import MESSAGE_OVERHEAD_TOKENS
+
+
+def _messages(n: int, seed: int = 42) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    words = ["안녕하세요", "오늘", "날씨", "hello", "weather", "question", "질문", "답변", "좋아요", "thanks"]
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"{i} " + " ".join(rng.choices(words, k=rng.randint(3, 30))),
+        }
+        for i in range(n)
+    ]
+
+
+def _legacy_select(assembler: ContextAssembler, memories: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+    selected = []
+    current_tokens = 0
+    for memory in reversed(memories):
+        memory_tokens = (
+            assembler._estimate_tokens(memory["content"]) + assembler._estimate_tokens(memory["role"])
+            + MESSAGE_OVERHEAD_TOKENS
+        )
+        if current_tokens + memory_tokens <= budget:
+            selected.insert(0, memory)
+            current_tokens += memory_tokens
+        else:
+            break
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ContextAssembler memory selection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--budgets", type=int, nargs="+", default=[4096, 131072])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    assembler = ContextAssembler()
+    for size in args.sizes:
+        memories = _messages(size)
+        started = time.perf_counter()
+        history = assembler.new_history(memories)
+        print(f"[{size:,} messages] TokenizedHistory build: {(time.perf_counter() - started) * 1000:,.1f}ms "
+              f"(total {history.total_tokens:,} tokens)")
+
+        for budget in args.budgets:
+            expected = _legacy_select(assembler, memories, budget)
+            assert assembler._select_memories_within_limit(memories, budget) == expected
+            assert assembler._select_memories_within_limit(history, budget) == expected
+            print(f"  budget={budget:,} → {len(expected):,} messages selected")
+            report("legacy (insert(0))", measure(lambda: _legacy_select(assembler, memories, budget), args.repeat),
+                   precision=4, show_max=True)
+            report("list (batched, slice)",
+                   measure(lambda: assembler._select_memories_within_limit(memories, budget), args.repeat),
+                   precision=4, show_max=True)
+            report("TokenizedHistory (bisect, slice)",
+                   measure(lambda: assembler._select_memories_within_limit(history, budget), args.repeat),
+                   precision=4, show_max=True)
+
+        turn = 0
+
+        def append_turn():
+            nonlocal turn
+            turn += 1
+            history.extend([
+                {"role": "user", "content": f"새 질문 {size} {turn}"},
+                {"role": "assistant", "content": f"새 답변 {size} {turn}"},
+            ])
+
+        report("TokenizedHistory.extend (1 turn)", measure(append_turn, args.repeat), precision=4, show_max=True)
+        print(f"  token counter cache: {assembler.token_counter.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""HTTP 연결 재사용 마이크로 벤치마크
+
+요청마다 새 TCP 연결을 여는 `requests.post` (기존 방식) 와
+커넥션 풀을 재사용하는 `OllamaProvider` (requests.Session) 의
+호출당 오버헤드를 로컬 스텁 서버로 비교합니다.
+
+스텁 서버는 즉시 응답하므로 측정값은 순수 HTTP/연결 오버헤드입니다.
+(step7은 한 턴에 LLM을 3번 호출하므로 턴당 오버헤드는 약 3배)
+
+실행 (Ollama 불필요):
+    python -m benchmarks.bench_http_session
+    python -m benchmarks.bench_http_session --calls 2000
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks._timing import measure, report
+from src.llm.ollama_provider import OllamaProvider
+
+
+class _StubOllamaHandler(BaseHTTPRequestHandler):
+    """/api/chat 형식으로 즉시 응답하는 스텁 (keep-alive 지원)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # 헤더/본문 분할 전송 시 Nagle + delayed ACK(~40ms) 지연 방지 (Ollama 서버와 동일)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps({"message": {"role": "assistant", "content": "ok"}, "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-call HTTP overhead: requests.post vs pooled Session")
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    server = _start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    messages = [{"role": "user", "content": "hello"}]
+
+    provider = OllamaProvider(base_url=base_url)
+    payload = provider._build_payload(messages, temperature=0.0)
+
+    def bare_post():
+        # 기존 방식: 호출마다 새 연결 (TCP handshake 포함)
+        r = requests.post(provider.chat_endpoint, json=payload, timeout=10)
+        r.raise_for_status()
+        r.json()
+
+    def pooled_generate():
+        provider.generate(messages, temperature=0.0)
+
+    # 워밍업
+    bare_post()
+    pooled_generate()
+
+    before = measure(bare_post, args.calls)
+    after = measure(pooled_generate, args.calls)
+
+    print(f"calls={args.calls} server={base_url}")
+    print("-" * 80)
+    report("before: requests.post (new conn)", before, width=34, show_mean=True)
+    report("after: OllamaProvider (Session)", after, width=34, show_mean=True)
+    saved = statistics.mean(before) - statistics.mean(after)
+    print("-" * 80)
+    print(f"saved per call: {saved:.3f}ms  (step7 3 calls/turn: {saved * 3:.3f}ms)")
+
+    provider.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
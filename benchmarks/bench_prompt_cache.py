@@ -0,0 +1,120 @@
+"""프롬프트 앞부분 재사용(KV 캐시) 벤치마크 (ContextAssembler stable_prefix)
+
+Ollama는 직전 요청과 프롬프트 앞부분이 같으면 그 부분의 평가(prompt eval)를 건너뜁니다.
+기존 조립 방식은 검색 결과를 첫 시스템 메시지에 붙이므로 검색 결과가 바뀌는 매 턴 프롬프트 전체를
+다시 평가하고, stable_prefix는 시스템 프롬프트 + 이전 대화 기록을 그대로 두고 검색 결과를 뒤에 붙입니다.
+
+같은 대화(턴마다 다른 검색 결과)를 두 방식으로 진행하며 generate_result()의
+prompt_tokens(= prompt_eval_count, 실제로 평가한 프롬프트 토큰 수) / prompt_eval_ms를 턴별로 기록하고
+턴당 절약된 프롬프트 평가 시간을 보고합니다. (첫 턴은 캐시가 비어 있으므로 평균에서 제외)
+
+실행 (Ollama 서버 필요):
+    python -m benchmarks.bench_prompt_cache
+    python -m benchmarks.bench_prompt_cache --model llama3 --turns 12 --num-ctx 8192 --keep-alive 30m
+"""
+
+import argparse
+import statistics
+from typing import Dict, List
+
+from src.llm.generation_metrics import aggregate_generations, format_generation_report
+from src.llm.ollama_provider import OllamaProvider
+from src.prompt.context_assembler import ContextAssembler
+
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant for a Korean travel agency. "
+    "Answer in Korean, cite the search results when they are relevant, and keep answers short.\n"
+    + "\n".join(f"- Rule {i}: 예약/환불/일정 변경 문의는 고객 등급과 출발일 기준으로 안내합니다." for i in range(1, 31))
+)
+
+QUESTIONS = [
+    "제주도 3박 4일 일정 추천해줘",
+    "그 중에 비 오는 날 갈 만한 곳은?",
+    "렌터카 없이 이동할 수 있어?",
+    "숙소는 어느 지역이 좋아?",
+    "예산은 얼마 정도 잡아야 해?",
+    "아이랑 같이 가면 바뀌는 게 있을까?",
+    "환불 규정도 알려줘",
+    "출발 전날 일정 변경이 가능해?",
+]
+
+
+def _search_results(turn: int) -> str:
+    # 턴마다 내용이 바뀌는 검색 결과 (실제 검색/DB 조회 결과 대신)
+    return "\n".join(
+        f"[{turn}-{i}] 제주 여행 정보 {turn * 10 + i}: 관광지, 교통편, 숙소 가격과 운영 시간 안내 문서입니다."
+        for i in range(8)
+    )
+
+
+def _run(provider: OllamaProvider, stable_prefix: bool, args) -> List[Dict]:
+    assembler = ContextAssembler(
+        system_prompt_template=SYSTEM_PROMPT,
+        max_tokens=args.num_ctx,
+        reserved_output_tokens=args.max_output,
+        stable_prefix=stable_prefix
+    )
+    history = assembler.new_history()
+    turns = []
+    for turn in range(args.turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        messages = assembler.build_context(history, question, search_results=_search_results(turn))
+        result = provider.generate_result(
+            messages,
+            temperature=0.0,
+            max_tokens=args.max_output,
+            options={"seed": 0}
+        )
+        turns.append(result.to_metadata())
+        history.extend([
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": result.text},
+        ])
+        print(f"  turn {turn + 1:2d}: prompt_eval={result.prompt_tokens or 0:5d} tokens "
+              f"{result.prompt_eval_ms or 0:8.1f}ms total={result.total_ms or 0:8.1f}ms")
+    return turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt prefix reuse benchmark (stable_prefix)")
+    parser.add_argument("--base-url", default="http://localhost:11434")
+    parser.add_argument("--model", default="llama3")
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--num-ctx", type=int, default=8192)
+    parser.add_argument("--max-output", type=int, default=128)
+    parser.add_argument("--keep-alive", default="10m")
+    args = parser.parse_args()
+
+    provider = OllamaProvider(
+        base_url=args.base_url,
+        model=args.model,
+        keep_alive=args.keep_alive,
+        num_ctx=args.num_ctx
+    )
+
+    results = {}
+    for label, stable_prefix in (("search in system prompt", False), ("stable_prefix", True)):
+        # 방식마다 모델을 다시 올려 이전 방식의 KV 캐시가 섞이지 않게 함
+        provider.unload()
+        provider.load()
+        print(f"[{label}]")
+        results[label] = _run(provider, stable_prefix, args)
+
+    print("-" * 60)
+    means = {}
+    for label, turns in results.items():
+        rest = turns[1:] or turns
+        means[label] = statistics.mean(t.get("prompt_eval_ms", 0.0) for t in rest)
+        print(f"{label:<26} prompt_eval/turn={means[label]:8.1f}ms "
+              f"tokens/turn={statistics.mean(t.get('prompt_tokens', 0) for t in rest):7.1f} (turn 2+)")
+    saved = means["search in system prompt"] - means["stable_prefix"]
+    print(f"prompt eval saved per turn: {saved:.1f}ms")
+    print("-" * 60)
+    for label, turns in results.items():
+        print(f"[{label}]")
+        print(format_generation_report(aggregate_generations(turns)))
+
+
+if __name__ == "__main__":
+    main()
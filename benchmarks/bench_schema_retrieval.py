@@ -0,0 +1,181 @@
+"""Schema Retriever 벤치마크 (프롬프트 토큰 절감 + 정확도)
+
+고정 fixture(가상의 웨어하우스 스키마 + 질문/정답 테이블)로
+전체 스키마를 넣는 방식과 SchemaRetriever로 줄인 스키마를 비교합니다.
+
+- tokens: SQL 생성 프롬프트에 들어가는 스키마 토큰 (추정치)
+- table recall: 정답 SQL에 필요한 테이블이 모두 프롬프트에 포함된 비율
+- (--llm) SQL accuracy: Ollama로 SQL을 생성해 안전성 검사 통과 + 필요한 테이블을 모두 참조한 비율
+
+실행:
+    python -m benchmarks.bench_schema_retrieval
+    python -m benchmarks.bench_schema_retrieval --llm --model llama3   # Ollama 필요
+"""
+
+import argparse
+import re
+from typing import Dict, List, Tuple
+
+from src.tools.db_query_tool import extract_first_sql_statement, is_safe_select_sql
+from src.tools.schema_catalog import ColumnInfo, SchemaCatalog, TableInfo
+from src.tools.schema_retriever import SchemaRetriever
+
+
+def _col(name: str, data_type: str = "integer", pk: bool = False, ref: str = None, desc: str = None) -> ColumnInfo:
+    return ColumnInfo(name=name, data_type=data_type, is_primary_key=pk, references=ref, description=desc)
+
+
+def _fixture_catalog() -> SchemaCatalog:
+    tables: List[TableInfo] = [
+        TableInfo("users", [
+            _col("id", pk=True), _col("name", "text", desc="이름"), _col("email", "text", desc="이메일"),
+            _col("score", desc="성적 점수"), _col("created_at", "timestamp", desc="가입일"),
+        ], description="가입자 회원 사용자"),
+        TableInfo("orders", [
+            _col("id", pk=True), _col("user_id", ref="users.id"), _col("total_amount", "numeric", desc="주문 금액"),
+            _col("status", "text", desc="주문 상태"), _col("ordered_at", "timestamp", desc="주문일"),
+        ], description="주문"),
+        TableInfo("order_items", [
+            _col("id", pk=True), _col("order_id", ref="orders.id"), _col("product_id", ref="products.id"),
+            _col("quantity", desc="수량"), _col("unit_price", "numeric", desc="단가"),
+        ], description="주문 상품 항목"),
+        TableInfo("products", [
+            _col("id", pk=True), _col("name", "text", desc="상품명"), _col("category_id", ref="categories.id"),
+            _col("price", "numeric", desc="가격"),
+        ], description="상품"),
+        TableInfo("categories", [_col("id", pk=True), _col("name", "text", desc="카테고리명")], description="상품 카테고리"),
+        TableInfo("subscriptions", [
+            _col("id", pk=True), _col("user_id", ref="users.id"), _col("plan_id", ref="plans.id"),
+            _col("started_at", "timestamp"), _col("canceled_at", "timestamp", desc="해지일"),
+        ], description="서비스 구독 가입"),
+        TableInfo("plans", [_col("id", pk=True), _col("name", "text"), _col("monthly_fee", "numeric", desc="월 요금")], description="요금제"),
+        TableInfo("payments", [
+            _col("id", pk=True), _col("order_id", ref="orders.id"), _col("amount", "numeric", desc="결제 금액"),
+            _col("method", "text", desc="결제 수단"), _col("paid_at", "timestamp", desc="결제일"),
+        ], description="결제"),
+        TableInfo("refunds", [_col("id", pk=True), _col("payment_id", ref="payments.id"), _col("amount", "numeric"), _col("reason", "text")], description="환불"),
+        TableInfo("reviews", [
+            _col("id", pk=True), _col("product_id", ref="products.id"), _col("user_id", ref="users.id"),
+            _col("rating", desc="별점 평점"), _col("body", "text"),
+        ], description="상품 리뷰 후기"),
+        TableInfo("warehouses", [_col("id", pk=True), _col("name", "text"), _col("region", "text", desc="지역")], description="물류 창고"),
+        TableInfo("inventory", [
+            _col("id", pk=True), _col("warehouse_id", ref="warehouses.id"), _col("product_id", ref="products.id"),
+            _col("stock", desc="재고 수량"),
+        ], description="재고"),
+        TableInfo("shipments", [
+            _col("id", pk=True), _col("order_id", ref="orders.id"), _col("warehouse_id", ref="warehouses.id"),
+            _col("shipped_at", "timestamp", desc="출고일"), _col("carrier", "text", desc="택배사"),
+        ], description="배송 출고"),
+        TableInfo("coupons", [_col("id", pk=True), _col("code", "text"), _col("discount_rate", "numeric", desc="할인율")], description="쿠폰 할인"),
+        TableInfo("coupon_redemptions", [
+            _col("id", pk=True), _col("coupon_id", ref="coupons.id"), _col("order_id", ref="orders.id"),
+        ], description="쿠폰 사용 내역"),
+        TableInfo("support_tickets", [
+            _col("id", pk=True), _col("user_id", ref="users.id"), _col("subject", "text"),
+            _col("status", "text"), _col("opened_at", "timestamp"),
+        ], description="고객 문의 상담 티켓"),
+        TableInfo("employees", [_col("id", pk=True), _col("name", "text"), _col("department_id", ref="departments.id"), _col("salary", "numeric", desc="급여 연봉")], description="직원"),
+        TableInfo("departments", [_col("id", pk=True), _col("name", "text", desc="부서명")], description="부서"),
+        TableInfo("page_views", [_col("id", pk=True), _col("user_id", ref="users.id"), _col("path", "text"), _col("viewed_at", "timestamp")], description="웹 페이지 조회 로그"),
+        TableInfo("login_events", [_col("id", pk=True), _col("user_id", ref="users.id"), _col("ip", "text"), _col("logged_at", "timestamp", desc="로그인 시각")], description="로그인 기록"),
+    ]
+    # 무관한 테이블을 추가해 실제 웨어하우스 규모(60 테이블)에 맞춤
+    for i in range(40):
+        tables.append(TableInfo(
+            f"etl_staging_{i:02d}",
+            [_col("id", pk=True)] + [_col(f"raw_field_{j:02d}", "text") for j in range(20)],
+            description="ETL 적재 임시 테이블",
+        ))
+    return SchemaCatalog(schema="public", tables=tables)
+
+
+# (질문, 필요한 테이블)
+_QUESTIONS: List[Tuple[str, List[str]]] = [
+    ("성적이 80점 아래인 사람들 조회해", ["users"]),
+    ("users 중 score가 90 이상인 사람", ["users"]),
+    ("서비스 구독 가입 수 알려줘", ["subscriptions"]),
+    ("요금제별 구독자 수", ["subscriptions", "plans"]),
+    ("가장 많이 주문한 회원 5명", ["orders", "users"]),
+    ("카테고리별 상품 개수", ["products", "categories"]),
+    ("별점 평균이 가장 높은 상품", ["reviews", "products"]),
+    ("창고별 재고 합계", ["inventory", "warehouses"]),
+    ("지난달 환불 금액 합계", ["refunds"]),
+    ("결제 수단별 결제 금액", ["payments"]),
+    ("부서별 평균 급여", ["employees", "departments"]),
+    ("택배사별 출고 건수", ["shipments"]),
+    ("쿠폰 사용 내역이 있는 주문 수", ["coupon_redemptions", "orders"]),
+    ("처리 중인 고객 문의 티켓 목록", ["support_tickets"]),
+    ("오늘 로그인한 사용자 수", ["login_events"]),
+]
+
+
+SQL_SYSTEM_PROMPT = """You are a PostgreSQL SQL generator.
+Return ONLY ONE SQL statement that is safe to run as READ-ONLY (SELECT or WITH ... SELECT).
+Do NOT include markdown/code fences. Output plain SQL only.
+"""
+
+
+def _sql_references(sql: str, tables: List[str]) -> bool:
+    lowered = sql.lower()
+    return all(re.search(rf"\b{re.escape(t)}\b", lowered) for t in tables)
+
+
+def _llm_accuracy(model: str, base_url: str, schema_for: Dict[str, str]) -> float:
+    from src.llm.ollama_provider import OllamaProvider
+
+    llm = OllamaProvider(base_url=base_url, model=model)
+    correct = 0
+    for question, expected in _QUESTIONS:
+        messages = [
+            {"role": "system", "content": f"{SQL_SYSTEM_PROMPT}\n\nSchema:\n{schema_for[question]}"},
+            {"role": "user", "content": question},
+        ]
+        sql = extract_first_sql_statement(llm.generate(messages, temperature=0.0))
+        ok, _ = is_safe_select_sql(sql)
+        if ok and _sql_references(sql, expected):
+            correct += 1
+    return correct / len(_QUESTIONS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="schema retrieval: tokens saved + accuracy")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--token-budget", type=int, default=600)
+    parser.add_argument("--llm", action="store_true", help="Ollama로 SQL 정확도까지 측정")
+    parser.add_argument("--model", default="llama3")
+    parser.add_argument("--base-url", default="http://localhost:11434")
+    args = parser.parse_args()
+
+    catalog = _fixture_catalog()
+    retriever = SchemaRetriever(catalog, top_k=args.top_k, token_budget=args.token_budget)
+
+    recalled = 0
+    pruned_schema: Dict[str, str] = {}
+    full_schema: Dict[str, str] = {}
+    print(f"{'question':<30} {'tokens':>13}  recall  tables")
+    print("-" * 100)
+    for question, expected in _QUESTIONS:
+        ctx = retriever.retrieve(question)
+        hit = all(t in ctx.tables for t in expected)
+        recalled += int(hit)
+        pruned_schema[question] = ctx.text
+        full_schema[question] = retriever.full_text
+        print(f"{question:<30} {ctx.tokens_full:>5} -> {ctx.tokens_used:<5} {'OK' if hit else 'MISS':>6}  {ctx.tables}")
+
+    stats = retriever.stats()
+    print("-" * 100)
+    print(f"table recall: {recalled}/{len(_QUESTIONS)} ({recalled / len(_QUESTIONS):.0%})")
+    print(
+        f"schema tokens: full={stats['tokens_full']} pruned={stats['tokens_used']} "
+        f"saved={stats['tokens_saved']} ({stats['saved_ratio']:.0%})"
+    )
+
+    if args.llm:
+        full_acc = _llm_accuracy(args.model, args.base_url, full_schema)
+        pruned_acc = _llm_accuracy(args.model, args.base_url, pruned_schema)
+        print(f"SQL accuracy ({args.model}): full schema={full_acc:.0%} pruned schema={pruned_acc:.0%}")
+
+
+if __name__ == "__main__":
+    main()
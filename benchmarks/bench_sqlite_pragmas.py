@@ -0,0 +1,114 @@
+"""SQLite 성능 프로파일 벤치마크 (동시 세션 처리량)
+
+기본 SQLite 엔진(rollback journal, synchronous=FULL)과
+get_engine(tuned=True) (WAL, synchronous=NORMAL, mmap, cache, busy_timeout + 커넥션 풀)을
+여러 스레드가 동시에 채팅 턴을 처리하는 상황에서 비교합니다.
+
+스레드마다 별도 세션으로
+- 최근 이력 로드 (읽기) x --reads
+- user + assistant 메시지 저장 (쓰기 커밋 2번)
+을 --seconds 동안 반복합니다.
+
+실행:
+    python -m benchmarks.bench_sqlite_pragmas
+    python -m benchmarks.bench_sqlite_pragmas --threads 16 --seconds 10
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks._timing import percentile
+from src.database.db import get_engine
+from src.database.migrations import migrate
+from src.memory.memory_manager import MemoryManager
+
+
+def _worker(
+    engine: Engine,
+    worker_id: int,
+    deadline: float,
+    reads: int,
+    turns: List[int],
+    errors: List[int],
+    latencies: List[float],
+) -> None:
+    memory = MemoryManager(session=sessionmaker(bind=engine)(), use_cache=False)
+    conversation = memory.get_or_create_conversation(f"bench-{worker_id}-{time.time_ns()}")
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            for _ in range(reads):
+                memory.load_messages_within_budget(conversation.id, token_budget=2000)
+            memory.save_message(conversation.id, "user", f"question {i} " + "x" * 80)
+            memory.save_message(conversation.id, "assistant", f"answer {i} " + "y" * 400)
+        except OperationalError:
+            # database is locked 등
+            memory.session.rollback()
+            errors[worker_id] += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        turns[worker_id] += 1
+        i += 1
+    memory.session.close()
+
+
+def _run(label: str, engine: Engine, threads: int, seconds: float, reads: int) -> None:
+    migrate(engine)
+    turns = [0] * threads
+    errors = [0] * threads
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+    workers = [
+        threading.Thread(target=_worker, args=(engine, w, deadline, reads, turns, errors, latencies))
+        for w in range(threads)
+    ]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    ordered = sorted(latencies) or [0.0]
+    p99 = percentile(ordered, 0.99)
+    print(
+        f"{label:<10} turns/s={sum(turns) / seconds:8.1f}  commits/s={2 * sum(turns) / seconds:8.1f}  "
+        f"p50={statistics.median(ordered):7.2f}ms p99={p99:8.2f}ms  errors={sum(errors)}"
+    )
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite default vs tuned (WAL + pragmas + pool) under concurrent sessions")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--reads", type=int, default=3, help="턴마다 이력 로드 횟수")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    print(f"threads={args.threads} seconds={args.seconds} reads/turn={args.reads}")
+
+    default_url = f"sqlite:///{os.path.join(tmp_dir, 'default.db')}"
+    _run("default", create_engine(default_url, echo=False), args.threads, args.seconds, args.reads)
+
+    tuned_url = f"sqlite:///{os.path.join(tmp_dir, 'tuned.db')}"
+    _run(
+        "tuned",
+        get_engine(tuned_url, tuned=True, pool_size=args.threads, max_overflow=0),
+        args.threads,
+        args.seconds,
+        args.reads,
+    )
+
+
+if __name__ == "__main__":
+    main()
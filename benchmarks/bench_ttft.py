@@ -0,0 +1,78 @@
+"""TTFT(Time To First Token) 벤치마크
+
+generate() (버퍼링) 와 generate_stream() (스트리밍) 의
+"사용자가 첫 글자를 보기까지 걸리는 시간"을 비교합니다.
+
+- generate(): 전체 응답이 끝나야 첫 글자를 볼 수 있음 → TTFT = 전체 시간
+- generate_stream(): 첫 조각이 도착하는 즉시 출력 가능 → TTFT = 첫 조각 도착 시간
+
+실행 (Ollama 서버 필요):
+    python -m benchmarks.bench_ttft
+    python -m benchmarks.bench_ttft --model llama3 --runs 5
+"""
+
+import argparse
+import statistics
+import time
+from typing import List
+
+from src.llm.ollama_provider import OllamaProvider
+
+
+PROMPT = "파이썬의 제너레이터가 무엇인지 예시와 함께 자세히 설명해 주세요."
+
+
+def _measure_buffered(provider: OllamaProvider, messages) -> float:
+    started = time.perf_counter()
+    provider.generate(messages, temperature=0.0)
+    return time.perf_counter() - started
+
+
+def _measure_stream(provider: OllamaProvider, messages) -> tuple:
+    started = time.perf_counter()
+    first = None
+    for _ in provider.generate_stream(messages, temperature=0.0):
+        if first is None:
+            first = time.perf_counter() - started
+    total = time.perf_counter() - started
+    return (first if first is not None else total), total
+
+
+def _summary(label: str, values: List[float]) -> str:
+    return (
+        f"{label:<28} p50={statistics.median(values):6.2f}s "
+        f"min={min(values):6.2f}s max={max(values):6.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTFT benchmark (buffered vs stream)")
+    parser.add_argument("--base-url", default="http://localhost:11434")
+    parser.add_argument("--model", default="llama3")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    provider = OllamaProvider(base_url=args.base_url, model=args.model)
+    messages = [{"role": "user", "content": PROMPT}]
+
+    # 모델 로딩 시간이 첫 측정에 섞이지 않도록 워밍업
+    provider.generate([{"role": "user", "content": "hi"}], max_tokens=1)
+
+    buffered: List[float] = []
+    stream_first: List[float] = []
+    stream_total: List[float] = []
+    for i in range(args.runs):
+        buffered.append(_measure_buffered(provider, messages))
+        first, total = _measure_stream(provider, messages)
+        stream_first.append(first)
+        stream_total.append(total)
+        print(f"run {i + 1}: buffered={buffered[-1]:.2f}s stream_ttft={first:.2f}s stream_total={total:.2f}s")
+
+    print("-" * 60)
+    print(_summary("generate() TTFT", buffered))
+    print(_summary("generate_stream() TTFT", stream_first))
+    print(_summary("generate_stream() total", stream_total))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""장기 기억 벡터 검색 벤치마크 (VectorMemory)
+
+대화 1개에 잡담 메시지를 많이 채우고 그 사이에 "사실" 메시지(예: "내 강아지 이름은 ...")를 심은 뒤
+- 인덱스 생성: 메시지 임베딩 + message_embeddings 저장 시간
+- 콜드 로드: 새 프로세스처럼 DB의 BLOB에서 행렬을 다시 읽는 시간
+- 질의 지연: retrieve_relevant_messages (동기화 쿼리 + 질의 임베딩 + top-k + 본문 조회)
+- recall@k: 사실을 묻는 질문에 해당 사실 메시지가 top-k에 들어오는 비율
+  (비교: 토큰 예산 안의 최근 메시지만 쓰는 기존 방식에서 사실이 컨텍스트에 남아있는 비율)
+를 측정합니다.
+
+기본 임베딩은 HashingEmbedder (모델 불필요), --ollama-model을 주면 Ollama 임베딩 모델 사용
+
+실행:
+    python -m benchmarks.bench_vector_memory
+    python -m benchmarks.bench_vector_memory --messages 100000 --dim 256
+    python -m benchmarks.bench_vector_memory --ollama-model nomic-embed-text --messages 5000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks._timing import measure, report
+from src.database.migrations import migrate
+from src.database.models import Conversation, Message
+from src.llm.embeddings import HashingEmbedder, OllamaEmbedder, np
+from src.memory.memory_manager import MemoryManager
+from src.memory.vector_memory import VectorMemory
+from src.prompt.context_assembler import ContextAssembler
+
+
+_SUBJECTS = ["강아지", "고양이", "자동차", "자전거", "회사", "학교", "동네", "취미", "좋아하는 음식", "생일"]
+_VALUES = ["바둑이", "나비", "소나타", "삼천리", "한빛전자", "서울고", "연남동", "등산", "김치찌개", "3월 14일"]
+_FILLER = ["오늘 날씨", "점심 메뉴", "회의 일정", "주말 계획", "뉴스 이야기", "운동 기록", "영화 추천", "책 이야기"]
+
+
+def _fill(engine, messages: int, facts: int, seed: int = 42):
+    migrate(engine)
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(insert(Conversation), [{"session_id": "bench-vector", "created_at": datetime.utcnow()}])
+        conversation_id = conn.execute(text("SELECT max(id) FROM conversations")).scalar()
+
+    # 사실 메시지는 대화 앞쪽 절반에 흩어 놓음 (최근 메시지 예산 밖)
+    fact_positions = sorted(rng.sample(range(messages // 2), facts))
+    planted = {}
+    base = datetime(2024, 1, 1)
+    rows = []
+    for i in range(messages):
+        if fact_positions and i == fact_positions[0]:
+            n = len(planted)
+            subject = f"{_SUBJECTS[n % len(_SUBJECTS)]} {n}"
+            content = f"참고로 내 {subject} 이름은 {_VALUES[n % len(_VALUES)]}{n}이야"
+            planted[i] = subject
+            fact_positions.pop(0)
+        else:
+            content = f"{rng.choice(_FILLER)} {rng.randint(0, 10 ** 6)} " + " ".join(
+                rng.choice(_FILLER) for _ in range(rng.randint(1, 4))
+            )
+        rows.append({
+            "conversation_id": conversation_id,
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": content,
+            "timestamp": base + timedelta(seconds=i),
+            "token_count": len(content) // 4,
+        })
+    with engine.begin() as conn:
+        conn.execute(insert(Message), rows)
+        ids = [r[0] for r in conn.execute(text(
+            f"SELECT id FROM messages WHERE conversation_id = {conversation_id} ORDER BY id"
+        ))]
+    return conversation_id, {ids[pos]: subject for pos, subject in planted.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="long-term memory: vector index build / query / recall")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--facts", type=int, default=50)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--dim", type=int, default=512, help="HashingEmbedder 차원")
+    parser.add_argument("--ollama-model", default=None, help="Ollama 임베딩 모델 (예: nomic-embed-text)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, default=4096, help="ContextAssembler max_tokens (recency 기준선)")
+    args = parser.parse_args()
+
+    if args.ollama_model:
+        from src.llm.ollama_provider import OllamaProvider
+        embed_fn, model = OllamaEmbedder(OllamaProvider(), model=args.ollama_model), args.ollama_model
+    else:
+        embed_fn, model = HashingEmbedder(dim=args.dim), f"hashing-{args.dim}"
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_vector_'), 'bench.db')}"
+    engine = create_engine(url, echo=False)
+    Session = sessionmaker(bind=engine)
+    print(f"[fill] {args.messages:,} messages / {args.facts} facts, embedder={model}, numpy={'yes' if np is not None else 'no'}")
+    conversation_id, facts = _fill(engine, args.messages, args.facts)
+
+    # 1) 인덱스 생성 (임베딩 + 저장) - 첫 검색에서 backfill
+    memory = MemoryManager(session=Session(), use_cache=False, vector_memory=VectorMemory(embed_fn, model=model))
+    started = time.perf_counter()
+    memory.retrieve_relevant_messages(conversation_id, "warm up", k=1)
+    elapsed = time.perf_counter() - started
+    print(f"[build] embedded+stored {args.messages:,} messages in {elapsed:.2f}s ({args.messages / elapsed:,.0f} msg/s)")
+
+    # 2) 콜드 로드 (임베딩 없이 BLOB만 읽음)
+    cold = MemoryManager(session=Session(), use_cache=False, vector_memory=VectorMemory(embed_fn, model=model))
+    started = time.perf_counter()
+    cold.retrieve_relevant_messages(conversation_id, "warm up", k=1)
+    print(f"[load] cold load from message_embeddings: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    # 3) 질의 지연
+    questions = [(message_id, f"내 {subject} 이름이 뭐였지?") for message_id, subject in facts.items()]
+    print("[query]")
+    rng = random.Random(7)
+    report(
+        f"retrieve_relevant_messages(k={args.k})",
+        measure(lambda: memory.retrieve_relevant_messages(conversation_id, rng.choice(questions)[1], k=args.k), args.repeat),
+        width=44,
+    )
+
+    # 4) recall@k vs 최근 메시지만 쓰는 기준선
+    hits = 0
+    for message_id, question in questions:
+        results = memory.retrieve_relevant_messages(conversation_id, question, k=args.k)
+        hits += any(r["id"] == message_id for r in results)
+
+    assembler = ContextAssembler(max_tokens=args.max_tokens)
+    recent = memory.load_messages_within_budget(conversation_id, assembler.history_token_budget())
+    recent_contents = {m["content"] for m in recent}
+    with engine.connect() as conn:
+        fact_contents = [
+            row[0] for row in conn.execute(
+                text(f"SELECT content FROM messages WHERE id IN ({','.join(str(i) for i in facts)})")
+            )
+        ]
+    recency_hits = sum(content in recent_contents for content in fact_contents)
+
+    print("[recall]")
+    print(f"  vector top-{args.k:<3}                               {hits}/{len(questions)} = {hits / len(questions):.1%}")
+    print(f"  recent messages only ({len(recent)} msgs in budget)       {recency_hits}/{len(questions)} = {recency_hits / len(questions):.1%}")
+    print(f"[stats] {memory.vector_memory.stats()}")
+
+
+if __name__ == "__main__":
+    main()
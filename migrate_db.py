@@ -0,0 +1,45 @@
+"""데이터베이스 마이그레이션 스크립트
+
+기존 DB(data/chat.db, PostgreSQL)에 모델에 새로 추가된 컬럼/인덱스를 반영합니다.
+(예: messages.token_count, ix_messages_conversation_timestamp_id)
+
+전문 검색 인덱스도 여기서 만듭니다. PostgreSQL의 tsvector 컬럼 추가는 messages 테이블을 다시 쓰므로
+서비스 시작 시에는 실행되지 않고 이 스크립트에서만 실행됩니다. (GIN 인덱스는 CONCURRENTLY)
+
+메시지가 많은 DB는 인덱스 생성에 시간이 걸리므로 서비스 시작 전에 한 번 실행하세요.
+
+실행:
+    python migrate_db.py              # SQLite (data/chat.db)
+    python migrate_db.py --postgres   # PostgreSQL (step6 환경변수 사용)
+"""
+
+import argparse
+
+from dotenv import load_dotenv
+
+from src.database.fulltext import migrate_fulltext
+from src.database.migrations import migrate
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기존 DB에 누락된 컬럼/인덱스 추가")
+    parser.add_argument("--postgres", action="store_true", help="PostgreSQL 마이그레이션")
+    args = parser.parse_args()
+
+    if args.postgres:
+        load_dotenv()
+        from src.database.db_postgres import get_engine_postgres
+        engine = get_engine_postgres()
+    else:
+        from src.database.db import get_engine
+        engine = get_engine()
+
+    print("데이터베이스 마이그레이션 중...")
+    changes = migrate(engine) + migrate_fulltext(engine)
+    if changes:
+        for change in changes:
+            print(f"   + {change}")
+    else:
+        print("   변경 사항 없음")
+    print("✅ 마이그레이션 완료!")
+    print(f"   URL: {engine.url.render_as_string(hide_password=True)}")
@@ -3,7 +3,7 @@
 Context Assembler와 LLM Service를 통합하여 챗 기능을 제공합니다.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from src.llm.ollama_provider import OllamaProvider
 from src.llm.llm_provider import LLMProvider
 from src.prompt.context_assembler import ContextAssembler
@@ -27,8 +27,8 @@ class ChatManager:
         self.llm_provider = llm_provider or OllamaProvider()
         self.context_assembler = context_assembler or ContextAssembler(max_tokens=max_tokens)
         
-        # 대화 기록 (메모리 - DB 없음 단계)
-        self.conversation_history: List[Dict[str, str]] = []
+        # 대화 기록 (메모리 - DB 없음 단계, 메시지별 토큰 수를 추가할 때 한 번만 계산)
+        self.conversation_history = self.context_assembler.new_history()
     
     def chat(
         self,
@@ -72,11 +72,54 @@ class ChatManager:
         
         return response
     
+    def chat_stream(
+        self,
+        user_message: str,
+        temperature: float = 0.7,
+        search_results: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        사용자 메시지를 받아 LLM 응답을 조각 단위로 반환 (스트리밍)
+        
+        스트림이 끝까지 소비된 뒤에 조립된 응답을 대화 기록에 추가합니다.
+        
+        Args:
+            user_message: 사용자 메시지
+            temperature: 생성 온도
+            search_results: 검색 결과 (선택사항)
+            
+        Yields:
+            LLM 응답 조각
+        """
+        messages = self.context_assembler.build_context(
+            memories=self.conversation_history,
+            user_message=user_message,
+            search_results=search_results
+        )
+        
+        chunks: List[str] = []
+        for chunk in self.llm_provider.generate_stream(
+            messages,
+            temperature=temperature
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        # 스트림 종료 후 대화 기록에 추가
+        self.conversation_history.append({
+            "role": "user",
+            "content": user_message
+        })
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": "".join(chunks)
+        })
+    
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """현재 대화 기록 반환"""
         return self.conversation_history.copy()
     
     def clear_history(self):
         """대화 기록 초기화"""
-        self.conversation_history = []
+        self.conversation_history.clear()
 
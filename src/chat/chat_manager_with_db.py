@@ -5,11 +5,13 @@
 - 이 버전: Memory Manager를 사용하여 DB에 저장
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from src.llm.ollama_provider import OllamaProvider
-from src.llm.llm_provider import LLMProvider
+from src.llm.llm_provider import GenerationResult, LLMProvider
+from src.llm.generation_metrics import generation_metadata
 from src.prompt.context_assembler import ContextAssembler
 from src.memory.memory_manager import MemoryManager
+from src.memory.summarizer import ConversationSummarizer
 
 
 class ChatManagerWithDB:
@@ -21,7 +23,9 @@ class ChatManagerWithDB:
         llm_provider: Optional[LLMProvider] = None,
         context_assembler: Optional[ContextAssembler] = None,
         memory_manager: Optional[MemoryManager] = None,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        long_term_k: int = 4,
+        summarizer: Optional[ConversationSummarizer] = None
     ):
         """
         Args:
@@ -30,11 +34,15 @@ class ChatManagerWithDB:
             context_assembler: Context Assembler (기본값: 새로 생성)
             memory_manager: Memory Manager (기본값: 새로 생성)
             max_tokens: 최대 토큰 수
+            long_term_k: 장기 기억으로 가져올 관련 과거 메시지 수 (memory_manager에 vector_memory가 있을 때)
+            summarizer: 지정하면 예산 밖으로 밀려난 메시지를 백그라운드에서 요약해 컨텍스트에 주입
         """
         self.conversation_id = conversation_id
         self.llm_provider = llm_provider or OllamaProvider()
         self.context_assembler = context_assembler or ContextAssembler(max_tokens=max_tokens)
         self.memory_manager = memory_manager or MemoryManager()
+        self.long_term_k = long_term_k
+        self.summarizer = summarizer
         
         # 대화 세션 가져오기 또는 생성
         self.conversation = self.memory_manager.get_or_create_conversation(conversation_id)
@@ -56,23 +64,29 @@ class ChatManagerWithDB:
         Returns:
             LLM 응답
         """
-        # 1. DB에서 최근 메시지 로드
-        memories = self.memory_manager.load_recent_messages(self.conversation.id)
+        # 1. DB에서 토큰 예산 안의 최근 메시지만 로드 (전체 기록을 읽지 않음)
+        memories = self.memory_manager.load_messages_within_budget(
+            self.conversation.id,
+            token_budget=self._recent_token_budget()
+        )
         
-        # 2. Context Assembler로 메시지 조립
+        # 2. Context Assembler로 메시지 조립 (과거 대화 요약, 관련 과거 메시지 포함)
         messages = self.context_assembler.build_context(
             memories=memories,
             user_message=user_message,
-            search_results=search_results
+            search_results=search_results,
+            relevant_memories=self._relevant_memories(user_message),
+            summary=self._summary()
         )
+        selected = self.context_assembler.last_history
         
-        # 3. LLM 호출
-        response = self.llm_provider.generate(
+        # 3. LLM 호출 (응답 + 토큰 수/추론 시간)
+        result = self.llm_provider.generate_result(
             messages,
             temperature=temperature
         )
         
-        # 4. DB에 저장
+        # 4. DB에 저장 (추론 시간은 assistant 메시지 메타데이터에 기록)
         self.memory_manager.save_message(
             conversation_id=self.conversation.id,
             role="user",
@@ -81,10 +95,119 @@ class ChatManagerWithDB:
         self.memory_manager.save_message(
             conversation_id=self.conversation.id,
             role="assistant",
-            content=response
+            content=result.text,
+            message_metadata=generation_metadata(result)
+        )
+        self._schedule_summary(memories, selected)
+        
+        return result.text
+    
+    def chat_stream(
+        self,
+        user_message: str,
+        temperature: float = 0.7,
+        search_results: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        사용자 메시지를 받아 LLM 응답을 조각 단위로 반환 (스트리밍, DB 저장/로드)
+        
+        스트림이 끝까지 소비된 뒤에 사용자 메시지와 조립된 응답을 DB에 저장합니다.
+        
+        Args:
+            user_message: 사용자 메시지
+            temperature: 생성 온도
+            search_results: 검색 결과 (선택사항)
+            
+        Yields:
+            LLM 응답 조각
+        """
+        # 1. DB에서 토큰 예산 안의 최근 메시지만 로드 (전체 기록을 읽지 않음)
+        memories = self.memory_manager.load_messages_within_budget(
+            self.conversation.id,
+            token_budget=self._recent_token_budget()
+        )
+        
+        # 2. Context Assembler로 메시지 조립 (과거 대화 요약, 관련 과거 메시지 포함)
+        messages = self.context_assembler.build_context(
+            memories=memories,
+            user_message=user_message,
+            search_results=search_results,
+            relevant_memories=self._relevant_memories(user_message),
+            summary=self._summary()
         )
+        selected = self.context_assembler.last_history
         
-        return response
+        # 3. LLM 스트리밍 호출 (마지막에 토큰 수/추론 시간을 받음)
+        chunks: List[str] = []
+        results: List[GenerationResult] = []
+        for chunk in self.llm_provider.generate_stream(
+            messages,
+            temperature=temperature,
+            on_result=results.append
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        # 4. 스트림 종료 후 DB에 저장 (추론 시간은 assistant 메시지 메타데이터에 기록)
+        self.memory_manager.save_message(
+            conversation_id=self.conversation.id,
+            role="user",
+            content=user_message
+        )
+        self.memory_manager.save_message(
+            conversation_id=self.conversation.id,
+            role="assistant",
+            content="".join(chunks),
+            message_metadata=generation_metadata(results[-1]) if results else None
+        )
+        self._schedule_summary(memories, selected)
+    
+    def _recent_token_budget(self) -> int:
+        """최근 메시지 예산 (요약을 쓰면 요약 상한만큼 예약)"""
+        budget = self.context_assembler.history_token_budget()
+        if self.summarizer is not None:
+            budget = max(budget - self.summarizer.max_summary_tokens, 0)
+        return budget
+    
+    def _summary(self) -> Optional[str]:
+        if self.summarizer is None:
+            return None
+        summary = self.memory_manager.load_summary(self.conversation.id)
+        return summary["content"] if summary else None
+    
+    def _schedule_summary(self, memories: List[Dict], selected: List[Dict]) -> None:
+        """
+        이번 턴 프롬프트에 들어가지 못한 메시지를 요약에 반영 (백그라운드)
+        
+        경계는 ContextAssembler가 실제로 고른 가장 오래된 대화 기록입니다.
+        (최근 메시지 예산뿐 아니라 검색 결과/장기 기억 쿼터 때문에 빠진 기록도 요약됨)
+        
+        Args:
+            memories: build_context에 넘긴 대화 기록 (load_messages_within_budget, id 포함)
+            selected: 그중 프롬프트에 들어간 기록 (ContextAssembler.last_history)
+        """
+        if self.summarizer is None or not memories:
+            # 불러온 기록이 없으면 다음 턴에 (이번 턴 메시지가 고른 기록에 들어가면 그 앞까지 반영)
+            return
+        if selected and selected[0]["id"] is not None:
+            keep_from_id = selected[0]["id"]
+        else:
+            # 불러온 기록이 모두 빠졌거나, 고른 기록이 모두 아직 저장 전(write-behind, id=None)
+            saved_ids = [m["id"] for m in memories if m["id"] is not None]
+            if not saved_ids:
+                return
+            keep_from_id = max(saved_ids) + 1
+        self.summarizer.schedule(self.conversation.id, keep_from_id)
+    
+    def _relevant_memories(self, user_message: str) -> List[Dict]:
+        """장기 기억: 현재 메시지와 의미가 가까운 과거 메시지 (vector_memory가 없으면 빈 리스트)"""
+        if self.long_term_k <= 0:
+            return []
+        return self.memory_manager.retrieve_relevant_messages(
+            self.conversation.id,
+            user_message,
+            k=self.long_term_k
+        )
     
     def get_conversation_history(self) -> List[Dict[str, str]]:
         """DB에서 대화 기록 반환"""
@@ -0,0 +1,114 @@
+"""비동기 DB 연결 (SQLAlchemy asyncio)
+
+하나의 이벤트 루프에서 여러 대화를 동시에 처리할 때
+DB 조회/저장이 루프(LLM 스트리밍 등)를 막지 않도록 비동기 드라이버를 사용합니다.
+
+- SQLite: aiosqlite  (sqlite:///... → sqlite+aiosqlite:///...)
+- PostgreSQL: asyncpg (postgresql+psycopg2://... → postgresql+asyncpg://...)
+
+필요 패키지: aiosqlite (기본 저장소), asyncpg (PostgreSQL 사용 시)
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from . import session as _session
+from .db import DATABASE_URL, SQLITE_PRAGMAS, apply_sqlite_pragmas
+from .migrations import migrate_connection
+
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_FACTORIES: Dict[AsyncEngine, async_sessionmaker] = {}
+_MIGRATED = set()
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    동기 드라이버 URL을 비동기 드라이버 URL로 변환
+
+    예) sqlite:///data/chat.db → sqlite+aiosqlite:///data/chat.db
+        postgresql+psycopg2://u:p@h/db → postgresql+asyncpg://u:p@h/db
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or url.drivername in _ASYNC_DRIVERS.values():
+        return database_url
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine(
+    database_url: Optional[str] = None,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+) -> AsyncEngine:
+    """
+    비동기 엔진 반환 (같은 URL/옵션이면 프로세스 전역 엔진 재사용)
+
+    Args:
+        database_url: 동기/비동기 URL 모두 가능 (기본값: data/chat.db)
+        pool_size: 풀에 유지할 연결 수 (PostgreSQL)
+        max_overflow: pool_size를 넘어 추가로 열 수 있는 연결 수 (PostgreSQL)
+    """
+    url = to_async_url(database_url or DATABASE_URL)
+
+    def create() -> AsyncEngine:
+        if url.startswith("sqlite"):
+            engine = create_async_engine(url, echo=False)
+            if ":memory:" not in url:
+                # 동기 엔진과 같은 SQLite 성능 프로파일 (WAL, synchronous=NORMAL, ...)
+                apply_sqlite_pragmas(engine.sync_engine, SQLITE_PRAGMAS)
+            return engine
+        return create_async_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+        )
+
+    return _session.cached_engine(("async", url, pool_size, max_overflow), create)
+
+
+def get_async_session_factory(engine: Optional[AsyncEngine] = None) -> async_sessionmaker:
+    """
+    엔진별 async_sessionmaker (캐시)
+
+    expire_on_commit=False: commit 후에도 객체 속성을 다시 조회하지 않음 (await 없이 접근 가능)
+    """
+    engine = engine or get_async_engine()
+    factory = _FACTORIES.get(engine)
+    if factory is None:
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        _FACTORIES[engine] = factory
+    return factory
+
+
+async def init_async_database(engine: Optional[AsyncEngine] = None) -> AsyncEngine:
+    """테이블 생성 + 누락 컬럼/인덱스 추가 (엔진당 1회)"""
+    engine = engine or get_async_engine()
+    key = engine.url.render_as_string(hide_password=True)
+    if key not in _MIGRATED:
+        async with engine.begin() as conn:
+            await conn.run_sync(migrate_connection)
+        _MIGRATED.add(key)
+    return engine
+
+
+@asynccontextmanager
+async def async_session_scope(engine: Optional[AsyncEngine] = None) -> AsyncIterator[AsyncSession]:
+    """작업 단위 세션: 성공 시 commit, 예외 시 rollback, 끝나면 close"""
+    async with get_async_session_factory(engine)() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -1,36 +1,138 @@
 """Database 초기화 및 설정"""
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, scoped_session
 from .models import Base, init_db as create_tables
+from .migrations import migrate
+from . import session as _session
 
 # 데이터베이스 경로 (SQLite)
 DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
 DB_PATH = os.path.join(DB_DIR, "chat.db")
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
+# SQLite 성능 프로파일 (연결마다 connect 이벤트로 적용)
+# - journal_mode=WAL: 읽기와 쓰기가 서로 막지 않음 (DB 파일에 영구 저장되는 설정)
+# - synchronous=NORMAL: WAL에서는 체크포인트 때만 fsync (커밋마다 fsync 안 함, 전원 장애 시 마지막 커밋만 유실 가능)
+# - busy_timeout: 쓰기 잠금 대기 (ms), "database is locked" 즉시 실패 방지
+# - cache_size: 음수면 KiB 단위 (-64000 ≈ 64MB), mmap_size: 메모리 맵 읽기 (바이트)
+# - foreign_keys: ON DELETE CASCADE 등 FK 제약 적용 (SQLite 기본값은 OFF)
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
 
-def get_engine():
-    """데이터베이스 엔진 반환"""
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, Any]] = None) -> Engine:
+    """
+    SQLite 엔진의 모든 새 연결에 PRAGMA 적용
+
+    Args:
+        engine: SQLite 엔진
+        pragmas: 적용할 PRAGMA (기본값: SQLITE_PRAGMAS)
+
+    Returns:
+        같은 엔진
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def _create_engine(url: str, tuned: bool, pool_size: int, max_overflow: int, pool_timeout: float) -> Engine:
+    if not tuned or not url.startswith("sqlite") or ":memory:" in url:
+        return create_engine(url, echo=False)
+
+    # 멀티스레드 서버: 연결을 풀에서 스레드 간에 재사용하므로 check_same_thread 해제
+    engine = create_engine(
+        url,
+        echo=False,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=False,
+        connect_args={"check_same_thread": False},
+    )
+    return apply_sqlite_pragmas(engine)
+
+
+def get_engine(
+    database_url: Optional[str] = None,
+    tuned: bool = True,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    pool_timeout: Optional[float] = None
+):
+    """
+    데이터베이스 엔진 반환 (같은 URL/옵션이면 프로세스 전역 엔진 재사용)
+
+    풀 옵션 기본값은 환경변수 SQLITE_POOL_SIZE(5), SQLITE_MAX_OVERFLOW(10), SQLITE_POOL_TIMEOUT(30)
+
+    Args:
+        database_url: 데이터베이스 URL (기본값: data/chat.db)
+        tuned: True면 SQLite 성능 프로파일(SQLITE_PRAGMAS) + 스레드 간 공유 가능한 커넥션 풀 사용
+        pool_size: 풀에 유지할 연결 수 (tuned=True일 때)
+        max_overflow: pool_size를 넘어 추가로 열 수 있는 연결 수 (tuned=True일 때)
+        pool_timeout: 풀에서 연결을 기다리는 최대 시간 (초)
+    """
     # 디렉토리 생성
     os.makedirs(DB_DIR, exist_ok=True)
-    
-    engine = create_engine(DATABASE_URL, echo=False)
-    return engine
+    url = database_url or DATABASE_URL
+    pool_size = pool_size if pool_size is not None else int(os.getenv("SQLITE_POOL_SIZE", "5"))
+    max_overflow = max_overflow if max_overflow is not None else int(os.getenv("SQLITE_MAX_OVERFLOW", "10"))
+    pool_timeout = pool_timeout if pool_timeout is not None else float(os.getenv("SQLITE_POOL_TIMEOUT", "30"))
+
+    key = (url, tuned, pool_size, max_overflow, pool_timeout)
+    return _session.cached_engine(
+        key,
+        lambda: _create_engine(url, tuned, pool_size, max_overflow, pool_timeout),
+    )
 
 
 def init_database():
     """데이터베이스 초기화 (테이블 생성)"""
     engine = get_engine()
-    Base.metadata.create_all(engine)
+    # 테이블 생성 + 기존 테이블에 새 컬럼 추가
+    migrate(engine)
     return engine
 
 
 def get_session(engine=None):
-    """데이터베이스 세션 반환"""
+    """데이터베이스 세션 반환 (새 Session, 엔진/sessionmaker는 재사용)"""
     if engine is None:
         engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return _session.get_session_factory(engine)()
+
 
+def get_scoped_session(engine=None) -> scoped_session:
+    """스레드마다 별도 Session을 돌려주는 scoped_session (엔진별로 1개)"""
+    if engine is None:
+        engine = get_engine()
+    return _session.get_scoped_session(engine)
+
+
+@contextmanager
+def session_scope(engine=None) -> Iterator[Session]:
+    """작업 단위 세션: 성공 시 commit, 예외 시 rollback, 끝나면 close"""
+    if engine is None:
+        engine = get_engine()
+    with _session.session_scope(engine) as session:
+        yield session
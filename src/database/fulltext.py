@@ -0,0 +1,313 @@
+"""Full-text Search - 대화 기록 전문 검색 인덱스
+
+"지난달에 X에 대해 뭐라고 했지?" 같은 질문은 최근순 로드로는 찾을 수 없으므로
+메시지 content에 전문 검색 인덱스를 만들어 관련도 순으로 조회합니다.
+
+- SQLite: FTS5 external-content 테이블 (messages_fts)
+  messages 테이블을 원본으로 쓰고 INSERT/UPDATE/DELETE 트리거로 인덱스를 동기화
+  (write-behind, 비동기 저장, 벌크 INSERT 등 어떤 경로로 저장해도 반영됨)
+- PostgreSQL: tsvector 생성 컬럼 (messages.content_tsv) + GIN 인덱스
+  GENERATED ALWAYS ... STORED라 INSERT/UPDATE 시 DB가 자동 계산 (PostgreSQL 12+)
+  컬럼 추가는 테이블을 다시 쓰며 쓰기를 막으므로 서비스 시작 경로(ensure_migrated / init)에서는
+  만들지 않고 있는지만 확인합니다. migrate_db.py --postgres (migrate_fulltext)로 따로 실행하세요.
+  (GIN 인덱스는 CREATE INDEX CONCURRENTLY로 생성)
+- 둘 다 없으면 (FTS5 없이 빌드된 SQLite 등) LIKE 검색으로 대체 (관련도 점수 없음, 최신순)
+
+검색어는 단어 단위 접두어 검색 (모든 단어 포함, AND):
+    "철수 이름" → SQLite: "철수"* "이름"*   /  PostgreSQL: 철수:* & 이름:*
+한국어처럼 조사가 붙는 언어에서도 "철수"로 "철수입니다"를 찾을 수 있습니다.
+
+기존 메시지가 많은 DB에 처음 적용하면 인덱스 생성(기존 행 색인)에 시간이 걸리므로
+migrate_db.py로 미리 실행하세요.
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, Float, Integer, String, Text, bindparam, desc, inspect, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Executable
+
+from .models import Message
+
+
+FTS_TABLE = "messages_fts"
+TSV_COLUMN = "content_tsv"
+TSV_INDEX = "ix_messages_content_tsv"
+# PostgreSQL 텍스트 검색 설정 ('simple': 언어별 어간 처리 없이 소문자화만 → 한국어/영어 공통)
+TS_CONFIG = "simple"
+
+# 엔진 URL별 전문 검색 인덱스 존재 여부 (프로세스당 1회만 검사)
+_AVAILABLE: Dict[str, bool] = {}
+_LOCK = threading.Lock()
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_RESULT_TYPES = {
+    "id": Integer,
+    "conversation_id": Integer,
+    "role": String,
+    "content": Text,
+    "timestamp": DateTime,
+    "score": Float,
+}
+
+
+def _key(conn: Connection) -> str:
+    return conn.engine.url.render_as_string(hide_password=True)
+
+
+def _sqlite_has_fts5(conn: Connection) -> bool:
+    options = {row[0] for row in conn.execute(text("PRAGMA compile_options"))}
+    return "ENABLE_FTS5" in options
+
+
+def _ensure_sqlite_fts(conn: Connection) -> List[str]:
+    if FTS_TABLE in inspect(conn).get_table_names():
+        return []
+    if not _sqlite_has_fts5(conn):
+        return []
+
+    # prefix='2 3': 짧은 접두어 검색("철수"*)용 접두어 인덱스
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+        f"content, content='messages', content_rowid='id', tokenize='unicode61', prefix='2 3')"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON messages BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON messages BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF content ON messages BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); "
+        f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END"
+    ))
+    # 트리거 생성 전에 저장된 메시지 색인
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return [FTS_TABLE]
+
+
+def _ensure_postgres_tsv_column(conn: Connection) -> List[str]:
+    if TSV_COLUMN in {c["name"] for c in inspect(conn).get_columns("messages")}:
+        return []
+    conn.execute(text(
+        f"ALTER TABLE messages ADD COLUMN {TSV_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}', content)) STORED"
+    ))
+    return [f"messages.{TSV_COLUMN}"]
+
+
+def _ensure_postgres_tsv_index(conn: Connection) -> List[str]:
+    # conn은 AUTOCOMMIT이어야 함 (CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음)
+    valid = conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ),
+        {"name": TSV_INDEX},
+    ).scalar()
+    if valid:
+        return []
+    if valid is not None:
+        # 이전 CONCURRENTLY 생성이 중간에 실패해 남은 INVALID 인덱스
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {TSV_INDEX}"))
+    conn.execute(text(f"CREATE INDEX CONCURRENTLY {TSV_INDEX} ON messages USING GIN ({TSV_COLUMN})"))
+    return [TSV_INDEX]
+
+
+def _forget(conn: Connection) -> None:
+    with _LOCK:
+        _AVAILABLE.pop(_key(conn), None)
+
+
+def ensure_fulltext(conn: Connection) -> List[str]:
+    """
+    SQLite 전문 검색 인덱스 생성 (없을 때만, migrate_connection에서 호출)
+
+    PostgreSQL은 테이블을 다시 쓰는 DDL이 필요하므로 여기서는 만들지 않습니다.
+    (migrate_fulltext / migrate_db.py --postgres에서만 생성, 시작 시에는 fulltext_available로 확인만)
+
+    Args:
+        conn: 열린 연결 (트랜잭션 안)
+
+    Returns:
+        생성된 테이블 목록
+    """
+    if conn.dialect.name != "sqlite":
+        _forget(conn)
+        return []
+    created = _ensure_sqlite_fts(conn)
+    _forget(conn)
+    return created
+
+
+def migrate_fulltext(engine: Engine) -> List[str]:
+    """
+    전문 검색 인덱스 생성 (migrate_db.py용, PostgreSQL 포함)
+
+    PostgreSQL: tsvector 컬럼 추가(짧은 트랜잭션) 후 GIN 인덱스를 CREATE INDEX CONCURRENTLY로 생성
+    (인덱스 생성 중에도 메시지 저장이 막히지 않음)
+
+    Args:
+        engine: SQLAlchemy 엔진
+
+    Returns:
+        생성된 테이블/컬럼/인덱스 목록
+    """
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        with engine.begin() as conn:
+            return ensure_fulltext(conn)
+    if dialect != "postgresql":
+        return []
+
+    with engine.begin() as conn:
+        created = _ensure_postgres_tsv_column(conn)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        created += _ensure_postgres_tsv_index(conn)
+        _forget(conn)
+    return created
+
+
+def fulltext_available(conn: Connection) -> bool:
+    """전문 검색 인덱스가 있는지 (없으면 LIKE 검색으로 대체)"""
+    key = _key(conn)
+    with _LOCK:
+        if key in _AVAILABLE:
+            return _AVAILABLE[key]
+
+    dialect = conn.dialect.name
+    inspector = inspect(conn)
+    if dialect == "sqlite":
+        available = FTS_TABLE in inspector.get_table_names()
+    elif dialect == "postgresql":
+        available = TSV_COLUMN in {c["name"] for c in inspector.get_columns("messages")}
+    else:
+        available = False
+
+    with _LOCK:
+        _AVAILABLE[key] = available
+    return available
+
+
+def query_tokens(query: str) -> List[str]:
+    """검색어 → 단어 목록 (구두점/연산자 제거)"""
+    return _TOKEN_RE.findall(query or "")
+
+
+def _filters(conversation_id: Optional[int], since: Optional[datetime], until: Optional[datetime]) -> str:
+    sql = ""
+    if conversation_id is not None:
+        sql += " AND m.conversation_id = :conversation_id"
+    if since is not None:
+        sql += " AND m.timestamp >= :since"
+    if until is not None:
+        sql += " AND m.timestamp < :until"
+    return sql
+
+
+def search_statement(
+    dialect: str,
+    available: bool,
+    query: str,
+    conversation_id: Optional[int] = None,
+    limit: int = 20,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Optional[Executable]:
+    """
+    검색 쿼리 생성
+
+    Args:
+        dialect: "sqlite" / "postgresql" / ...
+        available: 전문 검색 인덱스 존재 여부 (fulltext_available)
+        query: 사용자 검색어
+        conversation_id: 지정하면 해당 대화에서만 검색
+        limit: 최대 결과 수
+        since / until: 메시지 시각 범위 [since, until)
+
+    Returns:
+        결과 컬럼이 (id, conversation_id, role, content, timestamp, score)인 쿼리 (검색어가 비면 None)
+    """
+    tokens = query_tokens(query)
+    if not tokens:
+        return None
+
+    params = {"limit": limit, "conversation_id": conversation_id, "since": since, "until": until}
+    filters = _filters(conversation_id, since, until)
+
+    if available and dialect == "sqlite":
+        # bm25는 작을수록 관련도가 높음 (ORDER BY rank = bm25 오름차순)
+        params["match"] = " ".join(f'"{t}"*' for t in tokens)
+        sql = (
+            f"SELECT m.id, m.conversation_id, m.role, m.content, m.timestamp, -{FTS_TABLE}.rank AS score "
+            f"FROM {FTS_TABLE} JOIN messages m ON m.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match{filters} "
+            f"ORDER BY {FTS_TABLE}.rank, m.id DESC LIMIT :limit"
+        )
+    elif available and dialect == "postgresql":
+        params["tsquery"] = " & ".join(f"{t}:*" for t in tokens)
+        sql = (
+            f"SELECT m.id, m.conversation_id, m.role, m.content, m.timestamp, "
+            f"ts_rank(m.{TSV_COLUMN}, q) AS score "
+            f"FROM messages m, to_tsquery('{TS_CONFIG}', :tsquery) q "
+            f"WHERE m.{TSV_COLUMN} @@ q{filters} "
+            f"ORDER BY score DESC, m.timestamp DESC, m.id DESC LIMIT :limit"
+        )
+    else:
+        return _like_statement(tokens, conversation_id, limit, since, until)
+
+    used = {name: value for name, value in params.items() if f":{name}" in sql}
+    return (
+        text(sql)
+        .bindparams(*(
+            bindparam(name, value, type_=DateTime() if name in ("since", "until") else None)
+            for name, value in used.items()
+        ))
+        .columns(**_RESULT_TYPES)
+    )
+
+
+def _like_statement(
+    tokens: List[str],
+    conversation_id: Optional[int],
+    limit: int,
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> Executable:
+    # 인덱스를 쓰지 못하므로 전체 스캔 (FTS5 없는 SQLite 등)
+    stmt = select(
+        Message.id,
+        Message.conversation_id,
+        Message.role,
+        Message.content,
+        Message.timestamp,
+        literal(None, type_=Float).label("score"),
+    )
+    for token in tokens:
+        stmt = stmt.where(Message.content.icontains(token, autoescape=True))
+    if conversation_id is not None:
+        stmt = stmt.where(Message.conversation_id == conversation_id)
+    if since is not None:
+        stmt = stmt.where(Message.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(Message.timestamp < until)
+    return stmt.order_by(desc(Message.timestamp), desc(Message.id)).limit(limit)
+
+
+def to_search_result(row) -> Dict:
+    """검색 결과 행 → dict"""
+    return {
+        "id": row.id,
+        "conversation_id": row.conversation_id,
+        "role": row.role,
+        "content": row.content,
+        "timestamp": row.timestamp,
+        "score": row.score,
+    }
@@ -0,0 +1,129 @@
+"""Database Migrations - 기존 DB에 새 컬럼 반영
+
+Base.metadata.create_all()은 없는 테이블만 만들고, 이미 있는 테이블에 추가된 컬럼/인덱스는 반영하지 않습니다.
+(예: messages.token_count, messages.tokenizer, ix_messages_conversation_timestamp_id)
+
+여기서는 모델에는 있지만 DB에는 없는 컬럼/인덱스를 추가합니다.
+- 컬럼: ALTER TABLE ... ADD COLUMN (NULL 허용이어야 함, 기존 행 값은 NULL)
+- 인덱스: CREATE INDEX (큰 테이블에서는 시간이 걸리므로 migrate_db.py로 미리 실행 권장)
+- 전문 검색 인덱스: SQLite FTS5 테이블 + 트리거 (fulltext.py)
+  PostgreSQL tsvector 컬럼 + GIN은 시작 경로에서 만들지 않음 → migrate_db.py --postgres (migrate_fulltext)
+- SQLite / PostgreSQL 공통
+- 비동기 엔진에서는 AsyncConnection.run_sync(migrate_connection)으로 실행
+"""
+
+import threading
+from typing import List, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .fulltext import ensure_fulltext
+from .models import Base
+
+
+# 이미 마이그레이션을 확인한 엔진 URL (프로세스당 1회만 검사)
+_MIGRATED: Set[str] = set()
+_MIGRATED_LOCK = threading.Lock()
+
+
+def _add_missing_columns(conn: Connection) -> List[str]:
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    added: List[str] = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_cols = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_cols:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def _add_missing_indexes(conn: Connection) -> List[str]:
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    created: List[str] = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind=conn)
+            created.append(index.name)
+
+    return created
+
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """
+    모델에 정의됐지만 DB 테이블에 없는 컬럼을 추가
+
+    Args:
+        engine: SQLAlchemy 엔진
+
+    Returns:
+        추가된 컬럼 목록 ["table.column", ...]
+    """
+    with engine.begin() as conn:
+        return _add_missing_columns(conn)
+
+
+def add_missing_indexes(engine: Engine) -> List[str]:
+    """
+    모델에 정의됐지만 DB에 없는 인덱스를 생성
+
+    Args:
+        engine: SQLAlchemy 엔진
+
+    Returns:
+        생성된 인덱스 이름 목록
+    """
+    with engine.begin() as conn:
+        return _add_missing_indexes(conn)
+
+
+def migrate_connection(conn: Connection) -> List[str]:
+    """
+    열린 연결(트랜잭션) 안에서 테이블 생성 + 누락 컬럼/인덱스 추가
+
+    Returns:
+        추가된 컬럼/인덱스 목록
+    """
+    Base.metadata.create_all(conn)
+    return _add_missing_columns(conn) + _add_missing_indexes(conn) + ensure_fulltext(conn)
+
+
+def migrate(engine: Engine) -> List[str]:
+    """
+    테이블 생성 + 누락 컬럼/인덱스 추가
+
+    Returns:
+        추가된 컬럼/인덱스 목록
+    """
+    with engine.begin() as conn:
+        return migrate_connection(conn)
+
+
+def ensure_migrated(engine: Engine) -> None:
+    """
+    엔진당 1회만 migrate() 실행 (init 스크립트를 다시 돌리지 않은 기존 DB 대비)
+
+    Args:
+        engine: SQLAlchemy 엔진
+    """
+    key = engine.url.render_as_string(hide_password=True)
+    with _MIGRATED_LOCK:
+        if key in _MIGRATED:
+            return
+        migrate(engine)
+        _MIGRATED.add(key)
@@ -1,6 +1,6 @@
 """Database Models - SQLAlchemy 모델 정의"""
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, JSON, CheckConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, JSON, CheckConstraint, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -34,19 +34,56 @@ class Message(Base):
     content = Column(Text, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     message_metadata = Column(JSON, nullable=True)  # 추가 정보 (토큰 수, 검색 사용 여부 등)
+    token_count = Column(Integer, nullable=True)  # content 토큰 수 (저장 시점에 미리 계산, 기존 행은 NULL)
+    tokenizer = Column(String(100), nullable=True)  # token_count를 센 토크나이저 (TokenCounter.name, 모르면 NULL)
     
     # 관계
     conversation = relationship("Conversation", back_populates="messages")
     
-    # 제약 조건
+    # 제약 조건 / 인덱스
     __table_args__ = (
         CheckConstraint("role IN ('system', 'user', 'assistant', 'tool', 'search')", name='check_role'),
+        # 대화별 최신순/keyset 페이지 조회 (conversation_id = ? ORDER BY timestamp, id)를 정렬 없이 인덱스로 처리
+        Index('ix_messages_conversation_timestamp_id', 'conversation_id', 'timestamp', 'id'),
     )
     
     def __repr__(self):
         return f"<Message(id={self.id}, conversation_id={self.conversation_id}, role='{self.role}')>"
 
 
+class MessageEmbedding(Base):
+    """메시지 임베딩 테이블 (장기 기억 벡터 검색용, VectorMemory)"""
+    __tablename__ = 'message_embeddings'
+    
+    message_id = Column(Integer, ForeignKey('messages.id', ondelete='CASCADE'), primary_key=True)
+    conversation_id = Column(Integer, ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False, index=True)
+    model = Column(String(100), nullable=False)  # 임베딩 모델 이름 (모델이 바뀌면 다시 임베딩)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32 리틀 엔디언 배열 (L2 정규화)
+    
+    def __repr__(self):
+        return f"<MessageEmbedding(message_id={self.message_id}, model='{self.model}', dim={self.dim})>"
+
+
+class ConversationSummary(Base):
+    """대화 요약 테이블 (토큰 예산 밖으로 밀려난 과거 메시지의 누적 요약, ConversationSummarizer)"""
+    __tablename__ = 'conversation_summaries'
+    
+    conversation_id = Column(Integer, ForeignKey('conversations.id', ondelete='CASCADE'), primary_key=True)
+    content = Column(Text, nullable=False)
+    covered_until_id = Column(Integer, nullable=False)  # 이 id까지의 메시지가 요약에 반영됨
+    token_count = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # 누적 비용 (요약 LLM 호출 수 / 입력·출력 토큰 추정치 / 반영한 메시지 수)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    messages_folded = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ConversationSummary(conversation_id={self.conversation_id}, covered_until_id={self.covered_until_id})>"
+
+
 def init_db(database_url: str = "sqlite:///data/chat.db"):
     """
     데이터베이스 초기화 (테이블 생성)
@@ -0,0 +1,97 @@
+"""Engine / Session 관리 (SQLite, PostgreSQL 공통)
+
+get_session()이 호출마다 새 엔진(= 새 커넥션 풀)을 만들면 서버에서 풀이 계속 생겼다 사라지고,
+하나의 Session을 여러 스레드가 같이 쓰게 될 위험이 있습니다.
+
+- cached_engine: URL(+ 옵션)별로 엔진을 프로세스에 1개만 생성해 재사용
+- get_session_factory: 엔진별 sessionmaker 캐시
+- get_scoped_session: 엔진별 scoped_session (스레드마다 별도 Session)
+- session_scope: with 블록 단위 작업 (성공 시 commit, 예외 시 rollback, 끝나면 close)
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+
+_ENGINES: Dict[Hashable, Engine] = {}
+_FACTORIES: Dict[Engine, sessionmaker] = {}
+_SCOPED: Dict[Engine, scoped_session] = {}
+_LOCK = threading.Lock()
+
+
+def cached_engine(key: Hashable, create: Callable[[], Engine]) -> Engine:
+    """
+    key별로 엔진을 1번만 생성해 재사용
+
+    Args:
+        key: 캐시 키 (URL + 풀 옵션 등)
+        create: 엔진 생성 함수 (캐시에 없을 때만 호출)
+    """
+    with _LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = create()
+            _ENGINES[key] = engine
+        return engine
+
+
+def get_session_factory(engine: Engine) -> sessionmaker:
+    """엔진별 sessionmaker (캐시)"""
+    with _LOCK:
+        factory = _FACTORIES.get(engine)
+        if factory is None:
+            factory = sessionmaker(bind=engine)
+            _FACTORIES[engine] = factory
+        return factory
+
+
+def get_scoped_session(engine: Engine) -> scoped_session:
+    """
+    엔진별 scoped_session (스레드마다 별도 Session을 돌려주는 프록시)
+
+    여러 스레드가 같은 MemoryManager를 써도 Session을 공유하지 않습니다.
+    요청이 끝나면 registry.remove()로 해당 스레드의 Session을 정리하세요.
+    """
+    factory = get_session_factory(engine)
+    with _LOCK:
+        registry = _SCOPED.get(engine)
+        if registry is None:
+            registry = scoped_session(factory)
+            _SCOPED[engine] = registry
+        return registry
+
+
+@contextmanager
+def session_scope(engine: Engine) -> Iterator[Session]:
+    """
+    작업 단위(unit of work) 세션
+
+    사용 예:
+        with session_scope(engine) as session:
+            session.add(...)
+    """
+    session = get_session_factory(engine)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def dispose_engines() -> None:
+    """캐시된 엔진의 커넥션 풀을 모두 정리 (테스트/종료 시)"""
+    with _LOCK:
+        for registry in _SCOPED.values():
+            registry.remove()
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+        _FACTORIES.clear()
+        _SCOPED.clear()
@@ -0,0 +1,241 @@
+"""Async Ollama Provider 구현
+
+동기 OllamaProvider와의 차이:
+- 요청마다 스레드를 붙잡지 않고 이벤트 루프 하나에서 수백 개의 세션을 동시에 처리
+- 요청마다 TCP 연결을 새로 열지 않고 keep-alive 커넥션 풀(httpx.AsyncClient)을 공유
+
+필요 패키지 (선택):
+- httpx (pip install httpx)
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .llm_provider import GenerationResult, LLMProvider
+from .ollama_provider import KeepAlive, build_chat_payload, parse_generation_result, parse_stream_chunk
+
+try:
+    import httpx
+except ImportError:  # 선택 의존성
+    httpx = None
+
+
+class AsyncOllamaProvider(LLMProvider):
+    """Ollama HTTP API를 비동기로 사용하는 LLM 프로바이더"""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama3",
+        timeout: float = 120,
+        connect_timeout: float = 5.0,
+        pool_size: int = 100,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 30.0,
+        client: Optional["httpx.AsyncClient"] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        num_ctx: Optional[int] = None
+    ):
+        """
+        Args:
+            base_url: Ollama 서버 URL
+            model: 사용할 모델 이름
+            timeout: 요청 타임아웃 (초, 응답 읽기 기준)
+            connect_timeout: 연결 타임아웃 (초)
+            pool_size: 최대 동시 연결 수
+            max_keepalive_connections: 유지할 keep-alive 연결 수 (기본값: pool_size)
+            keepalive_expiry: 유휴 keep-alive 연결 유지 시간 (초)
+            client: 공유할 httpx.AsyncClient (기본값: 새로 생성, 여러 프로바이더가 풀을 공유할 때 사용)
+            keep_alive: 요청 후 모델을 메모리에 유지할 시간 (기본값: None, Ollama 기본값 5분)
+            num_ctx: 컨텍스트 창 크기 (기본값: None, 모델 기본값)
+        """
+        if httpx is None:
+            raise ImportError("AsyncOllamaProvider requires httpx: pip install httpx")
+
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.chat_endpoint = f"{self.base_url}/api/chat"
+
+        # 외부에서 받은 클라이언트는 닫지 않음 (소유자가 관리)
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=(
+                    max_keepalive_connections
+                    if max_keepalive_connections is not None
+                    else pool_size
+                ),
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+
+    def _request_timeout(self, timeout: Optional[float]) -> Any:
+        # 요청별 타임아웃이 없으면 클라이언트 기본값 사용
+        if timeout is None:
+            return httpx.USE_CLIENT_DEFAULT
+        return httpx.Timeout(timeout, connect=self.client.timeout.connect)
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Ollama /api/chat 요청 페이로드 구성 (build_chat_payload 참고, 호출별 keep_alive/num_ctx 우선)"""
+        kwargs.setdefault("keep_alive", self.keep_alive)
+        kwargs.setdefault("num_ctx", self.num_ctx)
+        return build_chat_payload(
+            self.model,
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream,
+            **kwargs
+        )
+
+    async def generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> str:
+        """
+        Ollama API를 통해 LLM 응답 생성 (비동기)
+
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (기본값: None, Ollama 기본값 사용)
+            max_tokens: 최대 토큰 수 (기본값: None, Ollama 기본값 사용)
+            timeout: 이 요청에만 적용할 타임아웃 (초)
+            **kwargs: 추가 Ollama 옵션
+
+        Returns:
+            생성된 응답 텍스트
+        """
+        result = await self.generate_result(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            **kwargs
+        )
+        return result.text
+
+    async def generate_result(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> GenerationResult:
+        """
+        Ollama API를 통해 LLM 응답 생성 (비동기, 텍스트 + 토큰 수/시간 정보)
+
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (기본값: None, Ollama 기본값 사용)
+            max_tokens: 최대 토큰 수 (기본값: None, Ollama 기본값 사용)
+            timeout: 이 요청에만 적용할 타임아웃 (초)
+            **kwargs: 추가 Ollama 옵션
+
+        Returns:
+            GenerationResult (prompt_eval_count, eval_count, *_duration 포함)
+        """
+        payload = self._build_payload(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=False,
+            **kwargs
+        )
+
+        try:
+            response = await self.client.post(
+                self.chat_endpoint,
+                json=payload,
+                timeout=self._request_timeout(timeout)
+            )
+            response.raise_for_status()
+
+            # Ollama API 응답에서 메시지와 사용량/시간 정보 추출
+            return parse_generation_result(response.json())
+
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama API request failed: {e}") from e
+
+    async def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[GenerationResult], None]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Ollama API 스트리밍 모드로 응답 조각을 도착하는 대로 반환 (비동기)
+
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (기본값: None, Ollama 기본값 사용)
+            max_tokens: 최대 토큰 수 (기본값: None, Ollama 기본값 사용)
+            timeout: 이 요청에만 적용할 타임아웃 (초)
+            on_result: 마지막 줄을 받으면 전체 텍스트 + 사용량/시간 정보로 호출할 함수 (선택사항)
+            **kwargs: 추가 Ollama 옵션
+
+        Yields:
+            생성된 응답 텍스트 조각
+        """
+        payload = self._build_payload(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **kwargs
+        )
+
+        try:
+            async with self.client.stream(
+                "POST",
+                self.chat_endpoint,
+                json=payload,
+                timeout=self._request_timeout(timeout)
+            ) as response:
+                response.raise_for_status()
+
+                chunks: List[str] = []
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = parse_stream_chunk(line)
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        chunks.append(content)
+                        yield content
+                    if chunk.get("done"):
+                        if on_result is not None:
+                            on_result(parse_generation_result(chunk, text="".join(chunks)))
+                        break
+
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama API request failed: {e}") from e
+
+    async def aclose(self):
+        """커넥션 풀 정리 (직접 생성한 클라이언트만 닫음)"""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncOllamaProvider":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
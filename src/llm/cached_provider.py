@@ -0,0 +1,290 @@
+"""Caching LLM Provider - 결정적(temperature=0) 호출 응답 캐시
+
+step7의 라우터/SQL 생성처럼 temperature=0.0 + 동일 프롬프트 호출은
+같은 입력이면 같은 출력이므로, 이미 받은 답을 다시 추론할 필요가 없습니다.
+
+- 캐시 키: (model, messages, max_tokens, 옵션)의 SHA-256 해시
+- temperature가 정확히 0일 때만 캐시 (None은 모델 기본값이므로 캐시하지 않음)
+- 백엔드: 인메모리 LRU / SQLite 파일 (TTL, 최대 항목 수 기반 제거)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .llm_provider import GenerationResult, LLMProvider
+
+
+class InMemoryLRUCache:
+    """프로세스 메모리 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl: 항목 유효 시간 (초, None이면 만료 없음)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, created_at = item
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteResponseCache:
+    """SQLite 파일 캐시 (프로세스 재시작 후에도 유지)"""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        """
+        Args:
+            path: SQLite 파일 경로
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl: 항목 유효 시간 (초, None이면 만료 없음)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            # 최대 항목 수 초과분은 최근 사용 시각이 오래된 순으로 제거
+            self._conn.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache
+                    ORDER BY last_access DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (int(self.max_entries),),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class CachingLLMProvider(LLMProvider):
+    """다른 LLMProvider를 감싸 결정적 호출의 응답을 캐시하는 데코레이터"""
+
+    def __init__(self, provider: LLMProvider, cache: Optional[Any] = None):
+        """
+        Args:
+            provider: 실제 호출을 수행할 LLM 프로바이더
+            cache: 캐시 백엔드 (InMemoryLRUCache / SQLiteResponseCache, 기본값: InMemoryLRUCache)
+        """
+        self.provider = provider
+        self.cache = cache if cache is not None else InMemoryLRUCache()
+        self.model = getattr(provider, "model", type(provider).__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0  # temperature != 0 이라 캐시를 쓰지 않은 호출
+
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int],
+        kwargs: Dict[str, Any]
+    ) -> str:
+        raw = json.dumps(
+            {
+                "model": self.model,
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "options": kwargs,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _is_cacheable(temperature: Optional[float]) -> bool:
+        return temperature is not None and float(temperature) == 0.0
+
+    def generate(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """
+        캐시를 먼저 확인하고, 없으면 실제 프로바이더로 응답 생성
+
+        Args:
+            messages: 메시지 리스트
+            temperature: 생성 온도 (0일 때만 캐시)
+            max_tokens: 최대 토큰 수
+            **kwargs: 추가 옵션 (캐시 키에 포함)
+
+        Returns:
+            생성된(또는 캐시된) 응답 텍스트
+        """
+        return self.generate_result(
+            messages, temperature=temperature, max_tokens=max_tokens, **kwargs
+        ).text
+
+    def generate_result(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> GenerationResult:
+        """
+        generate()와 같지만 GenerationResult 반환
+        (캐시 적중 시 텍스트만 채움, 추론하지 않았으므로 토큰 수/시간 정보 없음)
+        """
+        if not self._is_cacheable(temperature):
+            self.bypassed += 1
+            return self.provider.generate_result(
+                messages, temperature=temperature, max_tokens=max_tokens, **kwargs
+            )
+
+        key = self._cache_key(messages, max_tokens, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return GenerationResult(text=cached, model=getattr(self.provider, "model", None))
+
+        self.misses += 1
+        result = self.provider.generate_result(
+            messages, temperature=temperature, max_tokens=max_tokens, **kwargs
+        )
+        self.cache.set(key, result.text)
+        return result
+
+    def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_result: Optional[Callable[[GenerationResult], None]] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        캐시 적중 시 캐시된 응답을 한 조각으로, 아니면 실제 스트림을 그대로 반환
+        (스트림이 끝까지 소비된 경우에만 캐시에 저장)
+        """
+        if not self._is_cacheable(temperature):
+            self.bypassed += 1
+            yield from self.provider.generate_stream(
+                messages, temperature=temperature, max_tokens=max_tokens, on_result=on_result, **kwargs
+            )
+            return
+
+        key = self._cache_key(messages, max_tokens, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            if on_result is not None:
+                on_result(GenerationResult(text=cached, model=getattr(self.provider, "model", None)))
+            yield cached
+            return
+
+        self.misses += 1
+        chunks: List[str] = []
+        for chunk in self.provider.generate_stream(
+            messages, temperature=temperature, max_tokens=max_tokens, on_result=on_result, **kwargs
+        ):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(key, "".join(chunks))
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/미스 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self.cache),
+        }
@@ -0,0 +1,116 @@
+"""Embedding 유틸
+
+임베딩 함수는 "텍스트 리스트 → 벡터 리스트" 형태의 callable 입니다.
+- OllamaEmbedder: Ollama /api/embed 사용 (예: nomic-embed-text)
+- HashingEmbedder: 외부 모델 없이 문자 n-gram 해싱으로 만드는 로컬 임베딩 (오프라인/테스트용)
+
+반환 벡터는 모두 L2 정규화되어 있어 내적 = 코사인 유사도 입니다.
+"""
+
+import hashlib
+import math
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def normalize(vector: Sequence[float]) -> List[float]:
+    """L2 정규화 (영벡터는 그대로 반환)"""
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return list(vector)
+    return [v / norm for v in vector]
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """코사인 유사도 (정규화 여부와 무관하게 계산)"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def top_similar(
+    query: Sequence[float],
+    vectors: Sequence[Sequence[float]],
+    k: int = 1
+) -> List[Tuple[int, float]]:
+    """
+    정규화된 벡터들 중 query와 가장 유사한 k개 반환
+
+    Args:
+        query: 정규화된 질의 벡터
+        vectors: 정규화된 후보 벡터 리스트 (또는 (n, dim) numpy 배열, 변환 없이 그대로 사용)
+        k: 반환 개수
+
+    Returns:
+        [(인덱스, 유사도), ...] (유사도 내림차순)
+    """
+    if len(vectors) == 0 or k <= 0:
+        return []
+    if np is not None:
+        scores = np.asarray(vectors, dtype=np.float32) @ np.asarray(query, dtype=np.float32)
+        k = min(k, len(scores))
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [(int(i), float(scores[i])) for i in idx]
+    scored = [
+        (i, sum(x * y for x, y in zip(query, v)))
+        for i, v in enumerate(vectors)
+    ]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:k]
+
+
+class HashingEmbedder:
+    """문자 n-gram 해싱 기반 로컬 임베딩 (모델 불필요)"""
+
+    def __init__(self, dim: int = 512, ngram_range: Tuple[int, int] = (1, 3)):
+        """
+        Args:
+            dim: 벡터 차원
+            ngram_range: 사용할 문자 n-gram 길이 범위 (최소, 최대)
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        # 공백 차이는 무시 (한국어 띄어쓰기 흔들림 대응)
+        compact = "".join((text or "").lower().split())
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(compact) - n + 1):
+                gram = compact[i:i + n]
+                digest = hashlib.md5(gram.encode("utf-8")).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vector[bucket] += sign
+        return normalize(vector)
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(t) for t in texts]
+
+
+class OllamaEmbedder:
+    """Ollama 임베딩 엔드포인트를 사용하는 임베딩 함수"""
+
+    def __init__(self, provider, model: Optional[str] = "nomic-embed-text"):
+        """
+        Args:
+            provider: embed() 메서드를 가진 OllamaProvider
+            model: 임베딩 모델 이름
+        """
+        self.provider = provider
+        self.model = model
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        return [normalize(v) for v in self.provider.embed(texts, model=self.model)]
@@ -0,0 +1,131 @@
+"""Generation Metrics - 모델별 추론 시간 집계
+
+GenerationResult.to_metadata()를 Message.message_metadata["generation"]에 기록해 두면
+(ChatManagerWithDB가 assistant 메시지를 저장할 때 기록) 모델별로 다음을 집계할 수 있습니다.
+- 생성 속도: completion_tokens / eval 시간 (tokens/s)
+- 프롬프트 평가 속도와 전체 시간 중 프롬프트 평가 비율 (prompt_eval_share)
+  → 비율이 높으면 프롬프트가 길거나 앞부분 재사용(KV 캐시)이 안 되고 있음
+- 모델 로딩 지연(load stall): load_duration이 load_stall_ms 이상인 호출 수와 시간
+  → 자주 보이면 keep_alive가 짧거나 여러 모델이 메모리를 번갈아 차지하고 있음
+
+    report = memory_manager.generation_report()
+    print(format_generation_report(report))
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from .llm_provider import GenerationResult
+
+
+METADATA_KEY = "generation"
+
+# 이보다 긴 모델 로딩은 요청을 막은 것으로 셈 (이미 올라와 있으면 보통 수 ms)
+LOAD_STALL_MS = 250.0
+
+
+def generation_metadata(result: GenerationResult, message_metadata: Optional[Dict] = None) -> Dict:
+    """message_metadata에 GenerationResult의 사용량/시간 정보를 추가"""
+    metadata = dict(message_metadata or {})
+    metadata[METADATA_KEY] = result.to_metadata()
+    return metadata
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def aggregate_generations(
+    records: Iterable[Optional[Dict[str, Any]]],
+    load_stall_ms: float = LOAD_STALL_MS
+) -> Dict[str, Dict[str, Any]]:
+    """
+    모델별 추론 시간 집계
+
+    Args:
+        records: GenerationResult.to_metadata() 형식의 dict (None은 건너뜀)
+        load_stall_ms: 모델 로딩 지연으로 볼 최소 load 시간 (밀리초)
+
+    Returns:
+        {model: {"calls", "prompt_tokens", "completion_tokens", "tokens_per_second",
+                 "prompt_tokens_per_second", "prompt_eval_share", "mean_total_ms", "max_total_ms",
+                 "load_stalls", "load_stall_ms", "max_load_ms"}, ...}
+    """
+    totals: Dict[str, Dict[str, float]] = {}
+    for record in records:
+        if not record:
+            continue
+        model = record.get("model") or "unknown"
+        t = totals.setdefault(model, {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "eval_tokens": 0, "eval_ms": 0.0, "prompt_eval_tokens": 0, "prompt_eval_ms": 0.0,
+            "timed_total_ms": 0.0, "timed_prompt_eval_ms": 0.0, "total_ms": 0.0, "timed_calls": 0,
+            "max_total_ms": 0.0, "load_stalls": 0, "load_stall_ms": 0.0, "max_load_ms": 0.0,
+        })
+        t["calls"] += 1
+        prompt_tokens = record.get("prompt_tokens") or 0
+        completion_tokens = record.get("completion_tokens") or 0
+        t["prompt_tokens"] += prompt_tokens
+        t["completion_tokens"] += completion_tokens
+
+        # 속도는 토큰 수와 시간이 둘 다 있는 호출만으로 계산 (캐시 적중 등 시간 정보가 없는 호출 제외)
+        if record.get("eval_ms"):
+            t["eval_tokens"] += completion_tokens
+            t["eval_ms"] += record["eval_ms"]
+        if record.get("prompt_eval_ms"):
+            t["prompt_eval_tokens"] += prompt_tokens
+            t["prompt_eval_ms"] += record["prompt_eval_ms"]
+
+        total_ms = record.get("total_ms")
+        if total_ms:
+            t["timed_calls"] += 1
+            t["total_ms"] += total_ms
+            t["max_total_ms"] = max(t["max_total_ms"], total_ms)
+            if record.get("prompt_eval_ms") is not None:
+                t["timed_total_ms"] += total_ms
+                t["timed_prompt_eval_ms"] += record["prompt_eval_ms"]
+
+        load_ms = record.get("load_ms") or 0.0
+        t["max_load_ms"] = max(t["max_load_ms"], load_ms)
+        if load_ms >= load_stall_ms:
+            t["load_stalls"] += 1
+            t["load_stall_ms"] += load_ms
+
+    report = {}
+    for model, t in sorted(totals.items()):
+        tokens_per_second = _ratio(t["eval_tokens"], t["eval_ms"] / 1000)
+        prompt_tokens_per_second = _ratio(t["prompt_eval_tokens"], t["prompt_eval_ms"] / 1000)
+        report[model] = {
+            "calls": int(t["calls"]),
+            "prompt_tokens": int(t["prompt_tokens"]),
+            "completion_tokens": int(t["completion_tokens"]),
+            "tokens_per_second": tokens_per_second,
+            "prompt_tokens_per_second": prompt_tokens_per_second,
+            "prompt_eval_share": _ratio(t["timed_prompt_eval_ms"], t["timed_total_ms"]),
+            "mean_total_ms": _ratio(t["total_ms"], t["timed_calls"]),
+            "max_total_ms": t["max_total_ms"],
+            "load_stalls": int(t["load_stalls"]),
+            "load_stall_ms": t["load_stall_ms"],
+            "max_load_ms": t["max_load_ms"],
+        }
+    return report
+
+
+def format_generation_report(report: Dict[str, Dict[str, Any]]) -> str:
+    """aggregate_generations 결과를 표로 출력"""
+
+    def fmt(value: Optional[float], spec: str) -> str:
+        if value is None:
+            return "-".rjust(int(spec.split(".")[0]))
+        return format(value, spec)
+
+    lines = [
+        f"{'model':<24} {'calls':>6} {'tok/s':>8} {'prompt tok/s':>13} {'prompt share':>13} "
+        f"{'mean ms':>9} {'load stalls':>12} {'stall ms':>10}"
+    ]
+    for model, row in report.items():
+        lines.append(
+            f"{model:<24} {row['calls']:>6} {fmt(row['tokens_per_second'], '8.1f')} "
+            f"{fmt(row['prompt_tokens_per_second'], '13.1f')} {fmt(row['prompt_eval_share'], '13.1%')} "
+            f"{fmt(row['mean_total_ms'], '9.1f')} {row['load_stalls']:>12} {row['load_stall_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -1,7 +1,46 @@
 """LLM Provider 추상화 계층"""
 
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, List, Dict, Iterator, Optional
+
+
+@dataclass
+class GenerationResult:
+    """
+    응답 텍스트 + 사용량/시간 정보 (generate_result)
+    
+    시간은 밀리초, 프로바이더가 알려주지 않는 값은 None
+    (Ollama: total_duration / load_duration / prompt_eval_* / eval_*)
+    """
+    text: str
+    model: Optional[str] = None
+    prompt_tokens: Optional[int] = None      # 실제로 평가한 프롬프트 토큰 수 (KV 캐시로 건너뛴 부분 제외)
+    completion_tokens: Optional[int] = None  # 생성한 토큰 수
+    total_ms: Optional[float] = None         # 요청 전체 (모델 로딩 포함)
+    load_ms: Optional[float] = None          # 모델 로딩 (메모리에 없었을 때 지연)
+    prompt_eval_ms: Optional[float] = None   # 프롬프트 평가
+    eval_ms: Optional[float] = None          # 토큰 생성
+    done_reason: Optional[str] = None        # "stop", "length" 등
+    
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """생성 속도 (completion_tokens / eval_ms)"""
+        if not self.completion_tokens or not self.eval_ms:
+            return None
+        return self.completion_tokens / (self.eval_ms / 1000)
+    
+    @property
+    def prompt_eval_share(self) -> Optional[float]:
+        """전체 시간 중 프롬프트 평가 비율"""
+        if self.prompt_eval_ms is None or not self.total_ms:
+            return None
+        return self.prompt_eval_ms / self.total_ms
+    
+    def to_metadata(self) -> Dict[str, Any]:
+        """Message.message_metadata에 기록할 값 (text와 None 제외)"""
+        return {key: value for key, value in asdict(self).items() if key != "text" and value is not None}
 
 
 class LLMProvider(ABC):
@@ -28,4 +67,71 @@ class LLMProvider(ABC):
             생성된 응답 텍스트
         """
         pass
-
+    
+    def generate_result(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> GenerationResult:
+        """
+        응답 텍스트와 사용량/시간 정보를 함께 반환
+        
+        사용량을 알려주지 않는 프로바이더는 generate() 결과와 전체 소요 시간만 채웁니다.
+        
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (0.0 ~ 1.0)
+            max_tokens: 최대 토큰 수
+            **kwargs: 추가 옵션
+            
+        Returns:
+            GenerationResult
+        """
+        started = time.perf_counter()
+        text = self.generate(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        return GenerationResult(
+            text=text,
+            model=getattr(self, "model", None),
+            total_ms=(time.perf_counter() - started) * 1000
+        )
+    
+    def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_result: Optional[Callable[[GenerationResult], None]] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        LLM 응답을 생성되는 대로 조각(chunk) 단위로 반환
+        
+        스트리밍을 지원하지 않는 프로바이더는 generate() 결과를
+        하나의 조각으로 돌려줍니다.
+        
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (0.0 ~ 1.0)
+            max_tokens: 최대 토큰 수
+            on_result: 스트림이 끝나면 전체 텍스트 + 사용량/시간 정보로 호출할 함수 (선택사항)
+            **kwargs: 추가 옵션
+            
+        Yields:
+            생성된 응답 텍스트 조각
+        """
+        result = self.generate_result(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        if on_result is not None:
+            on_result(result)
+        yield result.text
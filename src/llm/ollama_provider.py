@@ -1,8 +1,135 @@
 """Ollama Provider 구현"""
 
+import json
 import requests
-from typing import List, Dict, Optional
-from .llm_provider import LLMProvider
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Callable, List, Dict, Iterator, Optional, Tuple, Union
+from .llm_provider import GenerationResult, LLMProvider
+
+
+# keep_alive: 요청 후 모델을 메모리에 유지할 시간 ("5m", "1h", 초 단위 숫자, -1 = 계속 유지, 0 = 즉시 내림)
+KeepAlive = Union[str, int, float]
+
+
+def build_chat_payload(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    stream: bool = False,
+    keep_alive: Optional[KeepAlive] = None,
+    num_ctx: Optional[int] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Ollama /api/chat 요청 페이로드 구성 (동기/비동기 프로바이더 공용)
+    
+    Args:
+        model: 모델 이름
+        messages: 메시지 리스트
+        temperature: 생성 온도
+        max_tokens: 최대 토큰 수
+        stream: 스트리밍 여부
+        keep_alive: 요청 후 모델(과 KV 캐시)을 메모리에 유지할 시간
+        num_ctx: 컨텍스트 창 크기 (ContextAssembler.max_tokens와 맞춰야 앞부분이 잘리지 않음)
+        **kwargs: 추가 Ollama 옵션
+        
+    Returns:
+        요청 페이로드
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": stream,
+    }
+    
+    # 옵션이 제공된 경우만 추가
+    if temperature is not None:
+        payload["options"] = payload.get("options", {})
+        payload["options"]["temperature"] = temperature
+    
+    if max_tokens is not None:
+        payload["options"] = payload.get("options", {})
+        payload["options"]["num_predict"] = max_tokens
+    
+    if num_ctx is not None:
+        payload["options"] = payload.get("options", {})
+        payload["options"]["num_ctx"] = num_ctx
+    
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    
+    # kwargs의 options도 병합
+    if "options" in kwargs:
+        payload["options"] = {**payload.get("options", {}), **kwargs["options"]}
+    
+    return payload
+
+
+def parse_stream_chunk(line) -> Dict[str, Any]:
+    """
+    스트리밍 응답(NDJSON)의 한 줄을 dict로 해석 (마지막 줄에는 사용량/시간 정보가 있음)
+    
+    Args:
+        line: JSON 한 줄 (str 또는 bytes)
+        
+    Returns:
+        응답 조각 dict
+    """
+    chunk = json.loads(line)
+    
+    if "error" in chunk:
+        raise RuntimeError(f"Ollama API error: {chunk['error']}")
+    
+    return chunk
+
+
+def parse_stream_line(line) -> Tuple[str, bool]:
+    """
+    스트리밍 응답(NDJSON)의 한 줄을 해석
+    
+    Args:
+        line: JSON 한 줄 (str 또는 bytes)
+        
+    Returns:
+        (응답 텍스트 조각, 마지막 줄 여부)
+    """
+    chunk = parse_stream_chunk(line)
+    content = chunk.get("message", {}).get("content", "")
+    return content, bool(chunk.get("done"))
+
+
+def _ns_to_ms(value: Optional[int]) -> Optional[float]:
+    return None if value is None else value / 1e6
+
+
+def parse_generation_result(result: Dict[str, Any], text: Optional[str] = None) -> GenerationResult:
+    """
+    Ollama /api/chat 응답(또는 스트림의 마지막 줄) → GenerationResult
+    
+    Args:
+        result: 응답 JSON (시간 값은 나노초)
+        text: 응답 텍스트 (스트리밍에서 조각을 모은 경우, 기본값: result["message"]["content"])
+        
+    Returns:
+        GenerationResult
+    """
+    if text is None:
+        if "message" not in result or "content" not in result["message"]:
+            raise ValueError(f"Unexpected response format: {result}")
+        text = result["message"]["content"]
+    return GenerationResult(
+        text=text,
+        model=result.get("model"),
+        prompt_tokens=result.get("prompt_eval_count"),
+        completion_tokens=result.get("eval_count"),
+        total_ms=_ns_to_ms(result.get("total_duration")),
+        load_ms=_ns_to_ms(result.get("load_duration")),
+        prompt_eval_ms=_ns_to_ms(result.get("prompt_eval_duration")),
+        eval_ms=_ns_to_ms(result.get("eval_duration")),
+        done_reason=result.get("done_reason"),
+    )
 
 
 class OllamaProvider(LLMProvider):
@@ -12,18 +139,126 @@ class OllamaProvider(LLMProvider):
         self,
         base_url: str = "http://localhost:11434",
         model: str = "llama3",
-        timeout: int = 120
+        timeout: int = 120,
+        pool_maxsize: int = 10,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        session: Optional[requests.Session] = None,
+        keep_alive: Optional[KeepAlive] = None,
+        num_ctx: Optional[int] = None
     ):
         """
         Args:
             base_url: Ollama 서버 URL
             model: 사용할 모델 이름
             timeout: 요청 타임아웃 (초)
+            pool_maxsize: 호스트당 유지할 keep-alive 연결 수
+            max_retries: 연결 실패/일시적 오류(502/503/504) 재시도 횟수
+            backoff_factor: 재시도 간격 계수 (backoff_factor * 2^(n-1) 초)
+            session: 공유할 requests.Session (기본값: 새로 생성)
+            keep_alive: 요청 후 모델을 메모리에 유지할 시간 (기본값: None, Ollama 기본값 5분)
+                모델이 내려가면 KV 캐시도 사라져 다음 요청에서 프롬프트 전체를 다시 평가함
+            num_ctx: 컨텍스트 창 크기 (기본값: None, 모델 기본값)
         """
         self.base_url = base_url.rstrip('/')
         self.model = model
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
         self.chat_endpoint = f"{self.base_url}/api/chat"
+        self.embed_endpoint = f"{self.base_url}/api/embed"
+        
+        # 요청마다 TCP 연결을 새로 열지 않도록 세션(커넥션 풀)을 재사용
+        self._owns_session = session is None
+        self.session = session or self._create_session(
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor
+        )
+    
+    @staticmethod
+    def _create_session(
+        pool_maxsize: int,
+        max_retries: int,
+        backoff_factor: float
+    ) -> requests.Session:
+        """커넥션 풀 + 재시도 설정이 적용된 세션 생성"""
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,  # 생성 도중 끊긴 요청은 재시도하지 않음 (중복 생성 방지)
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def close(self):
+        """커넥션 풀 정리 (직접 생성한 세션만 닫음)"""
+        if self._owns_session:
+            self.session.close()
+    
+    def __enter__(self) -> "OllamaProvider":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _build_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Ollama /api/chat 요청 페이로드 구성 (build_chat_payload 참고, 호출별 keep_alive/num_ctx 우선)"""
+        kwargs.setdefault("keep_alive", self.keep_alive)
+        kwargs.setdefault("num_ctx", self.num_ctx)
+        return build_chat_payload(
+            self.model,
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream,
+            **kwargs
+        )
+    
+    def load(self, keep_alive: Optional[KeepAlive] = None) -> None:
+        """
+        모델을 미리 메모리에 올림 (첫 요청의 모델 로딩 지연 제거)
+        
+        Args:
+            keep_alive: 유지 시간 (기본값: self.keep_alive)
+        """
+        self._post_control(self.keep_alive if keep_alive is None else keep_alive)
+    
+    def unload(self) -> None:
+        """모델을 메모리에서 내림 (keep_alive=0)"""
+        self._post_control(0)
+    
+    def _post_control(self, keep_alive: Optional[KeepAlive]) -> None:
+        # 메시지 없이 보내면 Ollama는 생성 없이 모델 로드/언로드만 수행
+        payload = self._build_payload([], keep_alive=keep_alive)
+        try:
+            response = self.session.post(
+                self.chat_endpoint,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Ollama API request failed: {e}") from e
     
     def generate(
         self,
@@ -44,42 +279,145 @@ class OllamaProvider(LLMProvider):
         Returns:
             생성된 응답 텍스트
         """
+        return self.generate_result(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        ).text
+    
+    def generate_result(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> GenerationResult:
+        """
+        Ollama API를 통해 LLM 응답 생성 (텍스트 + 토큰 수/시간 정보)
+        
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (기본값: None, Ollama 기본값 사용)
+            max_tokens: 최대 토큰 수 (기본값: None, Ollama 기본값 사용)
+            **kwargs: 추가 Ollama 옵션
+            
+        Returns:
+            GenerationResult (prompt_eval_count, eval_count, *_duration 포함)
+        """
         # Ollama API 요청 페이로드 구성
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "stream": False,  # 스트리밍은 나중에 구현
-        }
+        payload = self._build_payload(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=False,
+            **kwargs
+        )
         
-        # 옵션이 제공된 경우만 추가
-        if temperature is not None:
-            payload["options"] = payload.get("options", {})
-            payload["options"]["temperature"] = temperature
+        try:
+            response = self.session.post(
+                self.chat_endpoint,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            
+            # Ollama API 응답에서 메시지와 사용량/시간 정보 추출
+            return parse_generation_result(response.json())
+                
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Ollama API request failed: {e}") from e
+    
+    def generate_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        on_result: Optional[Callable[[GenerationResult], None]] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Ollama API 스트리밍 모드로 응답 조각을 도착하는 대로 반환
         
-        if max_tokens is not None:
-            payload["options"] = payload.get("options", {})
-            payload["options"]["num_predict"] = max_tokens
+        Ollama는 "stream": true일 때 줄 단위 JSON(NDJSON)을 보내며,
+        마지막 줄은 "done": true 이고 사용량/시간 정보를 담고 있습니다.
         
-        # kwargs의 options도 병합
-        if "options" in kwargs:
-            payload["options"] = {**payload.get("options", {}), **kwargs["options"]}
+        Args:
+            messages: 메시지 리스트 [{"role": "user", "content": "..."}, ...]
+            temperature: 생성 온도 (기본값: None, Ollama 기본값 사용)
+            max_tokens: 최대 토큰 수 (기본값: None, Ollama 기본값 사용)
+            on_result: 마지막 줄을 받으면 전체 텍스트 + 사용량/시간 정보로 호출할 함수 (선택사항)
+            **kwargs: 추가 Ollama 옵션
+            
+        Yields:
+            생성된 응답 텍스트 조각
+        """
+        payload = self._build_payload(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **kwargs
+        )
         
         try:
-            response = requests.post(
+            with self.session.post(
                 self.chat_endpoint,
                 json=payload,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                
+                chunks: List[str] = []
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = parse_stream_chunk(line)
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        chunks.append(content)
+                        yield content
+                    if chunk.get("done"):
+                        if on_result is not None:
+                            on_result(parse_generation_result(chunk, text="".join(chunks)))
+                        break
+                        
+        except requests.exceptions.RequestException as e:
+            raise RuntimeError(f"Ollama API request failed: {e}") from e
+    
+    def embed(
+        self,
+        texts: List[str],
+        model: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Ollama /api/embed로 텍스트 임베딩 생성
+        
+        Args:
+            texts: 임베딩할 텍스트 리스트
+            model: 임베딩 모델 (기본값: 생성 모델과 동일, 예: "nomic-embed-text")
+            
+        Returns:
+            텍스트별 임베딩 벡터 리스트
+        """
+        payload = {
+            "model": model or self.model,
+            "input": list(texts),
+        }
+        
+        try:
+            response = self.session.post(
+                self.embed_endpoint,
+                json=payload,
                 timeout=self.timeout
             )
             response.raise_for_status()
             
             result = response.json()
-            
-            # Ollama API 응답에서 메시지 추출
-            if "message" in result and "content" in result["message"]:
-                return result["message"]["content"]
-            else:
+            if "embeddings" not in result:
                 raise ValueError(f"Unexpected response format: {result}")
+            return result["embeddings"]
                 
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Ollama API request failed: {e}") from e
-
@@ -0,0 +1,260 @@
+"""Token Counter - 프롬프트 토큰 수 계산
+
+len(text) / 4 추정은 영어 기준이라 한국어처럼 글자당 토큰이 많은 텍스트에서는
+실제보다 3~4배 적게 잡혀 컨텍스트를 넘치게 됩니다.
+
+토큰 카운터는 "텍스트 → 토큰 수" callable 입니다 (MemoryManager의 token_estimator로도 사용).
+- HFTokenCounter: 모델의 실제 토크나이저 (tokenizers 패키지, 예: "Qwen/Qwen2.5-7B-Instruct")
+- ScriptTokenCounter: 문자 종류(한글/한자·가나/라틴/기호...)별 토큰 비율로 추정 (calibrate로 보정 가능)
+- CachedTokenCounter: 내용 해시 기반 LRU 캐시 + 배치 계산 (캐시에 없는 것만 한 번에 토큰화)
+
+get_token_counter()는 토크나이저를 불러올 수 있으면 HFTokenCounter, 아니면 ScriptTokenCounter를
+캐시로 감싸서 반환합니다. 기본 토크나이저는 LLM_TOKENIZER 환경 변수로 지정합니다.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # 선택 의존성
+    Tokenizer = None
+
+
+logger = logging.getLogger(__name__)
+
+# 문자 종류별 정규식 (C 수준 findall로 세기 위해 문자 단위 루프 대신 사용)
+_SCRIPT_PATTERNS = {
+    # 한글 음절 / 자모 / 호환 자모
+    "hangul": re.compile(r"[\uac00-\ud7a3\u1100-\u11ff\u3130-\u318f]"),
+    # 가나 / 한자
+    "cjk": re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]"),
+    "latin": re.compile(r"[A-Za-z0-9]"),
+    "space": re.compile(r"\s"),
+    "punct": re.compile(r"[!-/:-@\[-`{-~]"),
+    # 라틴 확장/그리스/키릴 등 (U+0080 ~ U+1FFF 중 공백·한글 자모 제외)
+    "alphabet": re.compile(r"[\u0080-\u009f\u00a1-\u10ff\u1200-\u167f\u1681-\u1fff]"),
+}
+
+# 문자 1개당 토큰 수 (Llama 3 / Qwen 2.5 계열 BPE 토크나이저 기준 대략값)
+DEFAULT_SCRIPT_RATES = {
+    "hangul": 1.0,
+    "cjk": 1.2,
+    "latin": 0.25,
+    "space": 0.0,
+    "punct": 0.5,
+    "alphabet": 0.4,
+    "other": 1.5,  # 이모지 등 (UTF-8 바이트 단위로 쪼개짐)
+}
+
+
+class TokenCounter(ABC):
+    """토큰 카운터 인터페이스"""
+
+    name: str = "token-counter"
+
+    @abstractmethod
+    def count_batch(self, texts: List[str]) -> List[int]:
+        """
+        여러 텍스트의 토큰 수
+
+        Args:
+            texts: 텍스트 리스트
+
+        Returns:
+            토큰 수 리스트 (texts와 같은 순서)
+        """
+        pass
+
+    def count(self, text: str) -> int:
+        """텍스트 1개의 토큰 수"""
+        return self.count_batch([text or ""])[0]
+
+    def __call__(self, text: str) -> int:
+        return self.count(text)
+
+
+class ScriptTokenCounter(TokenCounter):
+    """문자 종류별 비율로 토큰 수를 추정하는 카운터 (토크나이저 불필요)"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, chars_per_token: float = 4.0):
+        """
+        Args:
+            rates: 문자 종류별 문자당 토큰 수 (기본값: DEFAULT_SCRIPT_RATES)
+            chars_per_token: 영문/숫자의 토큰당 문자 수 (rates에 latin이 없을 때 사용)
+        """
+        self.rates = dict(DEFAULT_SCRIPT_RATES)
+        self.rates["latin"] = 1.0 / chars_per_token
+        if rates:
+            self.rates.update(rates)
+        self.name = "script"
+
+    def script_counts(self, text: str) -> Dict[str, int]:
+        """문자 종류별 문자 수"""
+        counts = {script: len(pattern.findall(text)) for script, pattern in _SCRIPT_PATTERNS.items()}
+        counts["other"] = max(len(text) - sum(counts.values()), 0)
+        return counts
+
+    def _estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        counts = self.script_counts(text)
+        return int(math.ceil(sum(self.rates[script] * n for script, n in counts.items())))
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        return [self._estimate(text or "") for text in texts]
+
+    def calibrate(self, samples: Iterable[Tuple[str, int]], dominance: float = 0.8) -> Dict[str, float]:
+        """
+        실제 토큰 수로 문자 종류별 비율 보정
+
+        공백을 제외한 문자의 dominance 이상이 한 종류인 샘플만 모아
+        (실제 토큰 수 합 / 해당 문자 수 합)으로 그 종류의 비율을 다시 계산합니다.
+
+        Args:
+            samples: [(텍스트, 실제 토큰 수), ...] (예: Ollama 응답의 prompt_eval_count)
+            dominance: 샘플을 한 종류로 볼 최소 비율
+
+        Returns:
+            보정된 비율 (self.rates도 갱신됨)
+        """
+        tokens: Dict[str, int] = {}
+        chars: Dict[str, int] = {}
+        for text, true_count in samples:
+            counts = self.script_counts(text or "")
+            counts.pop("space")
+            total = sum(counts.values())
+            if not total:
+                continue
+            script, n = max(counts.items(), key=lambda item: item[1])
+            if n / total < dominance:
+                continue
+            tokens[script] = tokens.get(script, 0) + true_count
+            chars[script] = chars.get(script, 0) + n
+        for script, n in chars.items():
+            self.rates[script] = tokens[script] / n
+        return dict(self.rates)
+
+
+class HFTokenCounter(TokenCounter):
+    """모델의 실제 토크나이저로 세는 카운터 (pip install tokenizers)"""
+
+    def __init__(self, tokenizer: str):
+        """
+        Args:
+            tokenizer: tokenizer.json 경로 또는 Hugging Face Hub 모델 이름
+        """
+        if Tokenizer is None:
+            raise ImportError("HFTokenCounter를 사용하려면 tokenizers 패키지가 필요합니다 (pip install tokenizers)")
+        if os.path.isfile(tokenizer):
+            self.tokenizer = Tokenizer.from_file(tokenizer)
+        else:
+            self.tokenizer = Tokenizer.from_pretrained(tokenizer)
+        self.name = f"hf:{tokenizer}"
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        encodings = self.tokenizer.encode_batch([text or "" for text in texts], add_special_tokens=False)
+        return [len(encoding.ids) for encoding in encodings]
+
+
+class CachedTokenCounter(TokenCounter):
+    """내용 해시 기반 LRU 캐시를 둔 카운터 (같은 메시지를 매 턴 다시 토큰화하지 않음)"""
+
+    def __init__(self, inner: TokenCounter, max_entries: int = 10000):
+        """
+        Args:
+            inner: 실제로 토큰 수를 세는 카운터
+            max_entries: 최대 캐시 항목 수
+        """
+        self.inner = inner
+        self.max_entries = max_entries
+        self.name = inner.name
+        self._data: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).digest()
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                count = self._data.get(key)
+                if count is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._data.move_to_end(key)
+                    results[i] = count
+            self.hits += len(texts) - sum(len(positions) for positions in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            # 캐시에 없는 텍스트만 (중복 제거 후) 한 번에 계산
+            counts = self.inner.count_batch([texts[positions[0]] for positions in missing.values()])
+            with self._lock:
+                for (key, positions), count in zip(missing.items(), counts):
+                    for i in positions:
+                        results[i] = count
+                    self._data[key] = count
+                    self._data.move_to_end(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def get_token_counter(
+    tokenizer: Optional[str] = None,
+    chars_per_token: float = 4.0,
+    cache_size: int = 10000
+) -> CachedTokenCounter:
+    """
+    토큰 카운터 생성 (토크나이저를 불러올 수 없으면 문자 종류별 추정으로 대체)
+
+    Args:
+        tokenizer: tokenizer.json 경로 또는 Hugging Face Hub 모델 이름 (None이면 추정)
+        chars_per_token: 추정 시 영문/숫자의 토큰당 문자 수
+        cache_size: LRU 캐시 항목 수
+
+    Returns:
+        CachedTokenCounter
+    """
+    inner: TokenCounter
+    if tokenizer:
+        try:
+            inner = HFTokenCounter(tokenizer)
+        except Exception as e:
+            logger.warning("tokenizer %r를 불러오지 못해 추정으로 대체합니다: %s", tokenizer, e)
+            inner = ScriptTokenCounter(chars_per_token=chars_per_token)
+    else:
+        inner = ScriptTokenCounter(chars_per_token=chars_per_token)
+    return CachedTokenCounter(inner, max_entries=cache_size)
+
+
+@lru_cache(maxsize=None)
+def default_token_counter(chars_per_token: float = 4.0) -> CachedTokenCounter:
+    """
+    프로세스 공용 기본 카운터 (LLM_TOKENIZER 환경 변수의 토크나이저, 없으면 추정)
+
+    ContextAssembler와 MemoryManager가 같은 인스턴스를 써서 예산 계산과 캐시를 공유합니다.
+    """
+    return get_token_counter(os.getenv("LLM_TOKENIZER"), chars_per_token=chars_per_token)
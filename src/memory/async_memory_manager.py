@@ -0,0 +1,558 @@
+"""Async Memory Manager - 비동기 대화 기록 관리
+
+MemoryManager와 같은 API를 코루틴으로 제공합니다.
+이벤트 루프 하나에서 여러 대화를 동시에 처리할 때 (AsyncOllamaProvider 스트리밍 등)
+이력 로드/메시지 저장이 루프를 막지 않도록 SQLAlchemy asyncio + 비동기 드라이버를 사용합니다.
+
+- 호출마다 짧게 AsyncSession을 열고 닫음 (세션을 코루틴끼리 공유하지 않음)
+- 쿼리 조건(keyset), 토큰 계산, 메시지 캐시는 MemoryManager와 공유
+- write-behind 모드는 없음 (저장 자체가 루프를 막지 않으므로)
+- 장기 기억(VectorMemory): 임베딩 호출과 top-k 계산은 asyncio.to_thread로 루프 밖에서 실행
+
+필요 패키지: aiosqlite (기본 저장소), asyncpg (PostgreSQL)
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import desc, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..database.async_db import get_async_session_factory, init_async_database
+from ..database.fulltext import fulltext_available, search_statement, to_search_result
+from ..database.models import Conversation, ConversationSummary, Message
+from ..llm.generation_metrics import LOAD_STALL_MS, aggregate_generations
+from ..llm.token_counter import default_token_counter
+from .memory_manager import (
+    TokenEstimator,
+    generation_metadata_statement,
+    generation_records,
+    keyset_after,
+    keyset_before,
+    message_columns,
+    message_cost,
+    to_cached,
+    token_count_updates,
+    tokenizer_name,
+)
+from .message_cache import ConversationBuffer, MessageCache
+from .vector_memory import INDEXED_ROLES, VectorMemory
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMemoryManager:
+    """대화 기록을 비동기로 관리하는 매니저 (MemoryManager와 같은 메서드, await로 호출)"""
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        token_estimator: Optional[TokenEstimator] = None,
+        message_cache: Optional[MessageCache] = None,
+        use_cache: bool = True,
+        verify_cache: bool = True,
+        vector_memory: Optional[VectorMemory] = None
+    ):
+        """
+        Args:
+            session_factory: AsyncSession 팩토리 (기본값: 기본 비동기 엔진, get_async_session_factory())
+            token_estimator: 텍스트 → 토큰 수 함수 (기본값: default_token_counter, ContextAssembler와 공유)
+            message_cache: 메시지 캐시 (기본값: 새로 생성, MemoryManager와 공유 가능)
+            use_cache: False면 캐시 없이 항상 DB에서 로드
+            verify_cache: 캐시 응답 전 DB와 비교 (여러 워커가 같은 DB에 쓰는 경우 True 유지)
+            vector_memory: 지정하면 메시지를 임베딩해서 장기 기억 검색에 사용 (MemoryManager와 공유 가능)
+        """
+        self.session_factory = session_factory or get_async_session_factory()
+        self.token_estimator = token_estimator or default_token_counter()
+        self._tokenizer = tokenizer_name(self.token_estimator)
+        self.message_cache = (message_cache or MessageCache()) if use_cache else None
+        self.verify_cache = verify_cache
+        self.vector_memory = vector_memory
+        self._migrated = False
+
+    async def _session(self) -> AsyncSession:
+        # 생성자에서는 await할 수 없으므로 첫 사용 시 마이그레이션 (엔진당 1회)
+        if not self._migrated:
+            await init_async_database(self.session_factory.kw["bind"])
+            self._migrated = True
+        return self.session_factory()
+
+    async def save_message(
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        message_metadata: Optional[Dict] = None
+    ) -> Message:
+        """
+        메시지를 데이터베이스에 저장
+
+        Args:
+            conversation_id: 대화 세션 ID
+            role: 역할 (user, assistant 등)
+            content: 메시지 내용
+            message_metadata: 추가 정보 (선택사항)
+
+        Returns:
+            저장된 Message 객체
+        """
+        # 임베딩은 세션을 열기 전에 스레드에서 계산 (루프도, DB 쓰기 락도 잡지 않음)
+        vector = await self._embed_for_index(role, content)
+        message = Message(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            message_metadata=message_metadata,
+            token_count=self.token_estimator(content),
+            tokenizer=self._tokenizer
+        )
+        async with await self._session() as session:
+            session.add(message)
+            await session.flush()
+            cached = to_cached(message) if self.message_cache is not None else None
+            if vector is not None:
+                await session.run_sync(lambda s: self._index_message(s, message, vector))
+            await session.commit()
+        if cached is not None:
+            self.message_cache.append(conversation_id, cached)
+        return message
+
+    async def _embed_for_index(self, role: str, content: str) -> Optional[List[float]]:
+        if self.vector_memory is None or role not in INDEXED_ROLES:
+            return None
+        try:
+            return (await asyncio.to_thread(self.vector_memory.embed, [content]))[0]
+        except Exception:
+            # 임베딩 실패로 메시지 저장을 막지 않음 (검색 시 backfill)
+            logger.warning("failed to embed message (role=%s)", role, exc_info=True)
+            return None
+
+    def _index_message(self, session, message: Message, vector: List[float]) -> None:
+        """run_sync 안에서 실행 (동기 Session)"""
+        try:
+            with session.begin_nested():
+                self.vector_memory.index_messages(
+                    session,
+                    [(message.id, message.conversation_id, message.content)],
+                    vectors=[vector]
+                )
+        except Exception:
+            logger.warning("failed to store embedding for message %s", message.id, exc_info=True)
+
+    async def _cached_buffer(self, session: AsyncSession, conversation_id: int) -> Optional[ConversationBuffer]:
+        """캐시 버퍼 반환 (없거나 DB와 다르면 최근 메시지로 다시 채움, 캐시 비활성화 시 None)"""
+        if self.message_cache is None:
+            return None
+
+        buffer = self.message_cache.get(conversation_id)
+        if buffer is not None:
+            if not self.verify_cache or await self._db_signature(session, conversation_id, buffer) == buffer.signature():
+                return buffer
+            self.message_cache.mark_refreshed()
+
+        capacity = self.message_cache.max_messages_per_conversation
+        rows = (await session.execute(
+            select(*message_columns(self._tokenizer))
+            .where(Message.conversation_id == conversation_id)
+            .order_by(desc(Message.timestamp), desc(Message.id))
+            .limit(capacity + 1)
+        )).all()
+        complete = len(rows) <= capacity
+        rows = rows[:capacity]
+        rows.reverse()
+        return self.message_cache.fill(
+            conversation_id,
+            [to_cached(r) for r in rows],
+            complete=complete
+        )
+
+    async def _db_signature(
+        self,
+        session: AsyncSession,
+        conversation_id: int,
+        buffer: ConversationBuffer
+    ) -> Optional[tuple]:
+        """버퍼의 가장 작은 id 이후 DB 메시지의 (가장 작은 id, 개수, 가장 큰 id)"""
+        signature = buffer.signature()
+        if signature is None:
+            exists = (await session.execute(
+                select(Message.id).where(Message.conversation_id == conversation_id).limit(1)
+            )).first()
+            return None if exists is None else (0, 0, 0)
+        min_id = signature[0]
+        count, max_id = (await session.execute(
+            select(func.count(Message.id), func.max(Message.id)).where(
+                Message.conversation_id == conversation_id,
+                Message.id >= min_id
+            )
+        )).one()
+        return min_id, count, max_id
+
+    async def load_recent_messages(
+        self,
+        conversation_id: int,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        최근 메시지를 로드 (오래된 것부터 정렬해서 반환)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            limit: 최대 메시지 수 (None이면 전체)
+
+        Returns:
+            메시지 리스트 [{"role": "...", "content": "..."}, ...]
+        """
+        async with await self._session() as session:
+            buffer = await self._cached_buffer(session, conversation_id)
+            if buffer is not None and (buffer.complete or (limit and limit <= len(buffer))):
+                cached = list(buffer.messages)
+                if limit:
+                    cached = cached[-limit:]
+                return [{"role": m.role, "content": m.content} for m in cached]
+
+            stmt = select(Message.role, Message.content).where(
+                Message.conversation_id == conversation_id
+            ).order_by(desc(Message.timestamp), desc(Message.id))
+            if limit:
+                stmt = stmt.limit(limit)
+            rows = (await session.execute(stmt)).all()
+
+        rows.reverse()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    async def load_messages_within_budget(
+        self,
+        conversation_id: int,
+        token_budget: int,
+        chunk_size: int = 50
+    ) -> List[Dict[str, str]]:
+        """
+        토큰 예산 안에 들어가는 최근 메시지만 로드 (MemoryManager.load_messages_within_budget 참고)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            token_budget: 대화 기록에 쓸 토큰 예산 (ContextAssembler.history_token_budget())
+            chunk_size: 한 번에 읽을 메시지 수
+
+        Returns:
+            메시지 리스트 [{"id": ..., "role": "...", "content": "..."}, ...]
+        """
+        selected: List[Dict[str, str]] = []
+        used = 0
+        cursor: Optional[Tuple] = None  # 마지막으로 읽은 (timestamp, id)
+        recounted: List[Tuple[int, int]] = []  # 다시 센 (id, token_count)
+
+        async with await self._session() as session:
+            try:
+                # 1) 캐시 버퍼에서 먼저 선택
+                buffer = await self._cached_buffer(session, conversation_id)
+                if buffer is not None:
+                    for m in buffer.newest_first():
+                        if m.token_count is None:
+                            m.token_count = self.token_estimator(m.content)
+                            recounted.append((m.id, m.token_count))
+                        cost = message_cost(self.token_estimator, m.role, m.content, m.token_count)
+                        if used + cost > token_budget:
+                            selected.reverse()
+                            return selected
+                        selected.append({"id": m.id, "role": m.role, "content": m.content})
+                        used += cost
+                    if buffer.complete:
+                        selected.reverse()
+                        return selected
+                    if buffer.messages:
+                        oldest = buffer.messages[0]
+                        cursor = (oldest.timestamp, oldest.id)
+
+                # 2) 버퍼보다 오래된 메시지는 DB에서 keyset으로 이어서 로드
+                while True:
+                    stmt = select(*message_columns(self._tokenizer)).where(Message.conversation_id == conversation_id)
+                    if cursor is not None:
+                        stmt = stmt.where(keyset_before(*cursor))
+                    rows = (await session.execute(
+                        stmt.order_by(desc(Message.timestamp), desc(Message.id)).limit(chunk_size)
+                    )).all()
+
+                    for msg_id, ts, role, content, token_count in rows:
+                        if token_count is None:
+                            token_count = self.token_estimator(content)
+                            recounted.append((msg_id, token_count))
+                        cost = message_cost(self.token_estimator, role, content, token_count)
+                        if used + cost > token_budget:
+                            selected.reverse()
+                            return selected
+                        selected.append({"id": msg_id, "role": role, "content": content})
+                        used += cost
+
+                    if len(rows) < chunk_size:
+                        break
+                    cursor = (rows[-1][1], rows[-1][0])
+
+                selected.reverse()
+                return selected
+            finally:
+                await self._store_token_counts(session, recounted)
+
+    async def _store_token_counts(self, session: AsyncSession, recounted: List[Tuple[int, int]]) -> None:
+        """다시 센 token_count 저장 (MemoryManager._store_token_counts 참고)"""
+        if not recounted or self._tokenizer is None:
+            return
+        try:
+            await session.execute(update(Message), token_count_updates(recounted, self._tokenizer))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            logger.warning("failed to store %d recounted token counts", len(recounted), exc_info=True)
+
+    async def load_messages_page(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        대화 기록 페이지 조회 (keyset 페이지네이션, MemoryManager.load_messages_page 참고)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            limit: 페이지 크기
+            before_id: 이 메시지 id 이전 페이지
+            after_id: 이 메시지 id 이후 페이지
+
+        Returns:
+            메시지 리스트 (오래된 것부터) [{"id": ..., "role": "...", "content": "...", "timestamp": ...}, ...]
+        """
+        if before_id is not None and after_id is not None:
+            raise ValueError("before_id와 after_id는 함께 지정할 수 없습니다")
+
+        async with await self._session() as session:
+            stmt = select(*message_columns()).where(Message.conversation_id == conversation_id)
+            anchor_id = before_id if before_id is not None else after_id
+            if anchor_id is not None:
+                anchor_ts = (await session.execute(
+                    select(Message.timestamp).where(
+                        Message.id == anchor_id,
+                        Message.conversation_id == conversation_id
+                    )
+                )).scalar()
+                if anchor_ts is None:
+                    return []
+                if before_id is not None:
+                    stmt = stmt.where(keyset_before(anchor_ts, anchor_id))
+                else:
+                    stmt = stmt.where(keyset_after(anchor_ts, anchor_id))
+
+            if after_id is not None:
+                rows = (await session.execute(
+                    stmt.order_by(Message.timestamp, Message.id).limit(limit)
+                )).all()
+            else:
+                rows = (await session.execute(
+                    stmt.order_by(desc(Message.timestamp), desc(Message.id)).limit(limit)
+                )).all()
+                rows.reverse()
+
+        return [
+            {"id": msg_id, "role": role, "content": content, "timestamp": ts}
+            for msg_id, ts, role, content, _ in rows
+        ]
+
+    async def search_messages(
+        self,
+        query: str,
+        conversation_id: Optional[int] = None,
+        limit: int = 20,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        메시지 전문 검색 (관련도 순, MemoryManager.search_messages 참고)
+
+        Args:
+            query: 검색어
+            conversation_id: 지정하면 해당 대화에서만 검색 (None이면 전체 대화)
+            limit: 최대 결과 수
+            since / until: 메시지 시각 범위 (UTC)
+
+        Returns:
+            [{"id": ..., "conversation_id": ..., "role": "...", "content": "...", "timestamp": ..., "score": ...}, ...]
+        """
+        async with await self._session() as session:
+            available = await session.run_sync(lambda s: fulltext_available(s.connection()))
+            stmt = search_statement(
+                session.bind.dialect.name,
+                available,
+                query,
+                conversation_id=conversation_id,
+                limit=limit,
+                since=since,
+                until=until
+            )
+            if stmt is None:
+                return []
+            return [to_search_result(row) for row in await session.execute(stmt)]
+
+    async def retrieve_relevant_messages(
+        self,
+        conversation_id: int,
+        query: str,
+        k: int = 4,
+        exclude_ids: Optional[List[int]] = None,
+        min_similarity: float = 0.0
+    ) -> List[Dict]:
+        """
+        장기 기억: query와 의미가 가까운 과거 메시지 top-k (MemoryManager.retrieve_relevant_messages 참고)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            query: 질의 텍스트 (보통 현재 사용자 메시지)
+            k: 최대 결과 수
+            exclude_ids: 제외할 메시지 id
+            min_similarity: 최소 코사인 유사도
+
+        Returns:
+            [{"id": ..., "role": "...", "content": "...", "timestamp": ..., "score": ...}, ...]
+        """
+        if self.vector_memory is None:
+            return []
+        async with await self._session() as session:
+            try:
+                ranked = await self.vector_memory.search_async(
+                    session,
+                    conversation_id,
+                    query,
+                    k=k,
+                    exclude_ids=exclude_ids,
+                    min_similarity=min_similarity
+                )
+                # backfill한 임베딩 저장
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                logger.warning("failed to retrieve relevant messages (conversation %s)", conversation_id, exc_info=True)
+                return []
+            if not ranked:
+                return []
+            rows = {
+                row.id: row
+                for row in await session.execute(
+                    select(*message_columns()).where(Message.id.in_([message_id for message_id, _ in ranked]))
+                )
+            }
+        return [
+            {
+                "id": message_id,
+                "role": rows[message_id].role,
+                "content": rows[message_id].content,
+                "timestamp": rows[message_id].timestamp,
+                "score": score
+            }
+            for message_id, score in ranked
+            if message_id in rows
+        ]
+
+    async def load_summary(self, conversation_id: int) -> Optional[Dict]:
+        """
+        대화 누적 요약 조회 (MemoryManager.load_summary 참고)
+
+        Args:
+            conversation_id: 대화 세션 ID
+
+        Returns:
+            {"content": "...", "covered_until_id": ..., "token_count": ..., "updated_at": ...} (없으면 None)
+        """
+        async with await self._session() as session:
+            row = (await session.execute(
+                select(
+                    ConversationSummary.content,
+                    ConversationSummary.covered_until_id,
+                    ConversationSummary.token_count,
+                    ConversationSummary.updated_at
+                ).where(ConversationSummary.conversation_id == conversation_id).limit(1)
+            )).first()
+        if row is None:
+            return None
+        return {
+            "content": row.content,
+            "covered_until_id": row.covered_until_id,
+            "token_count": row.token_count,
+            "updated_at": row.updated_at
+        }
+
+    async def generation_report(
+        self,
+        conversation_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        load_stall_ms: float = LOAD_STALL_MS
+    ) -> Dict[str, Dict]:
+        """
+        모델별 추론 시간 집계 (MemoryManager.generation_report 참고)
+
+        Args:
+            conversation_id: 지정하면 해당 대화만 (None이면 전체 대화)
+            since: 이 시각 이후 메시지만 (UTC)
+            load_stall_ms: 모델 로딩 지연으로 볼 최소 load 시간 (밀리초)
+
+        Returns:
+            {model: {...}} (generation_metrics.aggregate_generations 참고)
+        """
+        async with await self._session() as session:
+            rows = (await session.execute(generation_metadata_statement(conversation_id, since))).scalars().all()
+        return aggregate_generations(generation_records(rows), load_stall_ms=load_stall_ms)
+
+    async def create_conversation(self, session_id: str, title: Optional[str] = None) -> Conversation:
+        """
+        새 대화 세션 생성
+
+        Args:
+            session_id: 세션 ID
+            title: 대화 제목 (선택사항)
+
+        Returns:
+            생성된 Conversation 객체
+        """
+        conversation = Conversation(session_id=session_id, title=title)
+        async with await self._session() as session:
+            session.add(conversation)
+            await session.commit()
+        return conversation
+
+    async def get_or_create_conversation(self, session_id: str) -> Conversation:
+        """
+        대화 세션 가져오기 또는 생성
+
+        Args:
+            session_id: 세션 ID
+
+        Returns:
+            Conversation 객체
+        """
+        async with await self._session() as session:
+            conversation = (await session.execute(
+                select(Conversation).where(Conversation.session_id == session_id).limit(1)
+            )).scalar()
+
+        if conversation is None:
+            conversation = await self.create_conversation(session_id)
+
+        return conversation
+
+    async def get_conversation_messages_count(self, conversation_id: int) -> int:
+        """
+        대화의 메시지 수 반환
+
+        Args:
+            conversation_id: 대화 세션 ID
+
+        Returns:
+            메시지 수
+        """
+        async with await self._session() as session:
+            return (await session.execute(
+                select(func.count(Message.id)).where(Message.conversation_id == conversation_id)
+            )).scalar_one()
@@ -4,24 +4,258 @@
 - 모든 대화를 DB에 저장
 - 필요할 때 최근 메시지만 로드
 - Context Assembler에 전달하여 LLM에게 재주입
+
+토큰 예산 기반 로드:
+- 메시지 저장 시 content 토큰 수를 미리 계산해 token_count 컬럼에 저장 (센 토크나이저는 tokenizer 컬럼)
+- 다른 토크나이저로 셌거나 출처를 모르는 token_count는 로드할 때 다시 세고 저장 (토크나이저 변경 후 한 번만)
+- load_messages_within_budget은 최신 메시지부터 (timestamp, id) keyset으로 조금씩 읽고
+  토큰 예산이 차면 중단 → 대화가 길어져도 턴당 비용이 일정
+
+메시지 캐시 (MessageCache):
+- 저장한 메시지를 대화별 링 버퍼에 write-through로 보관, 로드 시 버퍼에서 먼저 응답
+- 로드 전에 DB와 가벼운 비교 쿼리로 다른 워커의 쓰기를 감지 (verify_cache)
+
+write-behind 모드 (WriteBehindWriter, 선택):
+- save_message는 큐에 넣고 바로 반환, 백그라운드 스레드가 배치로 커밋
+- 읽기는 flush를 기다리지 않음: 아직 저장되지 않은 대기 행을 DB/캐시 결과와 timestamp 순으로 합쳐서 반환
+  (대기 행은 id=None, 커밋 직후 양쪽에 있는 행은 (timestamp, role, content)로 한 번만)
+- 저장 완료가 필요할 때만 flush() 호출 (종료 전, 다른 프로세스가 읽기 전 등)
+
+전문 검색 (search_messages):
+- 최근순이 아니라 내용으로 과거 메시지를 찾음 (SQLite FTS5 / PostgreSQL tsvector + GIN)
+
+장기 기억 (VectorMemory, 선택):
+- 저장 시 메시지를 임베딩, retrieve_relevant_messages로 질문과 의미가 가까운 과거 메시지 top-k 조회
+
+대화 요약 (ConversationSummarizer, 선택):
+- 예산 밖으로 밀려난 메시지의 누적 요약을 백그라운드에서 갱신, load_summary로 조회
+
+추론 시간 (generation_report):
+- assistant 메시지의 message_metadata["generation"](GenerationResult)을 모델별로 집계
 """
 
-from typing import List, Dict, Optional
+import heapq
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from ..database.models import Conversation, Message
-from ..database.db import get_session
+from sqlalchemy import and_, case, desc, func, null, or_, select, update
+from ..database.models import Conversation, ConversationSummary, Message
+from ..database.db import get_scoped_session
+from ..database.fulltext import fulltext_available, query_tokens, search_statement, to_search_result
+from ..database.migrations import ensure_migrated
+from ..llm.generation_metrics import LOAD_STALL_MS, METADATA_KEY, aggregate_generations
+from ..llm.token_counter import default_token_counter
+from .message_cache import CachedMessage, ConversationBuffer, MessageCache
+from .vector_memory import INDEXED_ROLES, VectorMemory
+from .write_behind import WriteBehindWriter
+
+
+logger = logging.getLogger(__name__)
+
+
+TokenEstimator = Callable[[str], int]
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """단순 토큰 추정 (1 토큰 ≈ 4 문자, 기본값은 default_token_counter)"""
+    return int(len(text or "") / chars_per_token)
+
+
+def tokenizer_name(token_estimator: TokenEstimator) -> Optional[str]:
+    """token_count를 세는 토크나이저 이름 (TokenCounter.name, 이름이 없는 함수면 None)"""
+    return getattr(token_estimator, "name", None)
+
+
+def token_count_column(tokenizer: Optional[str] = None):
+    """
+    Message.token_count 조회 컬럼
+
+    tokenizer를 주면 다른 토크나이저로 셌거나 출처를 모르는 값(tokenizer 컬럼 추가 전 행)은 NULL로 읽어서
+    호출한 쪽이 현재 토크나이저로 다시 세게 합니다. (None이면 저장된 값을 그대로 사용)
+    """
+    if tokenizer is None:
+        return Message.token_count
+    return case((Message.tokenizer == tokenizer, Message.token_count), else_=null()).label("token_count")
+
+
+def token_count_updates(recounted: List[Tuple[int, int]], tokenizer: str) -> List[Dict]:
+    """다시 센 [(message_id, token_count)] → 기본 키 기준 bulk UPDATE 파라미터"""
+    return [{"id": message_id, "token_count": count, "tokenizer": tokenizer} for message_id, count in recounted]
+
+
+def message_cost(token_estimator: TokenEstimator, role: str, content: str, token_count: Optional[int]) -> int:
+    """
+    메시지 1개의 예산 비용 (content + role)
+
+    MemoryManager/AsyncMemoryManager의 예산 선택과 ConversationSummarizer가 같은 계산을 써야
+    예산 경계가 일치합니다.
+    """
+    if token_count is None:
+        # token_count 컬럼 추가 전에 저장된 메시지
+        token_count = token_estimator(content)
+    return token_count + token_estimator(role)
+
+
+def keyset_before(ts, msg_id):
+    """(timestamp, id) < (ts, msg_id) 조건 (앞의 timestamp <= ts가 인덱스 범위 탐색에 쓰임)"""
+    return and_(
+        Message.timestamp <= ts,
+        or_(Message.timestamp < ts, Message.id < msg_id)
+    )
+
+
+def keyset_after(ts, msg_id):
+    """(timestamp, id) > (ts, msg_id) 조건"""
+    return and_(
+        Message.timestamp >= ts,
+        or_(Message.timestamp > ts, Message.id > msg_id)
+    )
+
+
+def generation_metadata_statement(
+    conversation_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """generation_report용 assistant 메시지 메타데이터 조회 (동기/비동기 공용, 시각 범위 [since, until))"""
+    stmt = select(Message.message_metadata).where(Message.role == "assistant")
+    if conversation_id is not None:
+        stmt = stmt.where(Message.conversation_id == conversation_id)
+    if since is not None:
+        stmt = stmt.where(Message.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(Message.timestamp < until)
+    return stmt
+
+
+def generation_records(metadata_rows):
+    """메타데이터 → GenerationResult.to_metadata() 형식 dict (기록이 없는 메시지는 건너뜀)"""
+    for metadata in metadata_rows:
+        if isinstance(metadata, dict) and metadata.get(METADATA_KEY):
+            yield metadata[METADATA_KEY]
+
+
+def message_columns(tokenizer: Optional[str] = None):
+    """이력 조회에 필요한 컬럼 (ORM 객체 대신 튜플로 조회, tokenizer는 token_count_column 참고)"""
+    return (Message.id, Message.timestamp, Message.role, Message.content, token_count_column(tokenizer))
+
+
+def pending_key(row: Dict) -> Tuple:
+    """write-behind 대기 행 → DB 행과 같은 메시지인지 비교할 키 (timestamp, role, content)"""
+    return row.get("timestamp"), row.get("role"), row.get("content")
+
+
+def unsaved_rows(pending: List[Dict], saved_keys: Iterable[Tuple]) -> List[Dict]:
+    """
+    대기 행 중 아직 DB에 없는 행 (커밋 직후 큐에서 빠지기 전인 행 제외)
+
+    Args:
+        pending: WriteBehindWriter.pending_rows() 결과
+        saved_keys: 같은 범위의 DB 행 (timestamp, role, content)
+
+    Returns:
+        DB 결과에 없는 대기 행 (submit 순서)
+    """
+    saved = Counter(saved_keys)
+    unsaved = []
+    for row in pending:
+        key = pending_key(row)
+        if saved[key] > 0:
+            saved[key] -= 1
+            continue
+        unsaved.append(row)
+    return unsaved
+
+
+def merge_pending(persisted: Iterable[Tuple], pending: List[Dict], tokenizer: Optional[str] = None) -> Iterator[Tuple]:
+    """
+    DB/캐시 행과 write-behind 대기 행을 최신순으로 합침 (지연 평가, 양쪽에 있는 행은 DB 행만)
+
+    Args:
+        persisted: 최신순 (id, timestamp, role, content, token_count) 이터러블
+        pending: WriteBehindWriter.pending_rows() 결과 (DB를 읽기 전에 얻은 스냅샷)
+        tokenizer: 현재 토크나이저 (다른 토크나이저로 센 대기 행의 token_count는 None)
+
+    Yields:
+        (id, timestamp, role, content, token_count) 최신순 (대기 행은 id=None)
+    """
+    waiting = Counter(pending_key(row) for row in pending)
+    skip: Counter = Counter()
+    newest_first = sorted(pending, key=lambda row: row["timestamp"], reverse=True)
+    unsaved = (
+        (
+            None,
+            row["timestamp"],
+            row["role"],
+            row["content"],
+            row.get("token_count") if row.get("tokenizer") == tokenizer else None
+        )
+        for row in newest_first
+    )
+    # 같은 timestamp면 DB 행이 먼저 나오므로 그 뒤의 같은 대기 행을 건너뜀
+    for item in heapq.merge(persisted, unsaved, key=lambda item: item[1], reverse=True):
+        key = (item[1], item[2], item[3])
+        if item[0] is not None:
+            if waiting[key] > 0:
+                waiting[key] -= 1
+                skip[key] += 1
+        elif skip[key] > 0:
+            skip[key] -= 1
+            continue
+        yield item
+
+
+def to_cached(row) -> CachedMessage:
+    """Message 또는 message_columns() 행 → CachedMessage"""
+    return CachedMessage(
+        id=row.id,
+        timestamp=row.timestamp,
+        role=row.role,
+        content=row.content,
+        token_count=row.token_count
+    )
 
 
 class MemoryManager:
     """대화 기록을 관리하는 매니저"""
     
-    def __init__(self, session: Optional[Session] = None):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        token_estimator: Optional[TokenEstimator] = None,
+        message_cache: Optional[MessageCache] = None,
+        use_cache: bool = True,
+        verify_cache: bool = True,
+        write_behind: Optional[WriteBehindWriter] = None,
+        flush_timeout: float = 5.0,
+        vector_memory: Optional[VectorMemory] = None
+    ):
         """
         Args:
-            session: 데이터베이스 세션 (기본값: 새로 생성)
+            session: 데이터베이스 세션 (기본값: 기본 엔진의 scoped_session, 스레드마다 별도 Session)
+            token_estimator: 텍스트 → 토큰 수 함수 (기본값: default_token_counter, ContextAssembler와 공유)
+            message_cache: 메시지 캐시 (기본값: 새로 생성, 여러 MemoryManager가 공유 가능)
+            use_cache: False면 캐시 없이 항상 DB에서 로드
+            verify_cache: 캐시 응답 전 DB와 비교 (여러 워커가 같은 DB에 쓰는 경우 True 유지)
+            write_behind: 지정하면 메시지를 배치로 저장 (예: WriteBehindWriter(sessionmaker(bind=engine)))
+            flush_timeout: flush()의 최대 대기 시간 (초, 읽기 경로는 flush를 기다리지 않음)
+            vector_memory: 지정하면 메시지를 임베딩해서 장기 기억 검색에 사용 (예: VectorMemory(HashingEmbedder()))
         """
-        self.session = session or get_session()
+        self.session = session or get_scoped_session()
+        self.token_estimator = token_estimator or default_token_counter()
+        self._tokenizer = tokenizer_name(self.token_estimator)
+        self.message_cache = (message_cache or MessageCache()) if use_cache else None
+        self.verify_cache = verify_cache
+        self.write_behind = write_behind
+        self.flush_timeout = flush_timeout
+        self.vector_memory = vector_memory
+        if write_behind is not None and self.message_cache is not None:
+            # 배치 저장으로 id가 정해진 메시지를 캐시에 반영
+            write_behind.add_flush_listener(self._on_messages_flushed)
+        # token_count 컬럼이 없는 기존 DB 대비 (엔진당 1회)
+        ensure_migrated(self.session.get_bind())
     
     def save_message(
         self,
@@ -40,18 +274,137 @@ class MemoryManager:
             message_metadata: 추가 정보 (선택사항)
             
         Returns:
-            저장된 Message 객체
+            저장된 Message 객체 (write-behind 모드에서는 아직 저장 전이라 id가 None)
         """
+        if self.write_behind is not None:
+            # 임베딩은 retrieve_relevant_messages에서 배치로 backfill
+            row = {
+                "conversation_id": conversation_id,
+                "role": role,
+                "content": content,
+                "timestamp": datetime.utcnow(),
+                "message_metadata": message_metadata,
+                "token_count": self.token_estimator(content),
+                "tokenizer": self._tokenizer
+            }
+            self.write_behind.submit(row)
+            return Message(**row)
+        
+        # 임베딩(네트워크 호출)은 쓰기 전에 계산 → INSERT~commit 사이에 쓰기 락을 오래 잡지 않음
+        vector = self._embed_for_index(role, content)
         message = Message(
             conversation_id=conversation_id,
             role=role,
             content=content,
-            message_metadata=message_metadata
+            message_metadata=message_metadata,
+            token_count=self.token_estimator(content),
+            tokenizer=self._tokenizer
         )
         self.session.add(message)
+        # commit 후에는 속성이 만료되어 다시 SELECT 하므로 flush 시점 값으로 캐시 항목 생성
+        self.session.flush()
+        cached = to_cached(message) if self.message_cache is not None else None
+        if vector is not None:
+            self._index_message(message, vector)
         self.session.commit()
+        if cached is not None:
+            self.message_cache.append(conversation_id, cached)
         return message
     
+    def _embed_for_index(self, role: str, content: str) -> Optional[List[float]]:
+        if self.vector_memory is None or role not in INDEXED_ROLES:
+            return None
+        try:
+            return self.vector_memory.embed([content])[0]
+        except Exception:
+            # 임베딩 실패로 메시지 저장을 막지 않음 (검색 시 backfill)
+            logger.warning("failed to embed message (role=%s)", role, exc_info=True)
+            return None
+    
+    def _index_message(self, message: Message, vector: List[float]) -> None:
+        try:
+            with self.session.begin_nested():
+                self.vector_memory.index_messages(
+                    self.session,
+                    [(message.id, message.conversation_id, message.content)],
+                    vectors=[vector]
+                )
+        except Exception:
+            logger.warning("failed to store embedding for message %s", message.id, exc_info=True)
+    
+    def flush(self) -> bool:
+        """
+        write-behind 대기 메시지가 모두 저장될 때까지 대기 (write-behind가 아니면 아무것도 안 함)
+
+        읽기 메서드는 대기 메시지를 합쳐서 반환하므로 호출할 필요가 없습니다.
+        저장 완료가 필요할 때만 (종료 전, 다른 프로세스/워커가 읽기 전 등) 호출하세요.
+
+        Returns:
+            flush_timeout 안에 모두 저장됐는지 여부
+        """
+        if self.write_behind is None:
+            return True
+        return self.write_behind.flush(timeout=self.flush_timeout)
+    
+    def _pending_rows(self, conversation_id: Optional[int]) -> List[Dict]:
+        """아직 저장되지 않은 write-behind 행 (DB/캐시를 읽기 전에 호출해야 빠지는 행이 없음)"""
+        if self.write_behind is None:
+            return []
+        return self.write_behind.pending_rows(conversation_id)
+    
+    def _on_messages_flushed(self, messages: List[Message]) -> None:
+        for message in messages:
+            self.message_cache.append(message.conversation_id, to_cached(message))
+    
+    def _message_columns(self, conversation_id: int):
+        return self.session.query(*message_columns(self._tokenizer)).filter(Message.conversation_id == conversation_id)
+    
+    def _cached_buffer(self, conversation_id: int) -> Optional[ConversationBuffer]:
+        """
+        캐시 버퍼 반환 (없거나 DB와 다르면 최근 메시지로 다시 채움)
+        
+        Returns:
+            ConversationBuffer (캐시 비활성화 시 None)
+        """
+        if self.message_cache is None:
+            return None
+        
+        buffer = self.message_cache.get(conversation_id)
+        if buffer is not None:
+            if not self.verify_cache or self._db_signature(conversation_id, buffer) == buffer.signature():
+                return buffer
+            # 다른 워커가 쓰거나 지운 메시지가 있음 → 다시 채움
+            self.message_cache.mark_refreshed()
+        
+        capacity = self.message_cache.max_messages_per_conversation
+        rows = self._message_columns(conversation_id).order_by(
+            desc(Message.timestamp), desc(Message.id)
+        ).limit(capacity + 1).all()
+        complete = len(rows) <= capacity
+        rows = rows[:capacity]
+        rows.reverse()
+        return self.message_cache.fill(
+            conversation_id,
+            [to_cached(r) for r in rows],
+            complete=complete
+        )
+    
+    def _db_signature(self, conversation_id: int, buffer: ConversationBuffer) -> Optional[tuple]:
+        """버퍼의 가장 작은 id 이후 DB 메시지의 (가장 작은 id, 개수, 가장 큰 id)"""
+        signature = buffer.signature()
+        if signature is None:
+            # 빈 대화: 새 메시지가 생겼는지만 확인
+            exists = self.session.query(Message.id).filter(
+                Message.conversation_id == conversation_id
+            ).first()
+            return None if exists is None else (0, 0, 0)
+        min_id = signature[0]
+        count, max_id = self.session.query(func.count(Message.id), func.max(Message.id)).filter(
+            Message.conversation_id == conversation_id,
+            Message.id >= min_id
+        ).one()
+        return min_id, count, max_id
+    
     def load_recent_messages(
         self,
         conversation_id: int,
@@ -67,23 +420,407 @@ class MemoryManager:
         Returns:
             메시지 리스트 [{"role": "...", "content": "..."}, ...]
         """
-        query = self.session.query(Message).filter(
-            Message.conversation_id == conversation_id
-        ).order_by(desc(Message.timestamp))
+        pending = self._pending_rows(conversation_id)
+        buffer = self._cached_buffer(conversation_id)
+        if buffer is not None and (buffer.complete or (limit and limit <= len(buffer))):
+            cached = list(buffer.messages)
+            if limit:
+                cached = cached[-limit:]
+            newest_first = [(m.id, m.timestamp, m.role, m.content, m.token_count) for m in reversed(cached)]
+        else:
+            query = self._message_columns(conversation_id).order_by(desc(Message.timestamp), desc(Message.id))
+            if limit:
+                query = query.limit(limit)
+            newest_first = query.all()
         
+        messages = list(merge_pending(newest_first, pending))
         if limit:
-            query = query.limit(limit)
-        
-        messages = query.all()
+            messages = messages[:limit]
         
         # 최신순이므로 역순으로 정렬 (오래된 것부터)
         messages.reverse()
         
         return [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
+            {"role": role, "content": content}
+            for _, _, role, content, _ in messages
+        ]
+    
+    def load_messages_within_budget(
+        self,
+        conversation_id: int,
+        token_budget: int,
+        chunk_size: int = 50
+    ) -> List[Dict[str, str]]:
+        """
+        토큰 예산 안에 들어가는 최근 메시지만 로드 (오래된 것부터 정렬해서 반환)
+        
+        최신 메시지부터 chunk_size개씩 (timestamp, id) keyset 페이지네이션으로 읽고,
+        다음 메시지가 예산을 넘으면 중단합니다. (ContextAssembler의 선택 방식과 동일)
+        다른 토크나이저로 센 token_count는 현재 토크나이저로 다시 세고 저장합니다.
+        write-behind 대기 메시지도 포함합니다. (flush를 기다리지 않음, id=None)
+        
+        Args:
+            conversation_id: 대화 세션 ID
+            token_budget: 대화 기록에 쓸 토큰 예산 (ContextAssembler.history_token_budget())
+            chunk_size: 한 번에 읽을 메시지 수
+            
+        Returns:
+            메시지 리스트 [{"id": ..., "role": "...", "content": "..."}, ...] (아직 저장 전이면 id=None)
+        """
+        selected: List[Dict[str, str]] = []
+        used = 0
+        recounted: List[Tuple[int, int]] = []  # 다시 센 (id, token_count)
+        
+        pending = self._pending_rows(conversation_id)
+        persisted = self._newest_first(conversation_id, chunk_size, recounted)
+        try:
+            for msg_id, _, role, content, token_count in merge_pending(persisted, pending, self._tokenizer):
+                if token_count is None:
+                    token_count = self.token_estimator(content)
+                cost = message_cost(self.token_estimator, role, content, token_count)
+                if used + cost > token_budget:
+                    break
+                selected.append({"id": msg_id, "role": role, "content": content})
+                used += cost
+            
+            # 최신순으로 모았으므로 역순 (오래된 것부터)
+            selected.reverse()
+            return selected
+        finally:
+            self._store_token_counts(recounted)
+    
+    def _newest_first(
+        self,
+        conversation_id: int,
+        chunk_size: int,
+        recounted: List[Tuple[int, int]]
+    ) -> Iterator[Tuple]:
+        """
+        저장된 메시지를 최신순으로 (캐시 버퍼 → 버퍼보다 오래된 메시지는 DB keyset, 필요한 만큼만 읽음)
+        
+        Args:
+            conversation_id: 대화 세션 ID
+            chunk_size: DB에서 한 번에 읽을 메시지 수
+            recounted: 다시 센 (id, token_count)를 추가할 리스트
+            
+        Yields:
+            (id, timestamp, role, content, token_count)
+        """
+        cursor: Optional[Tuple] = None  # 마지막으로 읽은 (timestamp, id)
+        
+        # 1) 캐시 버퍼에서 먼저
+        buffer = self._cached_buffer(conversation_id)
+        if buffer is not None:
+            for m in buffer.newest_first():
+                if m.token_count is None:
+                    m.token_count = self.token_estimator(m.content)
+                    recounted.append((m.id, m.token_count))
+                yield m.id, m.timestamp, m.role, m.content, m.token_count
+            if buffer.complete:
+                return
+            if buffer.messages:
+                oldest = buffer.messages[0]
+                cursor = (oldest.timestamp, oldest.id)
+        
+        # 2) 버퍼보다 오래된 메시지는 DB에서 keyset으로 이어서 로드
+        while True:
+            query = self._message_columns(conversation_id)
+            if cursor is not None:
+                ts, last_id = cursor
+                query = query.filter(keyset_before(ts, last_id))
+            rows = query.order_by(desc(Message.timestamp), desc(Message.id)).limit(chunk_size).all()
+            
+            for msg_id, ts, role, content, token_count in rows:
+                if token_count is None:
+                    token_count = self.token_estimator(content)
+                    recounted.append((msg_id, token_count))
+                yield msg_id, ts, role, content, token_count
+            
+            if len(rows) < chunk_size:
+                return
+            cursor = (rows[-1][1], rows[-1][0])
+    
+    def _store_token_counts(self, recounted: List[Tuple[int, int]]) -> None:
+        """다시 센 token_count 저장 (토크나이저가 바뀐 행은 한 번만 다시 셈, 실패해도 로드는 계속)"""
+        if not recounted or self._tokenizer is None:
+            return
+        try:
+            self.session.execute(update(Message), token_count_updates(recounted, self._tokenizer))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            logger.warning("failed to store %d recounted token counts", len(recounted), exc_info=True)
+    
+    def load_messages_page(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+        after_id: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        대화 기록 페이지 조회 (keyset 페이지네이션, OFFSET 없음)
+        
+        - before_id/after_id 모두 없음: 가장 최근 limit개
+        - before_id: 해당 메시지보다 오래된 limit개 (이전 페이지)
+        - after_id: 해당 메시지보다 새로운 limit개 (다음 페이지)
+        
+        (conversation_id, timestamp, id) 인덱스를 따라 읽으므로 페이지 깊이와 무관하게 일정한 비용
+        write-behind 대기 메시지도 timestamp 순으로 포함합니다. (id=None이라 페이지 기준으로는 쓸 수 없음)
+        
+        Args:
+            conversation_id: 대화 세션 ID
+            limit: 페이지 크기
+            before_id: 이 메시지 id 이전 페이지
+            after_id: 이 메시지 id 이후 페이지
+            
+        Returns:
+            메시지 리스트 (오래된 것부터) [{"id": ..., "role": "...", "content": "...", "timestamp": ...}, ...]
+        """
+        if before_id is not None and after_id is not None:
+            raise ValueError("before_id와 after_id는 함께 지정할 수 없습니다")
+        pending = self._pending_rows(conversation_id)
+        
+        query = self._message_columns(conversation_id)
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id is not None:
+            anchor_ts = self.session.query(Message.timestamp).filter(
+                Message.id == anchor_id,
+                Message.conversation_id == conversation_id
+            ).scalar()
+            if anchor_ts is None:
+                return []
+            if before_id is not None:
+                query = query.filter(keyset_before(anchor_ts, anchor_id))
+                pending = [row for row in pending if row["timestamp"] < anchor_ts]
+            else:
+                query = query.filter(keyset_after(anchor_ts, anchor_id))
+                pending = [row for row in pending if row["timestamp"] > anchor_ts]
+        
+        if after_id is not None:
+            rows = query.order_by(Message.timestamp, Message.id).limit(limit).all()
+            rows = list(merge_pending(reversed(rows), pending))
+            rows.reverse()
+            rows = rows[:limit]
+        else:
+            rows = query.order_by(desc(Message.timestamp), desc(Message.id)).limit(limit).all()
+            rows = list(merge_pending(rows, pending))[:limit]
+            rows.reverse()
+        
+        return [
+            {"id": msg_id, "role": role, "content": content, "timestamp": ts}
+            for msg_id, ts, role, content, _ in rows
         ]
     
+    def search_messages(
+        self,
+        query: str,
+        conversation_id: Optional[int] = None,
+        limit: int = 20,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict]:
+        """
+        메시지 전문 검색 (관련도 순)
+        
+        검색어의 모든 단어를 (접두어로) 포함하는 메시지를 찾습니다.
+        전문 검색 인덱스가 없는 DB에서는 LIKE 검색으로 대체 (최신순, score=None)
+        아직 저장되지 않은 write-behind 메시지는 단어 포함 여부로 찾아 뒤에 붙입니다. (id=None, score=None)
+        
+        Args:
+            query: 검색어 (예: "철수 이름")
+            conversation_id: 지정하면 해당 대화에서만 검색 (None이면 전체 대화)
+            limit: 최대 결과 수
+            since: 이 시각 이후 메시지만 (UTC)
+            until: 이 시각 이전 메시지만 (UTC)
+            
+        Returns:
+            [{"id": ..., "conversation_id": ..., "role": "...", "content": "...", "timestamp": ..., "score": ...}, ...]
+        """
+        pending = self._pending_rows(conversation_id)
+        connection = self.session.connection()
+        stmt = search_statement(
+            connection.dialect.name,
+            fulltext_available(connection),
+            query,
+            conversation_id=conversation_id,
+            limit=limit,
+            since=since,
+            until=until
+        )
+        if stmt is None:
+            return []
+        results = [to_search_result(row) for row in self.session.execute(stmt)]
+        if pending and len(results) < limit:
+            results.extend(self._search_pending(pending, results, query, since, until)[:limit - len(results)])
+        return results
+    
+    def _search_pending(
+        self,
+        pending: List[Dict],
+        results: List[Dict],
+        query: str,
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> List[Dict]:
+        """아직 저장되지 않은 메시지 중 검색어의 모든 단어를 포함하는 것 (최신순, LIKE 검색과 같은 기준)"""
+        tokens = [token.lower() for token in query_tokens(query)]
+        saved = [(r["timestamp"], r["role"], r["content"]) for r in results]
+        matches = [
+            row for row in unsaved_rows(pending, saved)
+            if all(token in row["content"].lower() for token in tokens)
+            and (since is None or row["timestamp"] >= since)
+            and (until is None or row["timestamp"] < until)
+        ]
+        matches.reverse()
+        return [
+            {
+                "id": None,
+                "conversation_id": row["conversation_id"],
+                "role": row["role"],
+                "content": row["content"],
+                "timestamp": row["timestamp"],
+                "score": None
+            }
+            for row in matches
+        ]
+    
+    def retrieve_relevant_messages(
+        self,
+        conversation_id: int,
+        query: str,
+        k: int = 4,
+        exclude_ids: Optional[List[int]] = None,
+        min_similarity: float = 0.0
+    ) -> List[Dict]:
+        """
+        장기 기억: query와 의미가 가까운 과거 메시지 top-k (유사도 순)
+        
+        vector_memory가 없으면 빈 리스트. 아직 임베딩되지 않은 메시지(write-behind, 기존 DB)는
+        여기서 배치로 임베딩해서 저장합니다. (임베딩 실패 시 로그를 남기고 빈 리스트)
+        아직 저장되지 않은 write-behind 메시지는 제외됩니다. (가장 최근 메시지라 최근 기록에 이미 포함)
+        
+        Args:
+            conversation_id: 대화 세션 ID
+            query: 질의 텍스트 (보통 현재 사용자 메시지)
+            k: 최대 결과 수
+            exclude_ids: 제외할 메시지 id
+            min_similarity: 최소 코사인 유사도
+            
+        Returns:
+            [{"id": ..., "role": "...", "content": "...", "timestamp": ..., "score": ...}, ...]
+        """
+        if self.vector_memory is None:
+            return []
+        try:
+            ranked = self.vector_memory.search(
+                self.session,
+                conversation_id,
+                query,
+                k=k,
+                exclude_ids=exclude_ids,
+                min_similarity=min_similarity
+            )
+            # backfill한 임베딩 저장 (VectorMemory는 SAVEPOINT까지만, commit은 세션 주인이)
+            self.session.commit()
+        except Exception:
+            # 임베딩 서버 장애 등으로 장기 기억 없이 답변 (대화 자체는 막지 않음)
+            self.session.rollback()
+            logger.warning("failed to retrieve relevant messages (conversation %s)", conversation_id, exc_info=True)
+            return []
+        if not ranked:
+            return []
+        rows = {
+            row.id: row
+            for row in self.session.query(*message_columns()).filter(
+                Message.id.in_([message_id for message_id, _ in ranked])
+            )
+        }
+        return [
+            {
+                "id": message_id,
+                "role": rows[message_id].role,
+                "content": rows[message_id].content,
+                "timestamp": rows[message_id].timestamp,
+                "score": score
+            }
+            for message_id, score in ranked
+            if message_id in rows
+        ]
+    
+    def load_summary(self, conversation_id: int) -> Optional[Dict]:
+        """
+        대화 누적 요약 조회 (ConversationSummarizer가 저장)
+        
+        Args:
+            conversation_id: 대화 세션 ID
+            
+        Returns:
+            {"content": "...", "covered_until_id": ..., "token_count": ..., "updated_at": ...} (없으면 None)
+        """
+        row = self.session.query(
+            ConversationSummary.content,
+            ConversationSummary.covered_until_id,
+            ConversationSummary.token_count,
+            ConversationSummary.updated_at
+        ).filter(ConversationSummary.conversation_id == conversation_id).first()
+        if row is None:
+            return None
+        return {
+            "content": row.content,
+            "covered_until_id": row.covered_until_id,
+            "token_count": row.token_count,
+            "updated_at": row.updated_at
+        }
+    
+    def generation_report(
+        self,
+        conversation_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        load_stall_ms: float = LOAD_STALL_MS
+    ) -> Dict[str, Dict]:
+        """
+        모델별 추론 시간 집계 (tokens/s, 프롬프트 평가 비율, 모델 로딩 지연)
+        
+        Args:
+            conversation_id: 지정하면 해당 대화만 (None이면 전체 대화)
+            since: 이 시각 이후 메시지만 (UTC)
+            load_stall_ms: 모델 로딩 지연으로 볼 최소 load 시간 (밀리초)
+            
+        Returns:
+            {model: {...}} (generation_metrics.aggregate_generations 참고)
+        """
+        pending = [
+            row for row in self._pending_rows(conversation_id)
+            if row["role"] == "assistant" and (since is None or row["timestamp"] >= since)
+        ]
+        if not pending:
+            rows = self.session.execute(
+                generation_metadata_statement(conversation_id, since).execution_options(yield_per=1000)
+            ).scalars()
+            return aggregate_generations(generation_records(rows), load_stall_ms=load_stall_ms)
+        
+        # 대기 행보다 오래된 메시지는 그대로 집계, 그 이후 메시지는 대기 행과 중복 제거
+        split = min(row["timestamp"] for row in pending)
+        older = self.session.execute(
+            generation_metadata_statement(conversation_id, since, until=split).execution_options(yield_per=1000)
+        ).scalars().all()
+        newer = self._messages_since(conversation_id, split, role="assistant")
+        unsaved = unsaved_rows(pending, [(r.timestamp, r.role, r.content) for r in newer])
+        metadata = older + [r.message_metadata for r in newer] + [row.get("message_metadata") for row in unsaved]
+        return aggregate_generations(generation_records(metadata), load_stall_ms=load_stall_ms)
+    
+    def _messages_since(self, conversation_id: Optional[int], since: datetime, role: Optional[str] = None):
+        """since 이후 저장된 메시지 (write-behind 대기 행과 중복 제거용, 보통 몇 개뿐)"""
+        query = self.session.query(
+            Message.timestamp, Message.role, Message.content, Message.message_metadata
+        ).filter(Message.timestamp >= since)
+        if conversation_id is not None:
+            query = query.filter(Message.conversation_id == conversation_id)
+        if role is not None:
+            query = query.filter(Message.role == role)
+        return query.all()
+    
     def create_conversation(self, session_id: str, title: Optional[str] = None) -> Conversation:
         """
         새 대화 세션 생성
@@ -127,9 +864,16 @@ class MemoryManager:
             conversation_id: 대화 세션 ID
             
         Returns:
-            메시지 수
+            메시지 수 (아직 저장되지 않은 write-behind 메시지 포함)
         """
-        return self.session.query(Message).filter(
-            Message.conversation_id == conversation_id
-        ).count()
+        pending = self._pending_rows(conversation_id)
+        query = self.session.query(Message).filter(Message.conversation_id == conversation_id)
+        if not pending:
+            return query.count()
+        # 대기 행보다 오래된 메시지는 개수만, 그 이후 메시지는 대기 행과 중복 제거
+        split = min(row["timestamp"] for row in pending)
+        older = query.filter(Message.timestamp < split).count()
+        newer = self._messages_since(conversation_id, split)
+        unsaved = unsaved_rows(pending, [(r.timestamp, r.role, r.content) for r in newer])
+        return older + len(newer) + len(unsaved)
 
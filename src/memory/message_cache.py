@@ -0,0 +1,203 @@
+"""Message Cache - 대화별 최근 메시지 링 버퍼 (DB 앞단 캐시)
+
+ChatManagerWithDB는 매 턴마다 방금 저장한 메시지를 DB에서 다시 읽습니다.
+같은 프로세스가 쓴 메시지는 메모리에 남겨두고 로드 시 재사용합니다.
+
+- 대화마다 최근 N개 메시지를 링 버퍼(deque)로 보관 (write-through: 저장 성공 후 추가)
+- 대화 단위 LRU: 대화 수/전체 바이트 상한을 넘으면 가장 오래 안 쓴 대화부터 제거
+- 여러 워커가 같은 DB를 쓰는 경우: MemoryManager가 로드 전에 DB의 (개수, 최대 id)와
+  버퍼를 비교해서 다르면 버퍼를 다시 채움 (signature 참고)
+"""
+
+import sys
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# 메시지 1개당 객체/dict 오버헤드 추정 (바이트)
+_MESSAGE_OVERHEAD = 200
+
+
+@dataclass
+class CachedMessage:
+    id: int
+    timestamp: datetime
+    role: str
+    content: str
+    token_count: Optional[int] = None
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.content) + _MESSAGE_OVERHEAD
+
+
+class ConversationBuffer:
+    """대화 1개의 최근 메시지 링 버퍼 (오래된 것 → 최신 순)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.messages: Deque[CachedMessage] = deque()
+        self.nbytes = 0
+        # 대화의 첫 메시지부터 전부 들어있는지 (False면 더 오래된 메시지는 DB에 있음)
+        self.complete = True
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, message: CachedMessage) -> None:
+        if len(self.messages) >= self.capacity:
+            self.pop_oldest()
+        self.messages.append(message)
+        self.nbytes += message.nbytes
+
+    def pop_oldest(self) -> None:
+        old = self.messages.popleft()
+        self.nbytes -= old.nbytes
+        self.complete = False
+
+    def copy(self) -> "ConversationBuffer":
+        """읽기용 복사본 (다른 스레드의 append와 무관하게 순회 가능)"""
+        clone = ConversationBuffer(self.capacity)
+        clone.messages = deque(self.messages)
+        clone.nbytes = self.nbytes
+        clone.complete = self.complete
+        return clone
+
+    def newest_first(self) -> Iterator[CachedMessage]:
+        return reversed(self.messages)
+
+    def signature(self) -> Optional[tuple]:
+        """
+        (가장 작은 id, 메시지 수, 가장 큰 id)
+
+        DB의 "id >= 가장 작은 id" 범위 (개수, 최대 id)와 같으면
+        다른 워커가 쓴 메시지 없이 버퍼가 최신이라고 판단합니다.
+        """
+        if not self.messages:
+            return None
+        ids = [m.id for m in self.messages]
+        return min(ids), len(ids), max(ids)
+
+
+class MessageCache:
+    """대화별 링 버퍼를 LRU로 관리하는 write-through 캐시"""
+
+    def __init__(
+        self,
+        max_messages_per_conversation: int = 200,
+        max_conversations: int = 100,
+        max_bytes: int = 16 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_messages_per_conversation: 대화당 보관할 최근 메시지 수
+            max_conversations: 보관할 최대 대화 수 (초과 시 LRU 제거)
+            max_bytes: 전체 메모리 상한 (추정치, 초과 시 LRU 제거)
+        """
+        self.max_messages_per_conversation = max_messages_per_conversation
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self._buffers: "OrderedDict[int, ConversationBuffer]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def get(self, conversation_id: int) -> Optional[ConversationBuffer]:
+        """캐시된 버퍼의 복사본 반환 (없으면 None), 조회 시 LRU 갱신"""
+        with self._lock:
+            buffer = self._buffers.get(conversation_id)
+            if buffer is None:
+                self.misses += 1
+                return None
+            self._buffers.move_to_end(conversation_id)
+            self.hits += 1
+            return buffer.copy()
+
+    def fill(self, conversation_id: int, messages: List[CachedMessage], complete: bool) -> ConversationBuffer:
+        """
+        DB에서 읽은 최근 메시지로 버퍼를 (다시) 채움
+
+        Args:
+            messages: 오래된 것 → 최신 순
+            complete: 대화의 첫 메시지부터 전부 포함했는지
+        """
+        with self._lock:
+            self._drop(conversation_id)
+            buffer = ConversationBuffer(self.max_messages_per_conversation)
+            for message in messages:
+                buffer.append(message)
+            buffer.complete = complete and len(messages) <= self.max_messages_per_conversation
+            self._buffers[conversation_id] = buffer
+            self._nbytes += buffer.nbytes
+            self._enforce_limits(keep=conversation_id)
+            return buffer.copy()
+
+    def append(self, conversation_id: int, message: CachedMessage) -> None:
+        """저장된 메시지 추가 (write-through). 캐시에 없는 대화는 무시 (다음 로드 때 채움)"""
+        with self._lock:
+            buffer = self._buffers.get(conversation_id)
+            if buffer is None:
+                return
+            before = buffer.nbytes
+            buffer.append(message)
+            self._nbytes += buffer.nbytes - before
+            self._buffers.move_to_end(conversation_id)
+            self._enforce_limits(keep=conversation_id)
+
+    def invalidate(self, conversation_id: Optional[int] = None) -> None:
+        """대화 1개 (None이면 전체) 캐시 폐기"""
+        with self._lock:
+            if conversation_id is None:
+                self._buffers.clear()
+                self._nbytes = 0
+            else:
+                self._drop(conversation_id)
+
+    def mark_refreshed(self) -> None:
+        with self._lock:
+            self.refreshes += 1
+
+    def _drop(self, conversation_id: int) -> None:
+        buffer = self._buffers.pop(conversation_id, None)
+        if buffer is not None:
+            self._nbytes -= buffer.nbytes
+
+    def _enforce_limits(self, keep: int) -> None:
+        # 1) 다른 대화부터 LRU 순으로 제거
+        while len(self._buffers) > 1 and (
+            len(self._buffers) > self.max_conversations or self._nbytes > self.max_bytes
+        ):
+            oldest = next(iter(self._buffers))
+            if oldest == keep:
+                self._buffers.move_to_end(keep)
+                oldest = next(iter(self._buffers))
+            self._drop(oldest)
+            self.evictions += 1
+
+        # 2) 대화 1개만으로 상한을 넘으면 그 대화의 오래된 메시지를 제거
+        buffer = self._buffers.get(keep)
+        while buffer is not None and self._nbytes > self.max_bytes and len(buffer) > 1:
+            before = buffer.nbytes
+            buffer.pop_oldest()
+            self._nbytes -= before - buffer.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "conversations": len(self._buffers),
+                "messages": sum(len(b) for b in self._buffers.values()),
+                "bytes": self._nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+            }
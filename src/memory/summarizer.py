@@ -0,0 +1,292 @@
+"""Conversation Summarizer - 토큰 예산 밖으로 밀려난 메시지의 누적 요약
+
+대화가 길어지면 ContextAssembler는 예산에 맞는 최근 메시지만 넣고 나머지는 버립니다.
+버려지는 메시지를 대화별 요약 1개에 조금씩 접어 넣어(fold) 두고, 매 턴 요약을 함께 주입하면
+프롬프트 크기는 (요약 상한 + 최근 메시지 예산)으로 고정된 채 오래된 맥락이 유지됩니다.
+
+- 요약 대상: ContextAssembler가 프롬프트에 실제로 넣은 가장 오래된 대화 기록(keep_from_id)보다 앞의 메시지
+  (최근 메시지 예산뿐 아니라 검색 결과/장기 기억 쿼터로 줄어든 기록도 빠짐없이 반영)
+- 요약은 conversation_summaries 테이블에 저장 (covered_until_id: 어디까지 반영했는지)
+- 증분 갱신: 매번 "이전 요약 + 새로 밀려난 메시지"만 LLM에 보내 새 요약을 만듦
+  (전체 대화를 다시 요약하지 않음, 밀려난 메시지가 많으면 chunk_tokens 단위로 나눠 여러 번 접음)
+- 요청 경로 밖에서 실행: schedule()은 큐에 넣고 바로 반환, 백그라운드 스레드가 처리
+  (같은 대화의 요청이 쌓이면 하나로 합침)
+- 비용 추적: 대화별 누적 LLM 호출 수 / 입력·출력 토큰 추정치를 테이블에 저장, 전체 통계는 stats()
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..database.models import ConversationSummary, Message
+from ..llm.llm_provider import LLMProvider
+from ..llm.token_counter import default_token_counter
+from .memory_manager import TokenEstimator, message_cost, token_count_column, tokenizer_name
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the current summary with the new messages. Keep facts about the user "
+    "(names, preferences, decisions, open questions) and drop small talk. "
+    "Write in the language of the conversation, at most {max_words} words. "
+    "Reply with the updated summary only."
+)
+
+# (id, role, content, token_count)
+_Row = Tuple[int, str, str, Optional[int]]
+
+
+class ConversationSummarizer:
+    """대화별 누적 요약을 백그라운드에서 갱신하는 요약기"""
+
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        session_factory: Callable[[], Session],
+        token_estimator: Optional[TokenEstimator] = None,
+        max_summary_tokens: int = 300,
+        chunk_tokens: int = 2000,
+        temperature: float = 0.2,
+        background: bool = True
+    ):
+        """
+        Args:
+            llm_provider: 요약에 사용할 LLM (작은 모델을 따로 써도 됨)
+            session_factory: 요약기 전용 세션 생성 함수 (예: sessionmaker(bind=engine))
+            token_estimator: 텍스트 → 토큰 수 함수 (chunk 나누기/비용 추정용, MemoryManager와 같은 함수 권장)
+            max_summary_tokens: 요약 최대 토큰 수 (프롬프트에서 이만큼을 요약용으로 예약)
+            chunk_tokens: LLM 호출 1번에 접어 넣을 메시지 토큰 수
+            temperature: 요약 생성 온도
+            background: False면 schedule()이 바로 요약 (테스트/스크립트용)
+        """
+        self.llm_provider = llm_provider
+        self.session_factory = session_factory
+        self.token_estimator = token_estimator or default_token_counter()
+        self.max_summary_tokens = max_summary_tokens
+        self.chunk_tokens = chunk_tokens
+        self.temperature = temperature
+        self.background = background
+
+        # conversation_id → keep_from_id (같은 대화는 마지막 요청만 남김)
+        self._pending: "OrderedDict[int, int]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._closed = False
+
+        self.runs = 0
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.messages_folded = 0
+        self.seconds = 0.0
+        self.failures = 0
+
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="summarizer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def schedule(self, conversation_id: int, keep_from_id: int) -> None:
+        """
+        요약 갱신 요청 (background 모드에서는 즉시 반환)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            keep_from_id: 프롬프트에 들어간 가장 오래된 대화 기록 id (이보다 앞의 메시지를 요약에 반영)
+        """
+        if not self.background:
+            self.summarize(conversation_id, keep_from_id)
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._pending[conversation_id] = keep_from_id
+            self._pending.move_to_end(conversation_id)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        대기 중인 요약이 모두 끝날 때까지 대기
+
+        Returns:
+            timeout 전에 모두 끝났는지 여부
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._running:
+                if self._thread is None or not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(timeout=remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """남은 요약을 처리하고 스레드 종료 (여러 번 호출해도 안전)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                conversation_id, keep_from_id = self._pending.popitem(last=False)
+                self._running += 1
+            try:
+                self.summarize(conversation_id, keep_from_id)
+            except Exception as e:
+                # 다음 schedule 때 같은 범위부터 다시 시도 (covered_until_id는 성공한 만큼만 전진)
+                logger.warning("summarizer failed for conversation %s: %s", conversation_id, e)
+            finally:
+                with self._cond:
+                    self._running -= 1
+                    self._cond.notify_all()
+
+    def _evicted(self, session: Session, conversation_id: int, covered_until_id: int, keep_from_id: int) -> List[_Row]:
+        """요약에 아직 반영되지 않았고 프롬프트에도 들어가지 않은 메시지 (오래된 것부터)"""
+        # 다른 토크나이저로 센 token_count는 NULL로 읽어서 다시 셈 (message_cost)
+        token_count = token_count_column(tokenizer_name(self.token_estimator))
+        return session.query(Message.id, Message.role, Message.content, token_count).filter(
+            Message.conversation_id == conversation_id,
+            Message.id > covered_until_id,
+            Message.id < keep_from_id
+        ).order_by(Message.id).all()
+
+    def _chunks(self, rows: List[_Row]) -> List[List[_Row]]:
+        chunks: List[List[_Row]] = [[]]
+        used = 0
+        for row in rows:
+            cost = message_cost(self.token_estimator, row[1], row[2], row[3])
+            if chunks[-1] and used + cost > self.chunk_tokens:
+                chunks.append([])
+                used = 0
+            chunks[-1].append(row)
+            used += cost
+        return chunks
+
+    def _fold(self, summary: str, rows: List[_Row]) -> Tuple[str, int, int]:
+        """이전 요약 + 새 메시지 → 새 요약 (새 요약, 입력 토큰, 출력 토큰)"""
+        lines = "\n".join(f"{role}: {content}" for _, role, content, _ in rows)
+        messages = [
+            {
+                "role": "system",
+                # 대략 1 토큰 ≈ 0.75 단어
+                "content": SUMMARY_SYSTEM_PROMPT.format(max_words=int(self.max_summary_tokens * 0.75))
+            },
+            {
+                "role": "user",
+                "content": f"Current summary:\n{summary or '(empty)'}\n\nNew messages:\n{lines}"
+            }
+        ]
+        response = self.llm_provider.generate(
+            messages,
+            temperature=self.temperature,
+            max_tokens=self.max_summary_tokens
+        ).strip()
+        input_tokens = sum(self.token_estimator(m["content"]) for m in messages)
+        return response, input_tokens, self.token_estimator(response)
+
+    def summarize(self, conversation_id: int, keep_from_id: int) -> Optional[Dict[str, Any]]:
+        """
+        밀려난 메시지를 요약에 반영 (요청 경로에서 직접 부르지 말 것, schedule 사용)
+
+        Args:
+            conversation_id: 대화 세션 ID
+            keep_from_id: 프롬프트에 들어간 가장 오래된 대화 기록 id (이보다 앞의 메시지를 반영)
+
+        Returns:
+            갱신된 요약 정보 (반영할 메시지가 없으면 None)
+        """
+        started = time.perf_counter()
+        session = self.session_factory()
+        try:
+            row = session.get(ConversationSummary, conversation_id)
+            evicted = self._evicted(session, conversation_id, row.covered_until_id if row else 0, keep_from_id)
+            if not evicted:
+                return None
+
+            if row is None:
+                row = ConversationSummary(
+                    conversation_id=conversation_id,
+                    content="",
+                    covered_until_id=0,
+                    token_count=0,
+                    llm_calls=0,
+                    input_tokens=0,
+                    output_tokens=0,
+                    messages_folded=0
+                )
+                session.add(row)
+
+            for chunk in self._chunks(evicted):
+                content, input_tokens, output_tokens = self._fold(row.content, chunk)
+                row.content = content
+                row.covered_until_id = chunk[-1][0]
+                row.token_count = output_tokens
+                row.updated_at = datetime.utcnow()
+                row.llm_calls += 1
+                row.input_tokens += input_tokens
+                row.output_tokens += output_tokens
+                row.messages_folded += len(chunk)
+                # chunk마다 커밋 (중간에 실패해도 반영한 만큼은 유지)
+                session.commit()
+                with self._cond:
+                    self.llm_calls += 1
+                    self.input_tokens += input_tokens
+                    self.output_tokens += output_tokens
+                    self.messages_folded += len(chunk)
+
+            return {
+                "content": row.content,
+                "covered_until_id": row.covered_until_id,
+                "token_count": row.token_count,
+                "llm_calls": row.llm_calls,
+                "messages_folded": row.messages_folded,
+            }
+        except Exception:
+            session.rollback()
+            with self._cond:
+                self.failures += 1
+            raise
+        finally:
+            session.close()
+            with self._cond:
+                self.runs += 1
+                self.seconds += time.perf_counter() - started
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending) + self._running,
+                "runs": self.runs,
+                "llm_calls": self.llm_calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "messages_folded": self.messages_folded,
+                "seconds": round(self.seconds, 3),
+                "failures": self.failures,
+            }
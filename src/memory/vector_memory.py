@@ -0,0 +1,374 @@
+"""Vector Memory - 장기 기억 벡터 검색 (메시지 임베딩 인덱스)
+
+최근 메시지만 재주입하면 예산 밖으로 밀려난 오래된 대화는 다시 볼 수 없습니다.
+메시지를 임베딩해 두고, 현재 질문과 의미가 가까운 과거 메시지 top-k를 찾아
+ContextAssembler가 최근 메시지와 함께 컨텍스트에 넣도록 합니다.
+
+- 저장: message_embeddings 테이블 (message_id, model, float32 BLOB)
+  MemoryManager.save_message가 쓰기 전에 임베딩을 계산하고 메시지와 같은 트랜잭션에서 저장
+  (임베딩 호출 동안 쓰기 락을 잡지 않음)
+- 검색: 대화별 (n, dim) 행렬을 메모리에 올려두고 정규화 벡터 내적으로 brute-force top-k
+  (numpy가 있으면 행렬 곱 한 번, 없으면 순수 파이썬)
+- 동기화: 검색 전에 "마지막으로 본 id 이후" 메시지만 확인해서
+  다른 워커/write-behind/기존 DB의 임베딩 안 된 메시지를 배치로 임베딩 (backfill)
+  임베딩 호출은 락 밖에서, 저장은 호출한 세션의 SAVEPOINT 안에서 (commit은 호출한 쪽에서)
+- 대화 단위 LRU로 메모리에 올려둘 대화 수 제한
+- 비동기 (search_async): DB 조회/저장은 AsyncSession.run_sync, 임베딩 호출과 top-k는 asyncio.to_thread
+  (AsyncMemoryManager에서 사용, 이벤트 루프를 막지 않음)
+
+대화 1개는 보통 수천 개 메시지 이하이므로 ANN 인덱스 없이 정확한 top-k를 씁니다.
+(recall 100%, 2만 개 x 512차원 기준 numpy로 질의당 수 ms - benchmarks/bench_vector_memory.py)
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database.models import Message, MessageEmbedding
+from ..llm.embeddings import EmbedFn, normalize, np, top_similar
+
+
+logger = logging.getLogger(__name__)
+
+# 임베딩하는 역할 (system/tool/search 메시지는 장기 기억 대상이 아님)
+INDEXED_ROLES = ("user", "assistant")
+
+# (message_id, conversation_id, content)
+IndexItem = Tuple[int, int, str]
+
+
+def pack_vector(vector: Sequence[float]) -> bytes:
+    """벡터 → float32 리틀 엔디언 바이트"""
+    packed = array("f", vector)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_vector(blob: bytes):
+    """float32 리틀 엔디언 바이트 → 벡터 (numpy가 있으면 ndarray)"""
+    if np is not None:
+        return np.frombuffer(blob, dtype="<f4")
+    unpacked = array("f")
+    unpacked.frombytes(blob)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+class _ConversationIndex:
+    """대화 1개의 임베딩 행렬 (추가분은 모아뒀다가 검색 시 한 번에 합침)"""
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.id_set: Set[int] = set()
+        self.matrix = None
+        self.pending: List = []
+        # 이 id까지의 메시지는 DB와 동기화됨
+        self.checked_id = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, message_id: int, vector) -> None:
+        if message_id in self.id_set:
+            return
+        self.ids.append(message_id)
+        self.id_set.add(message_id)
+        self.pending.append(vector)
+
+    def vectors(self):
+        if self.pending:
+            if np is not None:
+                rows = np.asarray(self.pending, dtype=np.float32)
+                self.matrix = rows if self.matrix is None else np.vstack([self.matrix, rows])
+            else:
+                self.matrix = (self.matrix or []) + [list(v) for v in self.pending]
+            self.pending = []
+        return self.matrix if self.matrix is not None else []
+
+
+class VectorMemory:
+    """메시지 임베딩 저장 + 대화별 top-k 의미 검색"""
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        model: str = "default",
+        batch_size: int = 64,
+        max_conversations: int = 256
+    ):
+        """
+        Args:
+            embed_fn: 텍스트 리스트 → 벡터 리스트 (src.llm.embeddings 참고)
+            model: 임베딩 모델 이름 (DB에 함께 저장, 다르면 다시 임베딩)
+            batch_size: backfill 시 한 번에 임베딩할 메시지 수
+            max_conversations: 메모리에 올려둘 최대 대화 수 (LRU)
+        """
+        self.embed_fn = embed_fn
+        self.model = model
+        self.batch_size = batch_size
+        self.max_conversations = max_conversations
+        self._indexes: "OrderedDict[int, _ConversationIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.embedded = 0
+        self.loaded = 0
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            vectors.extend(normalize(v) for v in self.embed_fn(batch))
+        self.embedded += len(texts)
+        return vectors
+
+    def _store(self, session: Session, items: Sequence[IndexItem], vectors: Sequence[Sequence[float]]) -> None:
+        ids = [message_id for message_id, _, _ in items]
+        # 다른 모델로 만든 임베딩은 교체
+        session.execute(delete(MessageEmbedding).where(MessageEmbedding.message_id.in_(ids)))
+        session.add_all([
+            MessageEmbedding(
+                message_id=message_id,
+                conversation_id=conversation_id,
+                model=self.model,
+                dim=len(vector),
+                vector=pack_vector(vector)
+            )
+            for (message_id, conversation_id, _), vector in zip(items, vectors)
+        ])
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        정규화된 임베딩 계산 (DB 접근 없음)
+
+        쓰기 트랜잭션을 열기 전에 호출해서 index_messages(vectors=...)에 넘기면
+        임베딩 호출(네트워크) 동안 DB 쓰기 락을 잡지 않습니다.
+        """
+        return self._embed(texts)
+
+    def index_messages(
+        self,
+        session: Session,
+        items: Sequence[IndexItem],
+        vectors: Optional[Sequence[Sequence[float]]] = None
+    ) -> int:
+        """
+        메시지 임베딩 저장 (commit은 호출한 쪽에서, 메시지 저장과 같은 트랜잭션)
+
+        Args:
+            session: 메시지를 저장 중인 세션 (메시지 id가 정해진 뒤 = flush 후)
+            items: [(message_id, conversation_id, content), ...]
+            vectors: embed()로 미리 계산한 벡터 (없으면 여기서 임베딩)
+
+        Returns:
+            임베딩한 메시지 수
+        """
+        if not items:
+            return 0
+        if vectors is None:
+            vectors = self._embed([content for _, _, content in items])
+        self._store(session, items, vectors)
+        with self._lock:
+            for (message_id, conversation_id, _), vector in zip(items, vectors):
+                index = self._indexes.get(conversation_id)
+                if index is not None:
+                    index.add(message_id, vector)
+        return len(items)
+
+    def _index_for(self, conversation_id: int) -> Tuple[_ConversationIndex, int]:
+        """대화 인덱스 (없으면 생성, LRU 갱신)와 마지막으로 확인한 id"""
+        with self._lock:
+            index = self._indexes.get(conversation_id)
+            if index is None:
+                index = _ConversationIndex()
+                self._indexes[conversation_id] = index
+                while len(self._indexes) > self.max_conversations:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(conversation_id)
+            return index, index.checked_id
+
+    def _new_rows(self, session: Session, conversation_id: int, checked_id: int) -> List[Tuple]:
+        """마지막으로 확인한 id 이후 메시지 + 이 모델의 임베딩 (없으면 NULL)"""
+        return session.query(Message.id, Message.content, MessageEmbedding.vector).outerjoin(
+            MessageEmbedding,
+            and_(MessageEmbedding.message_id == Message.id, MessageEmbedding.model == self.model)
+        ).filter(
+            Message.conversation_id == conversation_id,
+            Message.id > checked_id,
+            Message.role.in_(INDEXED_ROLES)
+        ).order_by(Message.id).all()
+
+    def _load(self, index: _ConversationIndex, conversation_id: int, rows: List[Tuple]) -> List[IndexItem]:
+        """저장된 임베딩은 인덱스에 올리고, 임베딩이 없는 메시지 반환 (backfill 대상)"""
+        missing: List[IndexItem] = []
+        with self._lock:
+            for message_id, content, blob in rows:
+                if message_id in index.id_set:
+                    continue
+                if blob is None:
+                    missing.append((message_id, conversation_id, content))
+                else:
+                    index.add(message_id, unpack_vector(blob))
+                    self.loaded += 1
+        return missing
+
+    def _store_backfill(
+        self,
+        session: Session,
+        conversation_id: int,
+        missing: Sequence[IndexItem],
+        vectors: Sequence[Sequence[float]]
+    ) -> None:
+        try:
+            with session.begin_nested():
+                self._store(session, missing, vectors)
+        except IntegrityError:
+            # 다른 워커가 같은 메시지를 먼저 임베딩함 (메모리의 벡터는 그대로 사용)
+            logger.debug("embedding backfill raced with another writer (conversation %s)", conversation_id)
+
+    def _finish_refresh(
+        self,
+        index: _ConversationIndex,
+        missing: Sequence[IndexItem],
+        vectors: Sequence[Sequence[float]],
+        last_id: int
+    ) -> None:
+        with self._lock:
+            for (message_id, _, _), vector in zip(missing, vectors):
+                index.add(message_id, vector)
+            index.checked_id = max(index.checked_id, last_id)
+
+    def _refresh(self, session: Session, conversation_id: int) -> _ConversationIndex:
+        """
+        마지막으로 확인한 id 이후 메시지를 인덱스에 반영 (임베딩 없는 메시지는 backfill)
+
+        backfill 임베딩(네트워크 호출)은 락 밖에서 하고, 저장은 호출한 세션의 SAVEPOINT 안에서 합니다.
+        (commit은 호출한 쪽에서 - 커밋되지 않으면 다음에 다시 임베딩)
+        """
+        index, checked_id = self._index_for(conversation_id)
+        rows = self._new_rows(session, conversation_id, checked_id)
+        if not rows:
+            return index
+
+        missing = self._load(index, conversation_id, rows)
+        vectors: List[List[float]] = []
+        if missing:
+            vectors = self._embed([content for _, _, content in missing])
+            self._store_backfill(session, conversation_id, missing, vectors)
+        self._finish_refresh(index, missing, vectors, rows[-1][0])
+        return index
+
+    def _rank(
+        self,
+        index: _ConversationIndex,
+        query: str,
+        k: int,
+        excluded: Set[int],
+        min_similarity: float
+    ) -> List[Tuple[int, float]]:
+        """질의 임베딩 + top-k (DB 접근 없음, 비동기에서는 스레드에서 실행)"""
+        with self._lock:
+            if not len(index):
+                return []
+            vectors = index.vectors()
+            ids = list(index.ids)
+
+        query_vector = self._embed([query])[0]
+        ranked = top_similar(query_vector, vectors, k=min(k + len(excluded), len(ids)))
+        results = []
+        for i, score in ranked:
+            if score < min_similarity:
+                break
+            if ids[i] in excluded:
+                continue
+            results.append((ids[i], score))
+            if len(results) >= k:
+                break
+        return results
+
+    def search(
+        self,
+        session: Session,
+        conversation_id: int,
+        query: str,
+        k: int = 4,
+        exclude_ids: Optional[Iterable[int]] = None,
+        min_similarity: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """
+        대화에서 query와 의미가 가장 가까운 메시지 top-k
+
+        Args:
+            session: DB 세션 (새 메시지 동기화용)
+            conversation_id: 대화 세션 ID
+            query: 질의 텍스트 (보통 현재 사용자 메시지)
+            k: 반환 개수
+            exclude_ids: 제외할 메시지 id (이미 컨텍스트에 있는 최근 메시지 등)
+            min_similarity: 이 유사도 미만은 제외
+
+        Returns:
+            [(message_id, 유사도), ...] (유사도 내림차순)
+        """
+        if k <= 0 or not (query or "").strip():
+            return []
+        index = self._refresh(session, conversation_id)
+        return self._rank(index, query, k, set(exclude_ids or ()), min_similarity)
+
+    async def search_async(
+        self,
+        session: AsyncSession,
+        conversation_id: int,
+        query: str,
+        k: int = 4,
+        exclude_ids: Optional[Iterable[int]] = None,
+        min_similarity: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """
+        search()의 비동기 버전 (DB는 run_sync, 임베딩/top-k는 asyncio.to_thread)
+
+        Args:
+            session: AsyncSession (backfill 저장은 SAVEPOINT까지, commit은 호출한 쪽에서)
+            나머지는 search()와 같음
+
+        Returns:
+            [(message_id, 유사도), ...] (유사도 내림차순)
+        """
+        if k <= 0 or not (query or "").strip():
+            return []
+        index, checked_id = self._index_for(conversation_id)
+        rows = await session.run_sync(lambda s: self._new_rows(s, conversation_id, checked_id))
+        if rows:
+            missing = self._load(index, conversation_id, rows)
+            vectors: List[List[float]] = []
+            if missing:
+                vectors = await asyncio.to_thread(self._embed, [content for _, _, content in missing])
+                await session.run_sync(lambda s: self._store_backfill(s, conversation_id, missing, vectors))
+            self._finish_refresh(index, missing, vectors, rows[-1][0])
+        return await asyncio.to_thread(self._rank, index, query, k, set(exclude_ids or ()), min_similarity)
+
+    def invalidate(self, conversation_id: Optional[int] = None) -> None:
+        """메모리의 인덱스 제거 (다음 검색 때 DB에서 다시 로드)"""
+        with self._lock:
+            if conversation_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(conversation_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "conversations": len(self._indexes),
+                "vectors": sum(len(index) for index in self._indexes.values()),
+                "embedded": self.embedded,
+                "loaded": self.loaded,
+            }
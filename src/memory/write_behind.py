@@ -0,0 +1,313 @@
+"""Write-Behind Writer - 메시지 저장을 모아서 한 번에 커밋
+
+MemoryManager.save_message는 메시지마다 commit(= fsync)을 하므로
+한 턴(user + assistant)마다 요청 경로에서 동기 커밋이 2번 일어납니다.
+
+write-behind 모드에서는
+- save_message는 큐에 넣고 바로 반환
+- 백그라운드 스레드가 batch_size개가 모이거나 flush_interval이 지나면 한 트랜잭션으로 bulk insert
+- 실패한 배치는 backoff 후 재시도 (순서 유지)
+- 재시도를 다 써도 실패하면 한 행씩 저장해서 저장할 수 없는 행(제약 위반 등)만 dead_letters로 빼고 계속 진행
+  (DB 연결 문제처럼 일시적인 오류면 아무것도 버리지 않고 다시 재시도)
+- 프로세스 종료 시(atexit) / close() 시 남은 메시지를 모두 저장
+
+주의:
+- 쓰기 전용 세션을 따로 사용 (요청 경로의 세션과 스레드 간 공유하지 않음)
+- 아직 저장되지 않은 행은 DB에서 보이지 않음
+  MemoryManager는 읽을 때 pending_rows()로 대기 행을 DB/캐시 결과와 합치므로 flush를 기다리지 않음
+  (저장 완료가 필요할 때만 flush() 호출 - 종료 전, 다른 프로세스가 읽기 전 등)
+- 배치 커밋 직후 큐에서 빠지기 전까지는 DB와 대기 행 양쪽에 보일 수 있음
+  (MemoryManager는 (timestamp, role, content)로 중복 제거)
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from ..database.models import Message
+
+
+logger = logging.getLogger(__name__)
+
+FlushListener = Callable[[List[Message]], None]
+
+# 다시 시도하면 성공할 수 있는 오류 (연결 끊김, 잠금 대기 초과, 풀 고갈 등)
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, PoolTimeoutError)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """일시적인 DB 오류인지 (False면 같은 행은 다시 시도해도 실패: 제약 위반, 잘못된 컬럼 등)"""
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+class WriteBehindWriter:
+    """메시지를 버퍼링해 백그라운드 스레드에서 배치로 저장하는 writer"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        max_pending: int = 10000,
+        max_dead_letters: int = 1000,
+    ):
+        """
+        Args:
+            session_factory: 쓰기 전용 세션 생성 함수 (예: sessionmaker(bind=engine))
+            batch_size: 이 개수가 모이면 즉시 flush
+            flush_interval: 최대 대기 시간 (초), 이 시간이 지나면 개수와 무관하게 flush
+            max_retries: 배치 1개당 연속 재시도 횟수 (초과 시 잠시 쉬었다가 다시 시도)
+            retry_backoff: 재시도 간격 (초, 시도마다 2배)
+            max_pending: 대기 메시지 상한 (초과 시 submit이 flush를 기다림)
+            max_dead_letters: 저장할 수 없어 뺀 행을 보관할 최대 개수 (dead_letters, 오래된 것부터 버림)
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_pending = max_pending
+
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._persisted = 0
+        self._closed = False
+        self._flush_waiters = 0
+        self._listeners: List[FlushListener] = []
+        # 저장할 수 없어 큐에서 뺀 행과 오류 메시지 (확인/재처리용)
+        self.dead_letters: Deque[Tuple[Dict[str, Any], str]] = deque(maxlen=max_dead_letters)
+
+        self.flushes = 0
+        self.retries = 0
+        self.failures = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_flush_listener(self, listener: FlushListener) -> None:
+        """배치 저장 직후 (id가 채워진 Message 리스트로) 호출될 함수 등록"""
+        self._listeners.append(listener)
+
+    def submit(self, row: Dict[str, Any]) -> None:
+        """
+        저장할 메시지 1개를 큐에 추가 (즉시 반환)
+
+        Args:
+            row: Message 컬럼 dict (conversation_id, role, content, timestamp, ...)
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind writer is closed")
+            while len(self._pending) >= self.max_pending:
+                # 백프레셔: DB가 따라오지 못하면 요청 경로를 잠시 멈춤
+                self._cond.notify_all()
+                self._cond.wait(timeout=self.flush_interval)
+            self._pending.append(row)
+            self._submitted += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 submit된 메시지가 모두 저장될 때까지 대기
+
+        Returns:
+            timeout 전에 모두 저장됐는지 여부
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            target = self._submitted
+            self._flush_waiters += 1
+            try:
+                while self._persisted + self.dropped < target:
+                    if not self._thread.is_alive():
+                        return False
+                    self._cond.notify_all()
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(timeout=remaining if remaining is not None else self.flush_interval)
+                return True
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """남은 메시지를 저장하고 스레드 종료 (여러 번 호출해도 안전)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        atexit.unregister(self.close)
+        if self._pending:
+            logger.error("write-behind: %d messages not persisted on close", len(self._pending))
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def pending_rows(self, conversation_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        아직 저장이 끝나지 않은 행 (submit 순서, flush를 기다리지 않음)
+
+        커밋이 끝난 행은 flush listener 호출 후 큐에서 빠지므로, 이 스냅샷을 먼저 얻고 DB/캐시를 읽으면
+        행이 빠지는 일은 없고 커밋 직후의 행만 양쪽에 있을 수 있습니다.
+
+        Args:
+            conversation_id: 지정하면 해당 대화의 행만 (None이면 전체)
+
+        Returns:
+            submit한 row dict 리스트 (수정하지 말 것)
+        """
+        with self._cond:
+            return [
+                row for row in self._pending
+                if conversation_id is None or row.get("conversation_id") == conversation_id
+            ]
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            deadline = time.monotonic() + self.flush_interval
+            while not self._closed and len(self._pending) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                # flush()가 기다리는 중이면 시간/개수 조건을 기다리지 않고 바로 처리
+                if remaining <= 0 or (self._pending and self._flush_waiters):
+                    break
+                self._cond.wait(timeout=remaining)
+            return list(islice(self._pending, self.batch_size))
+
+    def _run(self) -> None:
+        attempt = 0
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                with self._cond:
+                    if self._closed and not self._pending:
+                        return
+                continue
+
+            try:
+                messages = self._write(batch)
+            except Exception as e:
+                attempt += 1
+                self.retries += 1
+                logger.warning("write-behind flush failed (attempt %d): %s", attempt, e)
+                if attempt <= self.max_retries:
+                    time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+                    continue
+
+                self.failures += 1
+                attempt = 0
+                # 배치를 한 행씩 저장해서 저장할 수 없는 행만 빼고 나머지는 진행
+                messages, dead, processed = self._write_rows(batch)
+                if processed:
+                    self._complete(batch[:processed], messages, dead)
+                    continue
+                with self._cond:
+                    if self._closed:
+                        # 종료 중에도 계속 실패하면 남은 메시지는 버림 (로그로 남김)
+                        self.dropped += len(self._pending)
+                        logger.error("write-behind: dropping %d messages", len(self._pending))
+                        self._pending.clear()
+                        self._cond.notify_all()
+                        return
+                time.sleep(self.retry_backoff * (2 ** self.max_retries))
+                continue
+
+            attempt = 0
+            self._complete(batch, messages, [])
+
+    def _complete(
+        self,
+        batch: List[Dict[str, Any]],
+        messages: List[Message],
+        dead: List[Tuple[Dict[str, Any], str]]
+    ) -> None:
+        """큐 앞의 batch를 처리 완료로 표시 (messages: 저장됨, dead: 저장할 수 없어 뺌)"""
+        if messages:
+            for listener in self._listeners:
+                try:
+                    listener(messages)
+                except Exception as e:
+                    logger.warning("write-behind listener failed: %s", e)
+
+        for row, error in dead:
+            logger.error(
+                "write-behind: dropping unwritable message (conversation_id=%s, role=%s): %s",
+                row.get("conversation_id"), row.get("role"), error
+            )
+
+        with self._cond:
+            for _ in batch:
+                self._pending.popleft()
+            self._persisted += len(messages)
+            self.dropped += len(dead)
+            self.dead_letters.extend(dead)
+            self.flushes += 1
+            self._cond.notify_all()
+
+    def _write_rows(
+        self,
+        batch: List[Dict[str, Any]]
+    ) -> Tuple[List[Message], List[Tuple[Dict[str, Any], str]], int]:
+        """
+        한 행씩 저장 (재시도를 다 쓴 배치에서 저장할 수 없는 행을 골라냄)
+
+        Returns:
+            (저장된 Message 리스트, [(뺀 행, 오류)], 처리한 행 수)
+            일시적인 오류를 만나면 그 행 앞에서 멈춤 (그 행부터는 큐에 남아 다시 재시도)
+        """
+        messages: List[Message] = []
+        dead: List[Tuple[Dict[str, Any], str]] = []
+        for processed, row in enumerate(batch):
+            try:
+                messages.extend(self._write([row]))
+            except Exception as e:
+                if is_transient_error(e):
+                    return messages, dead, processed
+                dead.append((row, repr(e)))
+        return messages, dead, len(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> List[Message]:
+        session = self.session_factory()
+        try:
+            messages = [Message(**row) for row in batch]
+            session.add_all(messages)
+            session.flush()
+            # commit 시 속성이 만료되지 않도록 먼저 세션에서 분리 (listener가 id/내용을 읽음)
+            session.expunge_all()
+            session.commit()
+            return messages
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "submitted": self._submitted,
+                "persisted": self._persisted,
+                "pending": len(self._pending),
+                "flushes": self.flushes,
+                "retries": self.retries,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "dead_letters": len(self.dead_letters),
+            }
@@ -1,8 +1,32 @@
 """Context Assembler - LLM에 보낼 메시지 조립"""
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import os
 
+from ..llm.token_counter import TokenCounter, default_token_counter
+from .token_budget import (
+    MESSAGE_OVERHEAD_TOKENS,
+    SectionPolicy,
+    allocate_budget,
+    compact_text,
+    default_section_policies,
+    truncate_text,
+)
+from .tokenized_history import TokenizedHistory
+
+
+# 리스트로 받은 대화 기록의 토큰 수를 최신 메시지부터 이 개수씩 배치로 계산
+_COUNT_CHUNK_SIZE = 64
+
+Memories = Union[List[Dict[str, str]], TokenizedHistory]
+
+# 시스템 메시지에 붙는 가변 섹션 제목 (이 순서로 붙음)
+SECTION_HEADERS = {
+    "search": "Search Results",
+    "summary": "Summary of earlier conversation",
+    "long_term": "Relevant earlier conversation",
+}
+
 
 class ContextAssembler:
     """LLM에 보낼 메시지 컨텍스트를 조립하는 클래스"""
@@ -11,16 +35,41 @@ class ContextAssembler:
         self,
         system_prompt_template: str = None,
         max_tokens: int = 4096,
-        chars_per_token: float = 4.0  # 대략 1 토큰 ≈ 4 문자
+        chars_per_token: float = 4.0,  # 대략 1 토큰 ≈ 4 문자 (영문 기준)
+        long_term_ratio: float = 0.25,
+        token_counter: Optional[TokenCounter] = None,
+        reserved_output_tokens: int = 0,
+        section_policies: Optional[Dict[str, SectionPolicy]] = None,
+        stable_prefix: bool = False,
+        prefix_block_tokens: Optional[int] = None
     ):
         """
         Args:
             system_prompt_template: 시스템 프롬프트 템플릿 경로 또는 텍스트
-            max_tokens: 최대 토큰 수
-            chars_per_token: 토큰당 문자 수 추정값
+            max_tokens: 최대 토큰 수 (모델 컨텍스트 창, 예: Ollama num_ctx)
+            chars_per_token: 영문 토큰당 문자 수 추정값 (token_counter가 없을 때 사용)
+            long_term_ratio: 장기 기억(relevant_memories)에 쓸 가변 예산 최대 비율 (section_policies가 없을 때 사용)
+            token_counter: 토큰 카운터 (기본값: default_token_counter, 토크나이저가 없으면 문자 종류별 추정)
+            reserved_output_tokens: 응답 생성용으로 비워 둘 토큰 수 (프롬프트 예산에서 제외)
+            section_policies: 섹션별 우선순위/쿼터 (기본값: default_section_policies(long_term_ratio))
+            stable_prefix: True면 턴마다 바뀌는 섹션(검색 결과/요약/장기 기억)을 첫 시스템 메시지가 아닌
+                현재 사용자 메시지 바로 앞의 시스템 메시지로 보냄 (시스템 프롬프트와 이전 대화 기록이
+                매 턴 같은 바이트로 시작하므로 Ollama가 앞부분의 프롬프트 평가(KV 캐시)를 재사용)
+            prefix_block_tokens: stable_prefix일 때 TokenizedHistory 창 시작을 옮기는 단위
+                (기본값: max_tokens // 4, TokenizedHistory.window_start 참고)
         """
         self.max_tokens = max_tokens
         self.chars_per_token = chars_per_token
+        self.long_term_ratio = long_term_ratio
+        self.token_counter = token_counter or default_token_counter(chars_per_token)
+        self.reserved_output_tokens = reserved_output_tokens
+        self.section_policies = section_policies or default_section_policies(long_term_ratio)
+        self.stable_prefix = stable_prefix
+        self.prefix_block_tokens = prefix_block_tokens if prefix_block_tokens is not None else max_tokens // 4
+        # 마지막 build_context의 섹션별 예산/사용량 (디버깅/모니터링용)
+        self.last_allocation: Dict[str, Dict[str, int]] = {}
+        # 마지막 build_context에서 프롬프트에 들어간 대화 기록 (memories의 최신 쪽 슬라이스)
+        self.last_history: List[Dict[str, str]] = []
         
         # 시스템 프롬프트 로드
         if system_prompt_template is None:
@@ -53,9 +102,25 @@ class ContextAssembler:
         Returns:
             추정된 토큰 수
         """
-        return int(len(text) / self.chars_per_token)
+        return self.token_counter(text)
+    
+    def _memory_tokens(self, memories: List[Dict[str, str]]) -> List[int]:
+        """
+        메시지별 토큰 수 (content + role + 채팅 템플릿 구분 토큰 MESSAGE_OVERHEAD_TOKENS)
+        
+        캐시에 없는 content만 한 번에 배치로 계산합니다.
+        
+        Args:
+            memories: 메시지 리스트
+            
+        Returns:
+            메시지별 토큰 수 리스트
+        """
+        contents = self.token_counter.count_batch([m.get("content", "") for m in memories])
+        roles = self.token_counter.count_batch([m.get("role", "") for m in memories])
+        return [c + r + MESSAGE_OVERHEAD_TOKENS for c, r in zip(contents, roles)]
     
-    def _estimate_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
+    def _estimate_messages_tokens(self, messages: Memories) -> int:
         """
         메시지 리스트의 전체 토큰 수 추정
         
@@ -65,46 +130,150 @@ class ContextAssembler:
         Returns:
             추정된 토큰 수
         """
-        total_chars = 0
-        for msg in messages:
-            # role + content + 메타데이터 추정
-            content = msg.get("content", "")
-            role = msg.get("role", "")
-            total_chars += len(content) + len(role) + 10  # 메타데이터 추정
+        # role + content + 채팅 템플릿 구분 토큰 (_memory_tokens)
+        if isinstance(messages, TokenizedHistory):
+            return messages.total_tokens
+        return sum(self._memory_tokens(messages))
+    
+    def history_token_budget(self) -> int:
+        """
+        이전 대화 기록에 쓸 수 있는 토큰 수
+        
+        MemoryManager.load_messages_within_budget에 넘겨 DB에서 필요한 만큼만 로드할 때 사용
         
-        return int(total_chars / self.chars_per_token)
+        Returns:
+            대화 기록 토큰 예산
+        """
+        # 시스템 프롬프트 토큰 추정
+        system_tokens = self._estimate_tokens(self.system_prompt)
+        # 사용자 메시지를 위한 여유 공간 (대략 추정) + 응답용 예약 + 시스템/사용자 메시지 구분 토큰
+        reserved_tokens = system_tokens + 100 + self.reserved_output_tokens + 2 * MESSAGE_OVERHEAD_TOKENS
+        return max(self.max_tokens - reserved_tokens, 0)
+    
+    def new_history(self, messages: Optional[List[Dict[str, str]]] = None) -> TokenizedHistory:
+        """
+        이 Assembler의 토큰 카운터로 세는 TokenizedHistory 생성
+        
+        매 턴 build_context에 넘길 대화 기록을 리스트 대신 이것으로 유지하면
+        메시지는 추가할 때 한 번만 토큰화되고, 선택은 이진 탐색으로 끝납니다.
+        """
+        return TokenizedHistory(self.token_counter, messages)
     
     def build_context(
         self,
-        memories: List[Dict[str, str]],
+        memories: Memories,
         user_message: str,
-        search_results: Optional[str] = None
+        search_results: Optional[str] = None,
+        relevant_memories: Optional[List[Dict[str, str]]] = None,
+        summary: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """
         LLM에 보낼 메시지 컨텍스트 조립
-        
+
+        시스템 프롬프트 + 현재 사용자 메시지 + 응답용 예약을 뺀 나머지 예산을
+        section_policies에 따라 검색 결과/요약/장기 기억/대화 기록에 나눠 주고,
+        섹션마다 배분량에 맞게 자르거나 골라서 전체가 max_tokens 안에 들어가게 합니다.
+        (다른 섹션이 쓰고 남은 예산은 모두 대화 기록에 사용, 결과는 last_allocation / last_history)
+
         Args:
-            memories: 이전 대화 기록 (user/assistant 메시지)
+            memories: 이전 대화 기록 (user/assistant 메시지 리스트 또는 TokenizedHistory)
             user_message: 현재 사용자 메시지
             search_results: 검색 결과 (선택사항)
+            relevant_memories: 장기 기억 - 질문과 관련된 과거 메시지, 관련도 순 (선택사항)
+                (MemoryManager.retrieve_relevant_messages)
+            summary: 예산 밖으로 밀려난 과거 대화의 누적 요약 (선택사항, MemoryManager.load_summary)
             
         Returns:
             LLM에 보낼 메시지 리스트
         """
-        # 1. 시스템 프롬프트로 시작
-        messages = [
-            {"role": "system", "content": self.system_prompt}
-        ]
+        # 1. 고정 섹션: 시스템 프롬프트, 현재 사용자 메시지, 응답용 예약 (잘라낼 수 없음)
+        fixed_tokens = (
+            self._estimate_tokens(self.system_prompt) + self._estimate_tokens("system")
+            + self._estimate_tokens(user_message) + self._estimate_tokens("user")
+            + 2 * MESSAGE_OVERHEAD_TOKENS
+            + self.reserved_output_tokens
+        )
+        if self.stable_prefix:
+            # 턴마다 바뀌는 섹션을 담을 두 번째 시스템 메시지 (role + 구분 토큰)
+            fixed_tokens += self._estimate_tokens("system") + MESSAGE_OVERHEAD_TOKENS
+        flexible_tokens = max(self.max_tokens - fixed_tokens, 0)
+        
+        # 2. 가변 섹션별 요구량 (줄이지 않았을 때 크기, 섹션 제목 포함)
+        texts = {
+            name: compact_text(text)
+            for name, text in (("search", search_results), ("summary", summary))
+            if text
+        }
+        demands = {
+            name: self._header_tokens(name) + self._estimate_tokens(text)
+            for name, text in texts.items() if text
+        }
+        if relevant_memories:
+            demands["long_term"] = self._header_tokens("long_term") + sum(
+                self._memory_line_tokens(relevant_memories)
+            )
+        demands["history"] = self._history_demand(memories, flexible_tokens)
+        
+        # 3. 우선순위/쿼터에 따라 배분
+        allocation = allocate_budget(flexible_tokens, demands, self.section_policies)
+        
+        # 4. 텍스트 섹션은 배분량에 맞게 자름
+        sections: Dict[str, str] = {}
+        used: Dict[str, int] = {}
+        for name, text in texts.items():
+            body = truncate_text(text, allocation.get(name, 0) - self._header_tokens(name), self._estimate_tokens)
+            if body:
+                sections[name] = body
+                used[name] = self._header_tokens(name) + self._estimate_tokens(body)
         
-        # 2. 검색 결과가 있으면 시스템 메시지에 추가
-        if search_results:
-            messages[0]["content"] += f"\n\nSearch Results:\n{search_results}"
+        # 5. 장기 기억: 배분량 안의 최근 기록과 중복되지 않는 관련 메시지
+        long_term: List[Dict[str, str]] = []
+        if relevant_memories and allocation.get("long_term", 0) > self._header_tokens("long_term"):
+            recent = self._select_memories_within_limit(memories, allocation["history"])
+            long_term = self._select_relevant_within_limit(
+                relevant_memories,
+                recent,
+                allocation["long_term"] - self._header_tokens("long_term")
+            )
+        
+        # 6. 대화 기록: 다른 섹션이 실제로 쓰고 남은 예산 전부 (배분량 이상)
+        others = sum(used.values())
+        if long_term:
+            others += self._header_tokens("long_term") + sum(self._memory_line_tokens(long_term))
+        selected_memories = self._select_memories_within_limit(memories, max(flexible_tokens - others, 0))
+        
+        if long_term:
+            # 늘어난 대화 기록에 들어간 메시지는 장기 기억에서 제외
+            recent = {(m.get("role", ""), m.get("content", "")) for m in selected_memories}
+            long_term = [m for m in long_term if (m.get("role", ""), m.get("content", "")) not in recent]
+        if long_term:
+            sections["long_term"] = "\n".join(self._memory_line(m) for m in long_term)
+            used["long_term"] = self._header_tokens("long_term") + sum(self._memory_line_tokens(long_term))
+        used["history"] = sum(self._memory_tokens(selected_memories))
+        
+        self.last_allocation = {
+            "fixed": {"tokens": fixed_tokens, "reserved_output": self.reserved_output_tokens},
+            "demand": demands,
+            "allocated": allocation,
+            "used": used,
+        }
+        self.last_history = selected_memories
         
-        # 3. 이전 대화 기록 추가 (토큰 제한 내에서)
-        selected_memories = self._select_memories_within_limit(memories)
-        messages.extend(selected_memories)
+        # 7. 시스템 메시지 (검색 결과 → 요약 → 장기 기억 순) + 대화 기록 + 현재 사용자 메시지
+        #    stable_prefix: 시스템 프롬프트 + 대화 기록 + [검색 결과 → 요약 → 장기 기억] + 현재 사용자 메시지
+        volatile = "".join(
+            f"\n\n{header}:\n{sections[name]}"
+            for name, header in SECTION_HEADERS.items() if name in sections
+        )
         
-        # 4. 현재 사용자 메시지 추가
+        if self.stable_prefix:
+            messages = [{"role": "system", "content": self.system_prompt}]
+            messages.extend(selected_memories)
+            if volatile:
+                messages.append({"role": "system", "content": volatile.lstrip("\n")})
+        else:
+            messages = [{"role": "system", "content": self.system_prompt + volatile}]
+            messages.extend(selected_memories)
         messages.append({
             "role": "user",
             "content": user_message
@@ -112,15 +281,51 @@ class ContextAssembler:
         
         return messages
     
+    def _header_tokens(self, name: str) -> int:
+        """섹션 제목(구분 줄바꿈 포함) 토큰 수"""
+        return self._estimate_tokens(f"\n\n{SECTION_HEADERS[name]}:\n")
+    
+    @staticmethod
+    def _memory_line(memory: Dict[str, str]) -> str:
+        return f"- {memory.get('role', '')}: {memory.get('content', '')}"
+    
+    def _memory_line_tokens(self, memories: List[Dict[str, str]]) -> List[int]:
+        """장기 기억 줄별 토큰 수 (줄바꿈 포함)"""
+        return [n + 1 for n in self.token_counter.count_batch([self._memory_line(m) for m in memories])]
+    
+    def _history_demand(self, memories: Memories, limit: int) -> int:
+        """
+        대화 기록 요구 토큰 수 (limit을 넘으면 limit)
+        
+        리스트는 최신 메시지부터 배치로 세다가 limit을 넘으면 중단합니다.
+        """
+        if not memories:
+            return 0
+        if isinstance(memories, TokenizedHistory):
+            return min(memories.total_tokens, limit)
+        total = 0
+        end = len(memories)
+        while end > 0 and total <= limit:
+            start = max(end - _COUNT_CHUNK_SIZE, 0)
+            total += sum(self._memory_tokens(memories[start:end]))
+            end = start
+        return min(total, limit)
+    
     def _select_memories_within_limit(
         self,
-        memories: List[Dict[str, str]]
+        memories: Memories,
+        available_tokens: Optional[int] = None
     ) -> List[Dict[str, str]]:
         """
         토큰 제한 내에서 메모리 선택 (최근 메시지 우선)
         
+        최신 메시지부터 이어지는 창 중 예산에 들어가는 가장 긴 것을 슬라이스로 반환합니다.
+        - TokenizedHistory: 누적합에서 이진 탐색 (O(log n), stable_prefix면 창 시작을 prefix_block_tokens 단위로 정렬)
+        - 리스트: 최신 메시지부터 배치로 토큰 수를 세다가 예산을 넘으면 중단 (창 크기에 비례)
+        
         Args:
-            memories: 전체 메모리 리스트
+            memories: 전체 메모리 리스트 또는 TokenizedHistory
+            available_tokens: 토큰 예산 (기본값: history_token_budget())
             
         Returns:
             선택된 메모리 리스트
@@ -128,29 +333,58 @@ class ContextAssembler:
         if not memories:
             return []
         
-        # 시스템 프롬프트 토큰 추정
-        system_tokens = self._estimate_tokens(self.system_prompt)
-        # 사용자 메시지를 위한 여유 공간 (대략 추정)
-        reserved_tokens = system_tokens + 100
-        available_tokens = self.max_tokens - reserved_tokens
+        if available_tokens is None:
+            available_tokens = self.history_token_budget()
         
-        # 최근 메시지부터 역순으로 선택
-        selected = []
+        if isinstance(memories, TokenizedHistory):
+            return memories.window(available_tokens, self.prefix_block_tokens if self.stable_prefix else 0)
+        
+        # 역순으로 순회 (최신 메시지부터), 토큰 초과 시 중단
         current_tokens = 0
+        end = len(memories)
+        while end > 0:
+            start = max(end - _COUNT_CHUNK_SIZE, 0)
+            counts = self._memory_tokens(memories[start:end])
+            for i in range(end - 1, start - 1, -1):
+                current_tokens += counts[i - start]
+                if current_tokens > available_tokens:
+                    return memories[i + 1:]
+            end = start
         
-        # 역순으로 순회 (최신 메시지부터)
-        for memory in reversed(memories):
-            memory_tokens = self._estimate_tokens(
-                memory.get("content", "") + memory.get("role", "")
-            )
+        return list(memories)
+    
+    def _select_relevant_within_limit(
+        self,
+        relevant_memories: List[Dict[str, str]],
+        recent_memories: List[Dict[str, str]],
+        available_tokens: int
+    ) -> List[Dict[str, str]]:
+        """
+        토큰 제한 내에서 장기 기억 선택 (관련도 순, 최근 기록과 중복 제외)
+        
+        Args:
+            relevant_memories: 관련 메시지 리스트 (관련도 순)
+            recent_memories: 이미 선택된 최근 메시지
+            available_tokens: 장기 기억 토큰 예산 (섹션 제목 제외, 렌더링된 줄 기준)
             
+        Returns:
+            선택된 장기 기억 리스트 (원래 대화 순서)
+        """
+        recent = {(m.get("role", ""), m.get("content", "")) for m in recent_memories}
+        selected = []
+        current_tokens = 0
+        
+        for memory, memory_tokens in zip(relevant_memories, self._memory_line_tokens(relevant_memories)):
+            if (memory.get("role", ""), memory.get("content", "")) in recent:
+                continue
+            # 관련도가 낮은 다음 후보가 더 짧을 수 있으므로 중단하지 않고 건너뜀
             if current_tokens + memory_tokens <= available_tokens:
-                selected.insert(0, memory)  # 앞에 추가 (순서 유지)
+                selected.append(memory)
                 current_tokens += memory_tokens
-            else:
-                # 토큰 초과 시 중단
-                break
         
+        # 대화 순서대로 (id가 있으면 id 기준)
+        if all("id" in m for m in selected):
+            selected.sort(key=lambda m: m["id"])
         return selected
 
 
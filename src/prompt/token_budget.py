@@ -0,0 +1,148 @@
+"""Token Budget - 프롬프트 섹션별 토큰 예산 배분
+
+ContextAssembler가 만드는 프롬프트는 여러 섹션으로 이루어집니다.
+- 고정: 시스템 프롬프트, 현재 사용자 메시지, 출력용 예약 토큰 (잘라낼 수 없음)
+  (메시지 비용은 content + role + MESSAGE_OVERHEAD_TOKENS)
+- 가변: 과거 대화 요약(summary), 검색 결과(search), 장기 기억(long_term), 최근 대화 기록(history)
+
+가변 섹션은 우선순위(priority)와 쿼터로 남은 예산을 나눠 갖습니다.
+1. 보장분: 우선순위 순서대로 min_ratio만큼 (요구량 한도 내)
+2. 쿼터: 우선순위 순서대로 max_ratio까지
+3. 남는 예산: 쿼터를 넘는 요구가 있는 섹션에 우선순위 순서대로 다시 배분 (버리는 예산 없음)
+
+배분받은 양보다 큰 섹션은 섹션별 방식으로 줄입니다.
+- 텍스트(summary/search): 공백 정리(compact_text) 후 예산에 맞게 앞에서부터 자름(truncate_text)
+- 메시지(history/long_term): 최근순/관련도순으로 예산 안에 들어가는 것만 선택
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+# 메시지 1개당 채팅 템플릿 구분 토큰 (role 앞뒤 특수 토큰 등, 대략 3개)
+MESSAGE_OVERHEAD_TOKENS = 3
+
+TRUNCATION_MARKER = " …"
+# 자른 위치에서 이 글자 수 안에 공백이 있으면 단어 경계에서 자름
+_WORD_BOUNDARY_WINDOW = 32
+
+_SPACES_RE = re.compile(r"[ \t\f\v]+")
+_TRAILING_SPACES_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+@dataclass(frozen=True)
+class SectionPolicy:
+    """가변 섹션의 배분 규칙"""
+    priority: int                      # 작을수록 먼저 배분
+    min_ratio: float = 0.0             # 보장 비율 (가변 예산 대비)
+    max_ratio: Optional[float] = None  # 쿼터 비율 (None이면 요구량 전부, 남는 예산은 마지막에 다시 배분)
+
+
+def default_section_policies(long_term_ratio: float = 0.25) -> Dict[str, SectionPolicy]:
+    """
+    기본 배분 규칙
+
+    - summary: 오래된 맥락 전체를 대신하므로 먼저, 최대 15%
+    - search: 10% 보장, 최대 40% (큰 검색 결과가 대화 기록을 모두 밀어내지 않도록)
+    - long_term: 최대 long_term_ratio
+    - history: 25% 보장, 나머지 전부
+    """
+    return {
+        "summary": SectionPolicy(priority=1, max_ratio=0.15),
+        "search": SectionPolicy(priority=2, min_ratio=0.1, max_ratio=0.4),
+        "long_term": SectionPolicy(priority=3, max_ratio=long_term_ratio),
+        "history": SectionPolicy(priority=4, min_ratio=0.25),
+    }
+
+
+def allocate_budget(
+    total_tokens: int,
+    demands: Dict[str, int],
+    policies: Dict[str, SectionPolicy]
+) -> Dict[str, int]:
+    """
+    가변 예산을 섹션별로 배분
+
+    Args:
+        total_tokens: 가변 섹션 전체 예산 (전체 창 - 고정 섹션)
+        demands: 섹션별 요구 토큰 수 (줄이지 않았을 때 크기)
+        policies: 섹션별 배분 규칙 (없는 섹션은 가장 낮은 우선순위, 쿼터 없음)
+
+    Returns:
+        섹션별 배분 토큰 수 (요구량 이하, 합계는 total_tokens 이하)
+    """
+    total_tokens = max(total_tokens, 0)
+    fallback = SectionPolicy(priority=max((p.priority for p in policies.values()), default=0) + 1)
+    order = sorted(demands, key=lambda name: policies.get(name, fallback).priority)
+    allocation = {name: 0 for name in demands}
+    remaining = total_tokens
+
+    def grant(name: str, target: int) -> None:
+        nonlocal remaining
+        extra = min(max(target - allocation[name], 0), remaining)
+        allocation[name] += extra
+        remaining -= extra
+
+    # 1) 보장분
+    for name in order:
+        policy = policies.get(name, fallback)
+        grant(name, min(demands[name], int(total_tokens * policy.min_ratio)))
+    # 2) 쿼터
+    for name in order:
+        policy = policies.get(name, fallback)
+        quota = demands[name] if policy.max_ratio is None else int(total_tokens * policy.max_ratio)
+        grant(name, min(demands[name], quota))
+    # 3) 남는 예산 재배분
+    for name in order:
+        grant(name, demands[name])
+    return allocation
+
+
+def compact_text(text: str) -> str:
+    """연속 공백/빈 줄 정리 (의미를 바꾸지 않고 토큰 수만 줄임)"""
+    text = _SPACES_RE.sub(" ", text or "")
+    text = _TRAILING_SPACES_RE.sub("\n", text)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def truncate_text(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """
+    토큰 예산에 맞게 텍스트를 앞에서부터 남김 (잘린 경우 끝에 TRUNCATION_MARKER)
+
+    자를 위치는 글자 단위 이진 탐색으로 찾고 (토큰 수는 길이에 대해 단조 증가로 가정),
+    가까운 곳에 공백/줄바꿈이 있으면 단어 중간이 아닌 그 위치에서 자릅니다.
+
+    Args:
+        text: 원본 텍스트
+        max_tokens: 최대 토큰 수
+        count: 텍스트 → 토큰 수 함수
+
+    Returns:
+        count(결과) <= max_tokens인 텍스트 (예산이 너무 작으면 빈 문자열)
+    """
+    text = compact_text(text)
+    if max_tokens <= 0 or not text:
+        return ""
+    if count(text) <= max_tokens:
+        return text
+
+    def cut(end: int) -> str:
+        return text[:end].rstrip() + TRUNCATION_MARKER
+
+    best, left, right = 0, 1, len(text) - 1
+    while left <= right:
+        mid = (left + right) // 2
+        if count(cut(mid)) <= max_tokens:
+            best = mid
+            left = mid + 1
+        else:
+            right = mid - 1
+    if best == 0:
+        return ""
+
+    boundary = max(text.rfind(" ", 0, best + 1), text.rfind("\n", 0, best + 1))
+    if boundary > 0 and best - boundary <= _WORD_BOUNDARY_WINDOW:
+        best = boundary
+    return cut(best)
@@ -0,0 +1,115 @@
+"""Tokenized History - 토큰 수 누적합을 함께 들고 있는 대화 기록
+
+ContextAssembler는 매 턴 "토큰 예산 안에 들어가는 최근 메시지"를 고릅니다.
+대화 기록을 리스트로 넘기면 메시지마다 토큰 수를 다시 세야 하지만,
+TokenizedHistory는 메시지를 추가할 때 한 번만 세고 누적합(prefix sum)을 유지하므로
+예산 경계를 이진 탐색으로 찾고 결과를 슬라이스로 돌려줍니다. (턴당 O(log n) + 창 크기)
+
+    history = TokenizedHistory(assembler.token_counter)
+    history.extend(messages)             # 한 번만 토큰화
+    history.append({"role": "user", "content": "..."})
+    assembler.build_context(history, user_message)
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..llm.token_counter import TokenCounter
+from .token_budget import MESSAGE_OVERHEAD_TOKENS
+
+
+class TokenizedHistory:
+    """메시지 리스트 + 메시지별 토큰 수 누적합 (오래된 것 → 최신 순)"""
+
+    def __init__(self, token_counter: TokenCounter, messages: Optional[Iterable[Dict[str, str]]] = None):
+        """
+        Args:
+            token_counter: 토큰 카운터 (ContextAssembler.token_counter와 같은 것을 사용)
+            messages: 초기 메시지 리스트
+        """
+        self.token_counter = token_counter
+        self.messages: List[Dict[str, str]] = []
+        # prefix[i] = messages[:i]의 토큰 수 합 (prefix[0] = 0)
+        self.prefix: List[int] = [0]
+        if messages:
+            self.extend(messages)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
+
+    def __reversed__(self) -> Iterator[Dict[str, str]]:
+        return reversed(self.messages)
+
+    def copy(self) -> List[Dict[str, str]]:
+        """메시지 리스트 복사본"""
+        return list(self.messages)
+
+    def clear(self) -> None:
+        self.messages = []
+        self.prefix = [0]
+
+    def message_tokens(self, messages: List[Dict[str, str]]) -> List[int]:
+        """메시지별 토큰 수 (content + role + 템플릿 구분 토큰, ContextAssembler._memory_tokens와 같은 계산)"""
+        contents = self.token_counter.count_batch([m.get("content", "") for m in messages])
+        roles = self.token_counter.count_batch([m.get("role", "") for m in messages])
+        return [c + r + MESSAGE_OVERHEAD_TOKENS for c, r in zip(contents, roles)]
+
+    def append(self, message: Dict[str, str]) -> None:
+        self.extend([message])
+
+    def extend(self, messages: Iterable[Dict[str, str]]) -> None:
+        """메시지 추가 (추가분만 배치로 토큰화)"""
+        messages = list(messages)
+        if not messages:
+            return
+        self.messages.extend(messages)
+        running = accumulate(self.message_tokens(messages), initial=self.prefix[-1])
+        next(running)  # initial 값 (이미 prefix 끝에 있음)
+        self.prefix.extend(running)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prefix[-1]
+
+    def tokens(self, index: int) -> int:
+        """index번째 메시지의 토큰 수"""
+        if index < 0:
+            index += len(self.messages)
+        return self.prefix[index + 1] - self.prefix[index]
+
+    def window_start(self, token_budget: int, align_tokens: int = 0) -> int:
+        """
+        예산 안에 들어가는 최근 메시지 창의 시작 인덱스 (이진 탐색)
+
+        messages[start:]의 토큰 합 = total - prefix[start] <= token_budget 인 가장 작은 start
+
+        align_tokens를 주면 시작 위치를 누적 토큰 수가 align_tokens의 배수가 되는 첫 메시지로 올립니다.
+        창의 시작(= 프롬프트 앞부분)이 매 턴 한 메시지씩 밀리지 않고 align_tokens만큼 쌓였을 때만
+        한 번에 넘어가므로, 그 사이의 턴은 같은 앞부분을 재사용할 수 있습니다 (Ollama KV 캐시).
+        """
+        # 누적합은 단조 증가 (토큰 수 >= 0)
+        start = min(bisect_left(self.prefix, self.total_tokens - token_budget), len(self.messages))
+        if align_tokens > 0 and start > 0:
+            boundary = -(-self.prefix[start] // align_tokens) * align_tokens
+            start = min(bisect_left(self.prefix, boundary, lo=start), len(self.messages))
+        return start
+
+    def window(self, token_budget: int, align_tokens: int = 0) -> List[Dict[str, str]]:
+        """
+        예산 안에 들어가는 최근 메시지 (오래된 것부터)
+
+        Args:
+            token_budget: 토큰 예산
+            align_tokens: 창 시작 위치 정렬 단위 (0이면 예산에 들어가는 가장 긴 창, window_start 참고)
+
+        Returns:
+            메시지 리스트 (슬라이스)
+        """
+        return self.messages[self.window_start(token_budget, align_tokens):]
@@ -10,13 +10,25 @@
 
 from __future__ import annotations
 
+import csv
+import itertools
+import json
 import re
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from .schema_catalog import SchemaCatalog, get_schema_catalog
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성 (없으면 표준 array 모듈 사용)
+    np = None
+
 
 _BANNED_KEYWORDS = (
     "insert",
@@ -163,15 +175,238 @@ def ensure_limit(sql: str, max_rows: int) -> str:
     return f"{stmt}\nLIMIT {int(max_rows)}"
 
 
+def _format_cell(v: Any, max_cell_chars: Optional[int]) -> str:
+    s = "" if v is None else str(v)
+    s = s.replace("\n", "\\n")
+    if max_cell_chars is not None and len(s) > max_cell_chars:
+        s = s[: max_cell_chars - 3] + "..."
+    return s
+
+
+def _estimate_rows_bytes(rows: Sequence[Sequence[Any]], sample_size: int = 20) -> int:
+    """행 묶음의 대략적인 메모리 사용량 (앞쪽 일부 행을 샘플링해 추정)"""
+    if not rows:
+        return 0
+    sample = rows[:sample_size]
+    sampled = 0
+    for row in sample:
+        sampled += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return int(sampled / len(sample) * len(rows))
+
+
 @dataclass
 class QueryResult:
     columns: List[str]
     rows: List[List[Any]]
 
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str) -> List[Any]:
+        idx = self.columns.index(name)
+        return [row[idx] for row in self.rows]
+
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+
+def _pack_column(values: List[Any]) -> Any:
+    """
+    컬럼 값을 타입에 맞는 연속 배열로 저장
+    - 정수(None 없음) → int64 배열, 실수/정수 혼합(None 없음) → float64 배열
+    - 그 외(None, 문자열, 날짜 등) → 리스트 그대로
+    """
+    if not values:
+        return []
+    all_int = True
+    for v in values:
+        if isinstance(v, bool) or v is None:
+            return list(values)
+        if isinstance(v, int):
+            if not (_INT64_MIN <= v <= _INT64_MAX):
+                return list(values)
+        elif isinstance(v, float):
+            all_int = False
+        else:
+            return list(values)
+    if all_int:
+        return np.array(values, dtype=np.int64) if np is not None else array("q", values)
+    return np.array(values, dtype=np.float64) if np is not None else array("d", values)
+
+
+class _ListWindow(Sequence):
+    """리스트 일부 구간을 복사 없이 보여주는 읽기 전용 뷰"""
+
+    __slots__ = ("_data", "_start", "_stop")
+
+    def __init__(self, data: List[Any], start: int, stop: int):
+        self._data = data
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return [self[j] for j in range(start, stop, step)]
+            return _ListWindow(self._data, self._start + start, self._start + stop)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("index out of range")
+        return self._data[self._start + i]
+
+    def __iter__(self):
+        return itertools.islice(self._data, self._start, self._stop)
+
+    def tolist(self) -> List[Any]:
+        return self._data[self._start:self._stop]
+
+
+def _to_list(values: Any) -> List[Any]:
+    if isinstance(values, list):
+        return values
+    return values.tolist()
+
+
+class ColumnarQueryResult:
+    """
+    컬럼 단위(columnar) 조회 결과
+
+    QueryResult(행 리스트)와 달리 컬럼마다 타입이 있는 연속 배열(NumPy 또는 array)을 저장합니다.
+    - column(name): 컬럼 이름 → 인덱스 dict 조회로 O(1) 컬럼 추출 (행 순회 없음)
+    - slice(start, stop): 배열을 복사하지 않고 구간만 공유하는 결과 반환
+    - columns / rows / row_count: 기존 행 기반 접근도 그대로 지원
+    """
+
+    def __init__(
+        self,
+        columns: List[str],
+        data: List[Any],
+        start: int = 0,
+        stop: Optional[int] = None,
+        index: Optional[Dict[str, int]] = None,
+    ):
+        self.columns = columns
+        self._data = data
+        # 컬럼 이름 → 위치 (slice/select 결과끼리 공유)
+        self._index = index if index is not None else {name: i for i, name in enumerate(columns)}
+        self._start = start
+        self._stop = stop if stop is not None else (len(data[0]) if data else 0)
+        self._rows_cache: Optional[List[List[Any]]] = None
+
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: Sequence[Sequence[Any]]) -> "ColumnarQueryResult":
+        data = [_pack_column([row[i] for row in rows]) for i in range(len(columns))]
+        return cls(columns=list(columns), data=data, stop=len(rows))
+
+    @classmethod
+    def from_query_result(cls, result: QueryResult) -> "ColumnarQueryResult":
+        return cls.from_rows(result.columns, result.rows)
+
+    @property
+    def row_count(self) -> int:
+        return self._stop - self._start
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def column_at(self, idx: int) -> Union[Sequence[Any], Any]:
+        """idx번째 컬럼 (NumPy view / memoryview / 리스트 뷰, 복사 없음)"""
+        values = self._data[idx]
+        if self._start == 0 and self._stop == len(values):
+            return values
+        if isinstance(values, list):
+            return _ListWindow(values, self._start, self._stop)
+        if isinstance(values, array):
+            return memoryview(values)[self._start:self._stop]
+        return values[self._start:self._stop]
+
+    def column(self, name: str) -> Union[Sequence[Any], Any]:
+        """컬럼 이름으로 컬럼 추출 (O(1), 복사 없음)"""
+        return self.column_at(self._index[name])
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "ColumnarQueryResult":
+        """행 구간 [start, stop) 결과 (배열 공유, 복사 없음)"""
+        start, stop, _ = slice(start, stop).indices(self.row_count)
+        return ColumnarQueryResult(
+            columns=self.columns,
+            data=self._data,
+            start=self._start + start,
+            stop=self._start + max(start, stop),
+            index=self._index,
+        )
+
+    def select(self, names: Sequence[str]) -> "ColumnarQueryResult":
+        """일부 컬럼만 가진 결과 (배열 공유, 복사 없음)"""
+        data = [self._data[self._index[n]] for n in names]
+        return ColumnarQueryResult(columns=list(names), data=data, start=self._start, stop=self._stop)
+
+    @property
+    def rows(self) -> List[List[Any]]:
+        """행 기반 접근 (호환용, 최초 접근 시 1회 생성)"""
+        if self._rows_cache is None:
+            cols = [_to_list(self.column_at(i)) for i in range(len(self.columns))]
+            self._rows_cache = [list(r) for r in zip(*cols)] if cols else []
+        return self._rows_cache
+
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*[iter(self.column_at(i)) for i in range(len(self.columns))])
+
+    def to_query_result(self) -> QueryResult:
+        return QueryResult(columns=list(self.columns), rows=self.rows)
+
+    def nbytes(self) -> int:
+        """컬럼 저장소의 대략적인 메모리 사용량 (바이트)"""
+        total = 0
+        for values in self._data:
+            if np is not None and isinstance(values, np.ndarray):
+                total += values.nbytes
+            elif isinstance(values, array):
+                total += values.itemsize * len(values)
+            else:
+                total += sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+        return total
+
 
 class DBQueryTool:
-    def __init__(self, engine: Engine):
+    def __init__(
+        self,
+        engine: Engine,
+        catalog_ttl: float = 300.0,
+        catalog_snapshot_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            engine: SQLAlchemy 엔진 (PostgreSQL)
+            catalog_ttl: 스키마 카탈로그 캐시 유효 시간 (초)
+            catalog_snapshot_path: 스키마 카탈로그 디스크 스냅샷 경로 (프로세스 간 재사용, 선택)
+        """
         self.engine = engine
+        self.catalog_ttl = catalog_ttl
+        self.catalog_snapshot_path = catalog_snapshot_path
+        self.last_catalog_changed = False
+
+    def schema_catalog(self, schema: str = "public", refresh: bool = False) -> SchemaCatalog:
+        """
+        스키마 카탈로그 (테이블/컬럼/PK/FK/행 수 추정치) 반환
+        - TTL 내에는 캐시 사용, 만료 시 1회 bulk 조회로 갱신
+        - 갱신 결과 구조가 바뀌었으면 last_catalog_changed=True
+        """
+        catalog, changed = get_schema_catalog(
+            self.engine,
+            schema=schema,
+            ttl=self.catalog_ttl,
+            snapshot_path=self.catalog_snapshot_path,
+            refresh=refresh,
+        )
+        self.last_catalog_changed = changed
+        return catalog
 
     def list_tables(self, schema: str = "public", limit: int = 200) -> List[str]:
         sql = text(
@@ -203,17 +438,17 @@ class DBQueryTool:
         return [(r[0], r[1]) for r in rows]
 
     def schema_summary_text(self, schema: str = "public", max_tables: int = 30, max_cols_per_table: int = 25) -> str:
-        tables = self.list_tables(schema=schema, limit=max_tables)
-        lines: List[str] = []
-        for t in tables:
-            cols = self.list_columns(t, schema=schema)[:max_cols_per_table]
-            cols_str = ", ".join([f"{c}:{dt}" for c, dt in cols])
-            lines.append(f"- {schema}.{t}: {cols_str}")
-        if not lines:
-            return "(no tables found)"
-        return "\n".join(lines)
-
-    def run_select(self, sql: str, params: Optional[Dict[str, Any]] = None, max_rows: int = 50) -> QueryResult:
+        # 테이블마다 list_columns를 호출(N+1)하지 않고 캐시된 카탈로그 사용
+        catalog = self.schema_catalog(schema=schema)
+        return catalog.summary_text(max_tables=max_tables, max_cols_per_table=max_cols_per_table)
+
+    def run_select(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_rows: int = 50,
+        columnar: bool = False,
+    ) -> Union[QueryResult, ColumnarQueryResult]:
         ok, reason = is_safe_select_sql(sql)
         if not ok:
             raise ValueError(f"unsafe_sql:{reason}")
@@ -223,22 +458,130 @@ class DBQueryTool:
             result = conn.execute(text(safe_sql), params or {})
             cols = list(result.keys())
             fetched = result.fetchmany(size=max_rows)
+        if columnar:
+            return ColumnarQueryResult.from_rows(cols, fetched)
         rows = [list(r) for r in fetched]
         return QueryResult(columns=cols, rows=rows)
 
+    def stream_select(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        max_rows: Optional[int] = None,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+    ) -> Iterator[QueryResult]:
+        """
+        SELECT 결과를 서버 사이드 커서로 읽어 배치(QueryResult) 단위로 반환
+
+        run_select와 달리 결과 전체를 메모리에 올리지 않습니다.
+        (psycopg2에서는 stream_results=True → named cursor)
+
+        Args:
+            sql: SELECT/WITH 쿼리
+            params: 바인드 파라미터
+            batch_size: 배치당 최대 행 수
+            max_rows: 전체 최대 행 수 (None이면 제한 없음)
+            max_batch_bytes: 배치 1개의 메모리 상한 (행 크기를 보고 배치 크기를 줄임)
+
+        Yields:
+            QueryResult (columns + 이번 배치의 rows, 결과가 0행이면 rows=[]인 배치 1개)
+        """
+        ok, reason = is_safe_select_sql(sql)
+        if not ok:
+            raise ValueError(f"unsafe_sql:{reason}")
+
+        if max_rows is not None:
+            safe_sql = ensure_limit(sql, max_rows=max_rows)
+        else:
+            safe_sql = _split_statements(_strip_sql_comments(sql).strip())[0]
+
+        batch_size = max(1, int(batch_size))
+        # 행 크기를 모르는 첫 배치는 작게 읽어(probe) 배치 크기를 정한 뒤 키움
+        fetch_size = min(batch_size, 64)
+        remaining = max_rows
+        with self.engine.connect() as conn:
+            result = conn.execution_options(yield_per=fetch_size).execute(text(safe_sql), params or {})
+            cols = list(result.keys())
+            yielded = False
+            while remaining is None or remaining > 0:
+                size = fetch_size if remaining is None else min(fetch_size, remaining)
+                fetched = result.fetchmany(size)
+                if not fetched:
+                    break
+                rows = [list(r) for r in fetched]
+                if remaining is not None:
+                    remaining -= len(rows)
+                yielded = True
+                yield QueryResult(columns=cols, rows=rows)
+
+                # 배치 1개가 메모리 상한을 넘지 않도록 행 크기에 맞춰 배치 크기 조정
+                per_row = max(_estimate_rows_bytes(rows) // len(rows), 1)
+                next_size = max(1, min(batch_size, max_batch_bytes // per_row))
+                if next_size != fetch_size:
+                    fetch_size = next_size
+                    result.yield_per(fetch_size)
+            if not yielded:
+                # 0행이어도 컬럼 이름은 전달 (format_result_stream이 헤더를 쓸 수 있도록)
+                yield QueryResult(columns=cols, rows=[])
+
+    @staticmethod
+    def format_result_stream(
+        batches: Iterable[QueryResult],
+        sink: TextIO,
+        fmt: str = "csv",
+        max_cell_chars: Optional[int] = None,
+    ) -> int:
+        """
+        stream_select 배치를 파일류 객체(sink)에 바로 기록 (format_result의 스트리밍 버전)
+
+        Args:
+            batches: QueryResult 배치들 (stream_select 결과)
+            sink: 쓰기 가능한 텍스트 파일류 객체
+            fmt: "csv" | "markdown" | "jsonl"
+            max_cell_chars: 셀 최대 길이 (markdown 전용, None이면 자르지 않음)
+
+        Returns:
+            기록한 행 수
+        """
+        if fmt not in ("csv", "markdown", "jsonl"):
+            raise ValueError(f"unsupported_format:{fmt}")
+
+        batches = iter(batches)
+        first = next(batches, None)
+        if first is None:
+            return 0
+
+        # 헤더는 첫 배치(0행 결과에서도 stream_select가 넘겨주는 컬럼 이름)로 루프 전에 기록
+        writer = csv.writer(sink) if fmt == "csv" else None
+        if fmt == "csv":
+            writer.writerow(first.columns)
+        elif fmt == "markdown":
+            sink.write(" | ".join(first.columns) + "\n")
+            sink.write(" | ".join(["---"] * len(first.columns)) + "\n")
+
+        written = 0
+        for batch in itertools.chain([first], batches):
+            if fmt == "csv":
+                writer.writerows(batch.rows)
+            elif fmt == "markdown":
+                for row in batch.rows:
+                    sink.write(" | ".join(_format_cell(v, max_cell_chars) for v in row) + "\n")
+            else:
+                for row in batch.rows:
+                    sink.write(json.dumps(dict(zip(batch.columns, row)), ensure_ascii=False, default=str) + "\n")
+            written += len(batch.rows)
+        return written
+
     @staticmethod
-    def format_result(result: QueryResult, max_cell_chars: int = 200) -> str:
+    def format_result(result: Union[QueryResult, ColumnarQueryResult], max_cell_chars: int = 200) -> str:
         if not result.columns:
             return "(no columns)"
         if not result.rows:
             return "(0 rows)"
 
         def _cell(v: Any) -> str:
-            s = "" if v is None else str(v)
-            s = s.replace("\n", "\\n")
-            if len(s) > max_cell_chars:
-                s = s[: max_cell_chars - 3] + "..."
-            return s
+            return _format_cell(v, max_cell_chars)
 
         header = " | ".join(result.columns)
         sep = " | ".join(["---"] * len(result.columns))
@@ -0,0 +1,273 @@
+"""Result Transforms (step7)
+
+직전 조회 결과(QueryResult / ColumnarQueryResult)를 프로세스 안에서 바로 가공하는 연산 모음.
+"점수순으로 정렬해", "상위 5명만", "도시별 인원수" 같은 후속 요청을
+SQL 생성 LLM 호출 + DB 재조회 없이 처리합니다.
+
+- 컬럼 단위 배열에서 동작 (NumPy가 있으면 argsort/불리언 마스크로 벡터 연산)
+- 결과는 항상 ColumnarQueryResult
+- 주의: 직전 결과가 LIMIT으로 잘린 경우(일부 행만 있음) 정렬/필터/집계 결과가 전체 데이터와 다를 수 있음
+  → 호출하는 쪽에서 "직전 결과가 완전한지" 확인 후 사용
+"""
+
+from __future__ import annotations
+
+import operator
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .db_query_tool import ColumnarQueryResult, QueryResult
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+Result = Union[QueryResult, ColumnarQueryResult]
+
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+_AGGREGATES = ("count", "sum", "avg", "min", "max")
+
+LOCAL_OPERATIONS = ("sort", "filter", "top_n", "distinct", "group_by")
+
+
+def _as_columnar(result: Result) -> ColumnarQueryResult:
+    if isinstance(result, ColumnarQueryResult):
+        return result
+    return ColumnarQueryResult.from_query_result(result)
+
+
+def resolve_column(result: Result, name: Optional[str], aliases: Optional[Dict[str, str]] = None) -> str:
+    """
+    요청된 컬럼 이름을 결과의 실제 컬럼 이름으로 변환 (대소문자 무시 + 별칭)
+
+    Raises:
+        ValueError: 컬럼을 찾을 수 없는 경우
+    """
+    wanted = (name or "").strip().lower()
+    wanted = (aliases or {}).get(wanted, wanted)
+    for col in result.columns:
+        if col.lower() == wanted:
+            return col
+    raise ValueError(f"unknown_column:{name}")
+
+
+def take(result: Result, indices: Sequence[int]) -> ColumnarQueryResult:
+    """지정한 행 번호만 모은 새 결과 (컬럼별 gather)"""
+    res = _as_columnar(result)
+    data: List[Any] = []
+    for i in range(len(res.columns)):
+        values = res.column_at(i)
+        if np is not None and isinstance(values, np.ndarray):
+            data.append(values[np.asarray(indices, dtype=np.int64)])
+        elif isinstance(values, (array, memoryview)):
+            typecode = values.typecode if isinstance(values, array) else values.format
+            data.append(array(typecode, (values[j] for j in indices)))
+        else:
+            data.append([values[j] for j in indices])
+    return ColumnarQueryResult(columns=list(res.columns), data=data, stop=len(indices))
+
+
+def _is_numeric_array(values: Any) -> bool:
+    return np is not None and isinstance(values, np.ndarray)
+
+
+def sort(result: Result, column: str, descending: bool = False) -> ColumnarQueryResult:
+    """컬럼 기준 정렬 (None은 항상 마지막)"""
+    res = _as_columnar(result)
+    values = res.column(column)
+    if _is_numeric_array(values):
+        # 내림차순도 stable 하게 (같은 값끼리는 원래 순서 유지)
+        order = np.argsort(-values if descending else values, kind="stable")
+        return take(res, order.tolist())
+
+    present = [i for i, v in enumerate(values) if v is not None]
+    missing = [i for i, v in enumerate(values) if v is None]
+    try:
+        present.sort(key=lambda i: values[i], reverse=descending)
+    except TypeError:
+        # 타입이 섞인 컬럼은 문자열로 비교
+        present.sort(key=lambda i: str(values[i]), reverse=descending)
+    return take(res, present + missing)
+
+
+def _coerce(value: Any, sample: Any) -> Any:
+    """비교 값 타입을 컬럼 값 타입에 맞춤 (LLM이 숫자를 문자열로 줄 수 있음)"""
+    if sample is None or value is None:
+        return value
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool) and isinstance(value, str):
+        try:
+            return float(value) if "." in value else int(value)
+        except ValueError:
+            return value
+    if isinstance(sample, str) and not isinstance(value, str):
+        return str(value)
+    return value
+
+
+def filter_rows(result: Result, column: str, op: str, value: Any) -> ColumnarQueryResult:
+    """
+    조건에 맞는 행만 남김
+
+    Args:
+        op: "=", "!=", ">", ">=", "<", "<=", "contains"
+    """
+    res = _as_columnar(result)
+    values = res.column(column)
+    sample = next((v for v in values if v is not None), None)
+    value = _coerce(value, sample.item() if hasattr(sample, "item") else sample)
+
+    if op == "contains":
+        needle = str(value).lower()
+        keep = [i for i, v in enumerate(values) if v is not None and needle in str(v).lower()]
+        return take(res, keep)
+
+    compare = _COMPARATORS.get(op)
+    if compare is None:
+        raise ValueError(f"unknown_operator:{op}")
+
+    if _is_numeric_array(values) and isinstance(value, (int, float)):
+        mask = compare(values, value)
+        return take(res, np.nonzero(mask)[0].tolist())
+
+    keep = []
+    for i, v in enumerate(values):
+        if v is None:
+            continue
+        try:
+            if compare(v, value):
+                keep.append(i)
+        except TypeError:
+            continue
+    return take(res, keep)
+
+
+def top_n(result: Result, n: int, column: Optional[str] = None, descending: bool = True) -> ColumnarQueryResult:
+    """column 기준 상위 n개 (column이 없으면 현재 순서의 앞 n개)"""
+    res = _as_columnar(result)
+    if column:
+        res = sort(res, column, descending=descending)
+    return res.slice(0, max(int(n), 0))
+
+
+def distinct(result: Result, column: str) -> ColumnarQueryResult:
+    """컬럼의 고유 값 (처음 등장한 순서 유지)"""
+    res = _as_columnar(result)
+    values = res.column(column)
+    seen = set()
+    keep = []
+    for i, v in enumerate(values):
+        key = v.item() if hasattr(v, "item") else v
+        if key in seen:
+            continue
+        seen.add(key)
+        keep.append(i)
+    return take(res.select([column]), keep)
+
+
+def group_by(
+    result: Result,
+    column: str,
+    agg: str = "count",
+    agg_column: Optional[str] = None,
+) -> ColumnarQueryResult:
+    """
+    컬럼 값별 집계
+
+    Args:
+        agg: "count" | "sum" | "avg" | "min" | "max"
+        agg_column: 집계 대상 컬럼 (count 외에는 필수)
+    """
+    if agg not in _AGGREGATES:
+        raise ValueError(f"unknown_aggregate:{agg}")
+    if agg != "count" and not agg_column:
+        raise ValueError("agg_column_required")
+
+    res = _as_columnar(result)
+    keys = _plain(res.column(column))
+    targets = _plain(res.column(agg_column)) if agg_column else None
+
+    groups: Dict[Any, List[Any]] = {}
+    for i, key in enumerate(keys):
+        bucket = groups.setdefault(key, [])
+        if targets is None:
+            bucket.append(1)
+        elif targets[i] is not None:
+            bucket.append(targets[i])
+
+    out_keys: List[Any] = []
+    out_values: List[Any] = []
+    for key, bucket in groups.items():
+        out_keys.append(key)
+        if agg == "count":
+            out_values.append(len(bucket))
+        elif not bucket:
+            out_values.append(None)
+        elif agg == "sum":
+            out_values.append(sum(bucket))
+        elif agg == "avg":
+            out_values.append(sum(bucket) / len(bucket))
+        elif agg == "min":
+            out_values.append(min(bucket))
+        else:
+            out_values.append(max(bucket))
+
+    value_name = agg if agg == "count" else f"{agg}_{agg_column}"
+    return ColumnarQueryResult.from_rows([column, value_name], list(zip(out_keys, out_values)))
+
+
+def _plain(values: Any) -> List[Any]:
+    if isinstance(values, list):
+        return values
+    return values.tolist()
+
+
+def apply_transform(
+    result: Result,
+    operation: str,
+    column: Optional[str] = None,
+    aliases: Optional[Dict[str, str]] = None,
+    **params: Any,
+) -> ColumnarQueryResult:
+    """
+    라우터 JSON(operation + 파라미터)을 받아 해당 연산 실행
+
+    Raises:
+        ValueError: 알 수 없는 연산/컬럼/파라미터
+    """
+    descending = str(params.get("order", "asc")).lower() in ("desc", "descending")
+    if operation == "sort":
+        return sort(result, resolve_column(result, column, aliases), descending=descending)
+    if operation == "filter":
+        return filter_rows(
+            result,
+            resolve_column(result, column, aliases),
+            op=str(params.get("op", "=")),
+            value=params.get("value"),
+        )
+    if operation == "top_n":
+        if "order" not in params:
+            descending = True
+        col = resolve_column(result, column, aliases) if column else None
+        return top_n(result, int(params.get("n", 10)), column=col, descending=descending)
+    if operation == "distinct":
+        return distinct(result, resolve_column(result, column, aliases))
+    if operation == "group_by":
+        agg_column = params.get("agg_column")
+        return group_by(
+            result,
+            resolve_column(result, column, aliases),
+            agg=str(params.get("agg", "count")),
+            agg_column=resolve_column(result, agg_column, aliases) if agg_column else None,
+        )
+    raise ValueError(f"unknown_operation:{operation}")
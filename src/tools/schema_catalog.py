@@ -0,0 +1,280 @@
+"""Schema Catalog (step7)
+
+기존 schema_summary_text는 list_tables 1회 + 테이블마다 list_columns 1회
+(60개 테이블 기준 61번 왕복, N+1 패턴)로 스키마를 읽었습니다.
+
+여기서는 pg_catalog 조회 1번으로 테이블 + 컬럼 + PK/FK + 행 수 추정치를 모두 읽어
+SchemaCatalog 객체로 보관합니다.
+
+- TTL 동안은 DB를 다시 조회하지 않음 (같은 엔진 URL/스키마면 DBQueryTool 인스턴스 간 공유)
+- TTL 만료 후 재조회 시 지문(fingerprint)을 비교해 스키마 변경 여부를 감지
+- 디스크 스냅샷(JSON)으로 프로세스 간 재사용 (재시작 직후에도 DB 조회 생략)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+_CATALOG_SQL = text(
+    """
+    SELECT
+        c.relname AS table_name,
+        a.attname AS column_name,
+        format_type(a.atttypid, a.atttypmod) AS data_type,
+        COALESCE(pk.is_pk, false) AS is_primary_key,
+        fk.ref_column AS ref_column,
+        GREATEST(c.reltuples, 0)::bigint AS row_estimate,
+        obj_description(c.oid, 'pg_class') AS table_comment,
+        col_description(c.oid, a.attnum) AS column_comment
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_attribute a
+      ON a.attrelid = c.oid
+     AND a.attnum > 0
+     AND NOT a.attisdropped
+    LEFT JOIN LATERAL (
+        SELECT true AS is_pk
+        FROM pg_constraint con
+        WHERE con.conrelid = c.oid
+          AND con.contype = 'p'
+          AND a.attnum = ANY (con.conkey)
+        LIMIT 1
+    ) pk ON true
+    LEFT JOIN LATERAL (
+        SELECT rc.relname || '.' || ra.attname AS ref_column
+        FROM pg_constraint con
+        JOIN pg_class rc ON rc.oid = con.confrelid
+        JOIN pg_attribute ra
+          ON ra.attrelid = con.confrelid
+         AND ra.attnum = con.confkey[array_position(con.conkey, a.attnum)]
+        WHERE con.conrelid = c.oid
+          AND con.contype = 'f'
+          AND a.attnum = ANY (con.conkey)
+        LIMIT 1
+    ) fk ON true
+    WHERE n.nspname = :schema
+      AND c.relkind IN ('r', 'p')
+    ORDER BY c.relname, a.attnum
+    """
+)
+
+# 2: 테이블/컬럼 description(COMMENT ON) 추가 (이전 스냅샷은 설명 없이 로드되지 않도록 무효화)
+_SNAPSHOT_VERSION = 2
+
+
+@dataclass
+class ColumnInfo:
+    name: str
+    data_type: str
+    is_primary_key: bool = False
+    references: Optional[str] = None  # "table.column" (FK 대상)
+    description: Optional[str] = None  # COMMENT ON COLUMN
+
+
+@dataclass
+class TableInfo:
+    name: str
+    columns: List[ColumnInfo] = field(default_factory=list)
+    row_estimate: int = 0
+    description: Optional[str] = None  # COMMENT ON TABLE
+
+    @property
+    def foreign_tables(self) -> List[str]:
+        """이 테이블이 FK로 참조하는 테이블 목록"""
+        refs = []
+        for c in self.columns:
+            if c.references:
+                table = c.references.split(".", 1)[0]
+                if table not in refs:
+                    refs.append(table)
+        return refs
+
+
+class SchemaCatalog:
+    """한 스키마의 테이블/컬럼/FK 메타데이터 스냅샷 (fingerprint로 변경 감지)"""
+
+    def __init__(self, schema: str, tables: List[TableInfo], fetched_at: Optional[float] = None):
+        self.schema = schema
+        self.tables: Dict[str, TableInfo] = {t.name: t for t in tables}
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.fingerprint = self._compute_fingerprint()
+
+    def _compute_fingerprint(self) -> str:
+        # 행 수 추정치는 통계 갱신마다 바뀌므로 지문에서 제외 (구조/COMMENT ON 변경만 감지)
+        structure = [
+            [
+                t.name,
+                t.description,
+                [[c.name, c.data_type, c.is_primary_key, c.references, c.description] for c in t.columns],
+            ]
+            for t in self.tables.values()
+        ]
+        raw = json.dumps(structure, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_engine(cls, engine: Engine, schema: str = "public") -> "SchemaCatalog":
+        """pg_catalog 1회 조회로 카탈로그 생성"""
+        with engine.connect() as conn:
+            rows = conn.execute(_CATALOG_SQL, {"schema": schema}).fetchall()
+
+        tables: Dict[str, TableInfo] = {}
+        for (
+            table_name,
+            column_name,
+            data_type,
+            is_pk,
+            ref_column,
+            row_estimate,
+            table_comment,
+            column_comment,
+        ) in rows:
+            table = tables.get(table_name)
+            if table is None:
+                table = TableInfo(
+                    name=table_name,
+                    row_estimate=int(row_estimate or 0),
+                    description=table_comment,
+                )
+                tables[table_name] = table
+            table.columns.append(
+                ColumnInfo(
+                    name=column_name,
+                    data_type=data_type,
+                    is_primary_key=bool(is_pk),
+                    references=ref_column,
+                    description=column_comment,
+                )
+            )
+        return cls(schema=schema, tables=list(tables.values()))
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def table_names(self, limit: Optional[int] = None) -> List[str]:
+        names = sorted(self.tables)
+        return names[:limit] if limit is not None else names
+
+    def summary_text(self, max_tables: int = 30, max_cols_per_table: int = 25) -> str:
+        """기존 schema_summary_text와 같은 형식의 스키마 요약"""
+        lines: List[str] = []
+        for name in self.table_names(limit=max_tables):
+            lines.append(self.table_line(name, max_cols_per_table=max_cols_per_table))
+        if not lines:
+            return "(no tables found)"
+        return "\n".join(lines)
+
+    def table_line(self, name: str, max_cols_per_table: int = 25) -> str:
+        """테이블 1개의 요약 줄: - schema.table: col:type, ..."""
+        table = self.tables[name]
+        cols = table.columns[:max_cols_per_table]
+        cols_str = ", ".join([f"{c.name}:{c.data_type}" for c in cols])
+        return f"- {self.schema}.{name}: {cols_str}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": _SNAPSHOT_VERSION,
+            "schema": self.schema,
+            "fetched_at": self.fetched_at,
+            "fingerprint": self.fingerprint,
+            "tables": [asdict(t) for t in self.tables.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchemaCatalog":
+        tables = [
+            TableInfo(
+                name=t["name"],
+                columns=[ColumnInfo(**c) for c in t["columns"]],
+                row_estimate=t.get("row_estimate", 0),
+                description=t.get("description"),
+            )
+            for t in data["tables"]
+        ]
+        return cls(schema=data["schema"], tables=tables, fetched_at=data["fetched_at"])
+
+    def save_snapshot(self, path: str, url_key: str) -> None:
+        """디스크 스냅샷 저장 (임시 파일 → rename 으로 원자적 교체)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = self.to_dict()
+        data["url"] = url_key
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, url_key: str, schema: str) -> Optional["SchemaCatalog"]:
+        """디스크 스냅샷 로드 (다른 DB/스키마/버전이면 None)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (
+            data.get("version") != _SNAPSHOT_VERSION
+            or data.get("url") != url_key
+            or data.get("schema") != schema
+        ):
+            return None
+        return cls.from_dict(data)
+
+
+# 프로세스 전역 카탈로그 (엔진 URL + 스키마 단위로 DBQueryTool 인스턴스 간 공유)
+_CATALOGS: Dict[Tuple[str, str], SchemaCatalog] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def _url_key(engine: Engine) -> str:
+    return engine.url.render_as_string(hide_password=True)
+
+
+def get_schema_catalog(
+    engine: Engine,
+    schema: str = "public",
+    ttl: float = 300.0,
+    snapshot_path: Optional[str] = None,
+    refresh: bool = False,
+) -> Tuple[SchemaCatalog, bool]:
+    """
+    캐시된 스키마 카탈로그를 반환합니다. (TTL 만료 / refresh=True 시에만 DB 재조회)
+
+    Args:
+        engine: SQLAlchemy 엔진 (PostgreSQL)
+        schema: 스키마 이름
+        ttl: 카탈로그 유효 시간 (초)
+        snapshot_path: 디스크 스냅샷 경로 (None이면 사용 안 함)
+        refresh: True면 TTL과 무관하게 재조회
+
+    Returns:
+        (카탈로그, 직전 카탈로그 대비 구조 변경 여부)
+    """
+    key = (_url_key(engine), schema)
+    with _CATALOGS_LOCK:
+        current = _CATALOGS.get(key)
+        if current is not None and not refresh and current.age() < ttl:
+            return current, False
+
+        if current is None and snapshot_path and not refresh:
+            snapshot = SchemaCatalog.load_snapshot(snapshot_path, url_key=key[0], schema=schema)
+            if snapshot is not None and snapshot.age() < ttl:
+                _CATALOGS[key] = snapshot
+                return snapshot, False
+            current = snapshot  # 만료된 스냅샷도 변경 감지 기준으로는 사용
+
+        catalog = SchemaCatalog.from_engine(engine, schema=schema)
+        changed = current is not None and current.fingerprint != catalog.fingerprint
+        _CATALOGS[key] = catalog
+        if snapshot_path:
+            catalog.save_snapshot(snapshot_path, url_key=key[0])
+        return catalog, changed
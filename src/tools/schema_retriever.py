@@ -0,0 +1,266 @@
+"""Schema Retriever (step7)
+
+SQL 생성 프롬프트에 전체 스키마(최대 60 테이블 × 25 컬럼)를 매번 넣으면
+컨텍스트 윈도우를 넘기거나 prompt eval 시간이 대부분을 차지합니다.
+
+질문마다 관련 있는 테이블만 골라 넣습니다.
+- 테이블/컬럼 이름 + 설명(PostgreSQL COMMENT, 추가 설명 dict)을 로컬 BM25 인덱스로 검색
+- 임베딩 함수가 주어지면 BM25 점수와 코사인 유사도를 섞어서 사용 (hybrid)
+- 상위 k개 테이블 + FK로 연결된 이웃 테이블을 토큰 예산 안에서 포함
+- 아무 테이블도 매칭되지 않으면 전체 스키마를 그대로 사용 (정확도 우선)
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from ..llm.embeddings import EmbedFn, normalize
+from .schema_catalog import SchemaCatalog
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+|[가-힣]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토큰화
+    - 영문 식별자는 camelCase / snake_case 분리
+    - 한글은 조사가 붙어도 매칭되도록 단어 + 2글자 n-gram
+    """
+    spaced = _CAMEL_RE.sub(" ", text or "").replace("_", " ").lower()
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(spaced):
+        tokens.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    return int(len(text) / chars_per_token)
+
+
+@dataclass
+class SchemaContext:
+    text: str
+    tables: List[str]
+    tokens_used: int
+    tokens_full: int
+    pruned: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.tokens_full - self.tokens_used, 0)
+
+
+class SchemaRetriever:
+    """질문과 관련된 테이블만 골라 토큰 예산 안의 스키마 텍스트를 만드는 검색기 (BM25 + 선택적 임베딩)"""
+
+    def __init__(
+        self,
+        catalog: SchemaCatalog,
+        descriptions: Optional[Dict[str, str]] = None,
+        embed_fn: Optional[EmbedFn] = None,
+        top_k: int = 5,
+        token_budget: int = 1500,
+        max_tables: int = 60,
+        max_cols_per_table: int = 25,
+        embedding_weight: float = 0.5,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Args:
+            catalog: 스키마 카탈로그
+            descriptions: 테이블별 추가 설명 (예: {"users": "가입자 회원 사용자"}), 한국어 질문 매칭에 도움
+            embed_fn: 임베딩 함수 (선택, 주어지면 BM25와 혼합)
+            top_k: 질문과 직접 매칭할 최대 테이블 수
+            token_budget: 스키마 텍스트 토큰 예산
+            max_tables: 전체 스키마 기준 최대 테이블 수 (기존 schema_summary_text와 동일)
+            max_cols_per_table: 테이블당 최대 컬럼 수
+            embedding_weight: hybrid 점수에서 임베딩 유사도 비중 (0~1)
+            k1, b: BM25 파라미터
+        """
+        self.catalog = catalog
+        self.descriptions = descriptions or {}
+        self.embed_fn = embed_fn
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_tables = max_tables
+        self.max_cols_per_table = max_cols_per_table
+        self.embedding_weight = embedding_weight
+        self.k1 = k1
+        self.b = b
+
+        self.tables = catalog.table_names(limit=max_tables)
+        self.full_text = catalog.summary_text(max_tables=max_tables, max_cols_per_table=max_cols_per_table)
+        self.tokens_full = estimate_tokens(self.full_text)
+
+        self._build_index()
+        self._doc_vectors: Optional[List[List[float]]] = None
+
+        # 누적 통계
+        self.requests = 0
+        self.total_tokens_full = 0
+        self.total_tokens_used = 0
+
+    def _table_document(self, name: str) -> str:
+        table = self.catalog.tables[name]
+        # 테이블 이름은 가중치 2배
+        parts = [name, name, table.description or "", self.descriptions.get(name, "")]
+        for c in table.columns[: self.max_cols_per_table]:
+            parts.append(c.name)
+            if c.description:
+                parts.append(c.description)
+            if c.references:
+                parts.append(c.references.split(".", 1)[0])
+        return " ".join(parts)
+
+    def _build_index(self) -> None:
+        self._docs = [Counter(tokenize(self._table_document(t))) for t in self.tables]
+        self._doc_len = [sum(d.values()) for d in self._docs]
+        self._avg_len = (sum(self._doc_len) / len(self._doc_len)) if self._doc_len else 0.0
+        df: Counter = Counter()
+        for d in self._docs:
+            df.update(d.keys())
+        n = len(self._docs)
+        self._idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+        # FK 이웃 (양방향)
+        self._neighbours: Dict[str, List[str]] = {t: [] for t in self.tables}
+        for t in self.tables:
+            for ref in self.catalog.tables[t].foreign_tables:
+                if ref in self._neighbours and ref != t:
+                    if ref not in self._neighbours[t]:
+                        self._neighbours[t].append(ref)
+                    if t not in self._neighbours[ref]:
+                        self._neighbours[ref].append(t)
+
+    def _bm25_scores(self, question: str) -> List[float]:
+        terms = tokenize(question)
+        scores = []
+        for doc, length in zip(self._docs, self._doc_len):
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term, 0)
+                if not tf:
+                    continue
+                denom = tf + self.k1 * (1 - self.b + self.b * length / (self._avg_len or 1.0))
+                score += self._idf[term] * tf * (self.k1 + 1) / denom
+            scores.append(score)
+        return scores
+
+    def _embedding_scores(
+        self,
+        question: str,
+        question_vector: Optional[List[float]] = None
+    ) -> Optional[List[float]]:
+        if self.embed_fn is None or not self.tables:
+            return None
+        try:
+            if self._doc_vectors is None:
+                docs = [self._table_document(t) for t in self.tables]
+                self._doc_vectors = [normalize(v) for v in self.embed_fn(docs)]
+            if question_vector is not None:
+                q = normalize(question_vector)
+            else:
+                q = normalize(self.embed_fn([question])[0])
+        except Exception:
+            # 임베딩 실패 시 BM25만 사용
+            return None
+        return [sum(x * y for x, y in zip(q, v)) for v in self._doc_vectors]
+
+    def rank_tables(self, question: str, question_vector: Optional[List[float]] = None) -> List[tuple]:
+        """
+        질문과 관련 있는 테이블을 점수순으로 반환: [(table, score), ...] (score > 0만)
+
+        Args:
+            question: 사용자 질문
+            question_vector: 같은 embed_fn으로 미리 계산한 질문 벡터 (있으면 질문 임베딩 호출 생략)
+        """
+        bm25 = self._bm25_scores(question)
+        top = max(bm25) if bm25 else 0.0
+        scores = [s / top for s in bm25] if top > 0 else [0.0] * len(bm25)
+
+        emb = self._embedding_scores(question, question_vector)
+        if emb is not None:
+            w = self.embedding_weight
+            # 임베딩만으로는 모든 테이블이 양수가 되므로, 상대 점수가 높은 것만 남김
+            best = max(emb)
+            emb_rel = [max(e - (best - 0.1), 0.0) / 0.1 for e in emb]
+            scores = [(1 - w) * s + w * e for s, e in zip(scores, emb_rel)]
+
+        ranked = [(t, s) for t, s in zip(self.tables, scores) if s > 0]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+    def retrieve(self, question: str, question_vector: Optional[List[float]] = None) -> SchemaContext:
+        """
+        질문에 필요한 스키마만 담은 텍스트 생성
+
+        Args:
+            question: 사용자 질문
+            question_vector: 같은 embed_fn으로 미리 계산한 질문 벡터 (SQL 캐시와 공유할 때 사용)
+
+        Returns:
+            SchemaContext (text, 포함 테이블, 사용/전체 토큰)
+        """
+        self.requests += 1
+        ranked = self.rank_tables(question, question_vector)[: self.top_k]
+
+        if not ranked:
+            # 매칭 실패: 정확도를 위해 전체 스키마 사용
+            context = SchemaContext(
+                text=self.full_text,
+                tables=list(self.tables),
+                tokens_used=self.tokens_full,
+                tokens_full=self.tokens_full,
+                pruned=False,
+            )
+        else:
+            # 우선순위: 직접 매칭 테이블 → FK 이웃
+            ordered: List[str] = [t for t, _ in ranked]
+            for t, _ in ranked:
+                for n in self._neighbours.get(t, []):
+                    if n not in ordered:
+                        ordered.append(n)
+
+            lines: List[str] = []
+            chosen: List[str] = []
+            used = 0
+            for t in ordered:
+                line = self.catalog.table_line(t, max_cols_per_table=self.max_cols_per_table)
+                cost = estimate_tokens(line + "\n")
+                # 최상위 테이블 1개는 예산과 무관하게 포함
+                if chosen and used + cost > self.token_budget:
+                    continue
+                lines.append(line)
+                chosen.append(t)
+                used += cost
+            text_out = "\n".join(lines)
+            context = SchemaContext(
+                text=text_out,
+                tables=chosen,
+                tokens_used=estimate_tokens(text_out),
+                tokens_full=self.tokens_full,
+                pruned=True,
+            )
+
+        self.total_tokens_full += context.tokens_full
+        self.total_tokens_used += context.tokens_used
+        return context
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.total_tokens_full - self.total_tokens_used
+        return {
+            "requests": self.requests,
+            "tokens_full": self.total_tokens_full,
+            "tokens_used": self.total_tokens_used,
+            "tokens_saved": saved,
+            "saved_ratio": (saved / self.total_tokens_full) if self.total_tokens_full else 0.0,
+        }
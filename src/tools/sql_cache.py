@@ -0,0 +1,195 @@
+"""Semantic SQL Cache (step7)
+
+"80점 아래인 사람" / "점수 80 미만 사용자"처럼 표현만 다른 질문마다
+SQL 생성 LLM 호출을 다시 하지 않도록, (질문 임베딩 → 검증된 SQL)을 캐시합니다.
+
+- 캐시는 스키마 지문(schema_summary_text 해시) 단위로 유효하며, 스키마가 바뀌면 전부 폐기
+- 유사도가 threshold 이상인 질문만 재사용
+- 오탐 방지: 질문의 숫자와 SQL의 문자열 리터럴이 새 질문과 일치해야 재사용
+  (예: "80점 미만" 캐시를 "90점 미만"에, "홍길동" 캐시를 "김철수"에 쓰지 않음)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from ..llm.embeddings import EmbedFn, normalize, top_similar
+
+
+_QUESTION_NUMBER_RE = re.compile(r"(?<![\d.])\d+(?:\.\d+)?")
+_SQL_STRING_LITERAL_RE = re.compile(r"'((?:[^']|'')*)'")
+
+
+def schema_fingerprint(schema_text: str) -> str:
+    """스키마 요약 텍스트의 지문 (변경 감지용)"""
+    return hashlib.sha256((schema_text or "").encode("utf-8")).hexdigest()
+
+
+def _question_numbers(question: str) -> Set[str]:
+    return set(_QUESTION_NUMBER_RE.findall(question or ""))
+
+
+def _sql_string_literals(sql: str) -> List[str]:
+    literals = []
+    for raw in _SQL_STRING_LITERAL_RE.findall(sql or ""):
+        value = raw.replace("''", "'").strip("%").strip()
+        if value:
+            literals.append(value.lower())
+    return literals
+
+
+@dataclass
+class _Entry:
+    question: str
+    sql: str
+    context: str
+    vector: List[float]
+    numbers: Set[str]
+    literals: List[str]
+
+
+@dataclass
+class SQLCacheHit:
+    sql: str
+    similarity: float
+    cached_question: str
+
+
+class SemanticSQLCache:
+    """검증된 (질문, SQL) 쌍을 임베딩 유사도로 재사용하는 캐시"""
+
+    def __init__(self, embed_fn: EmbedFn, threshold: float = 0.92, max_entries: int = 500):
+        """
+        Args:
+            embed_fn: 텍스트 리스트 → 벡터 리스트 (src.llm.embeddings 참고)
+            threshold: 재사용할 최소 코사인 유사도
+            max_entries: 최대 항목 수 (초과 시 가장 오래된 항목 제거)
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.fingerprint: Optional[str] = None
+        self._entries: List[_Entry] = []
+        self._last_embedding: Optional[tuple] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    def set_schema(self, schema_text: str) -> bool:
+        """
+        현재 스키마를 지정합니다. 지문이 바뀌면 기존 항목을 모두 폐기합니다.
+
+        Returns:
+            폐기가 일어났는지 여부
+        """
+        fp = schema_fingerprint(schema_text)
+        if fp == self.fingerprint:
+            return False
+        invalidated = self.fingerprint is not None and bool(self._entries)
+        if invalidated:
+            self.invalidations += 1
+        self.fingerprint = fp
+        self._entries = []
+        return invalidated
+
+    def embed_question(self, question: str) -> List[float]:
+        """
+        질문 임베딩 (직전 질문은 재계산하지 않음)
+
+        같은 embed_fn을 쓰는 SchemaRetriever.retrieve(question_vector=...)에 넘겨
+        한 턴에 임베딩 호출이 한 번만 일어나도록 할 수 있습니다.
+        """
+        if self._last_embedding and self._last_embedding[0] == question:
+            return self._last_embedding[1]
+        vector = normalize(self.embed_fn([question])[0])
+        self._last_embedding = (question, vector)
+        return vector
+
+    def lookup(
+        self,
+        question: str,
+        context: str = "",
+        question_vector: Optional[List[float]] = None
+    ) -> Optional[SQLCacheHit]:
+        """
+        유사한 질문의 SQL을 찾습니다.
+
+        Args:
+            question: 사용자 질문
+            context: 후속 질문 맥락 (예: 직전 SQL). 같은 맥락의 항목만 재사용
+            question_vector: embed_question()으로 미리 계산한 벡터 (있으면 임베딩 호출 생략)
+
+        Returns:
+            적중 시 SQLCacheHit, 아니면 None
+        """
+        candidates = [e for e in self._entries if e.context == context]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        try:
+            vector = normalize(question_vector) if question_vector is not None else self.embed_question(question)
+        except Exception:
+            # 임베딩 실패는 캐시 미스로 취급 (파이프라인은 계속 진행)
+            self.errors += 1
+            self.misses += 1
+            return None
+
+        numbers = _question_numbers(question)
+        lowered = (question or "").lower()
+        ranked = top_similar(vector, [e.vector for e in candidates], k=len(candidates))
+        for idx, score in ranked:
+            if score < self.threshold:
+                break
+            entry = candidates[idx]
+            if entry.numbers != numbers:
+                continue
+            if any(lit not in lowered for lit in entry.literals):
+                continue
+            self.hits += 1
+            return SQLCacheHit(sql=entry.sql, similarity=score, cached_question=entry.question)
+
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        question: str,
+        sql: str,
+        context: str = "",
+        question_vector: Optional[List[float]] = None
+    ) -> None:
+        """검증(실행 성공)된 SQL을 저장합니다. (question_vector는 lookup과 동일)"""
+        try:
+            vector = normalize(question_vector) if question_vector is not None else self.embed_question(question)
+        except Exception:
+            self.errors += 1
+            return
+        self._entries.append(
+            _Entry(
+                question=question,
+                sql=sql,
+                context=context,
+                vector=vector,
+                numbers=_question_numbers(question),
+                literals=_sql_string_literals(sql),
+            )
+        )
+        if len(self._entries) > self.max_entries:
+            del self._entries[: len(self._entries) - self.max_entries]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,149 @@
+"""WriteBehindWriter 테스트 (저장할 수 없는 행이 큐를 막지 않는지)
+
+임시 SQLite 파일에 저장할 수 없는 행(잘못된 role, 삭제된 대화를 가리키는 FK)을 섞어 넣고
+- flush()가 시간 안에 끝나는지
+- 나머지 메시지는 순서대로 저장되는지
+- 저장할 수 없는 행만 dropped / dead_letters로 빠지는지
+- MemoryManager의 읽기가 flush를 기다리지 않고 아직 저장되지 않은 메시지를 합쳐서 보여주는지
+확인합니다.
+
+실행:
+    python step10_test_write_behind.py
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import get_engine
+from src.database.models import Conversation, Message
+from src.memory.memory_manager import MemoryManager
+from src.memory.write_behind import WriteBehindWriter
+
+
+DB_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='step10_'), 'write_behind.db')}"
+
+
+def _setup(session_id: str):
+    engine = get_engine(DB_URL)
+    session = sessionmaker(bind=engine)()
+    memory = MemoryManager(session=session)
+    conversation = memory.create_conversation(session_id)
+    writer = WriteBehindWriter(sessionmaker(bind=engine), batch_size=50, flush_interval=0.05,
+                               max_retries=2, retry_backoff=0.01)
+    return session, conversation, writer
+
+
+def _contents(session, conversation_id: int):
+    session.expire_all()
+    return [
+        m.content for m in
+        session.query(Message).filter(Message.conversation_id == conversation_id).order_by(Message.id)
+    ]
+
+
+def test_poison_role():
+    """CheckConstraint 위반(role='bogus-role') 행이 있어도 나머지가 저장되는지"""
+    print("=" * 60)
+    print("잘못된 role")
+    print("=" * 60)
+
+    session, conversation, writer = _setup("poison-role")
+    writer.submit({"conversation_id": conversation.id, "role": "bogus-role", "content": "poison"})
+    for i in range(5):
+        writer.submit({"conversation_id": conversation.id, "role": "user", "content": f"메시지 {i}"})
+
+    assert writer.flush(timeout=5), "flush가 시간 안에 끝나지 않음"
+    stats = writer.stats()
+    print(f"  stats: {stats}")
+    assert stats["persisted"] == 5 and stats["dropped"] == 1 and stats["pending"] == 0
+    assert _contents(session, conversation.id) == [f"메시지 {i}" for i in range(5)]
+    row, error = writer.dead_letters[0]
+    assert row["role"] == "bogus-role" and "IntegrityError" in error
+
+    # 이후 메시지도 정상적으로 저장
+    writer.submit({"conversation_id": conversation.id, "role": "assistant", "content": "이후 메시지"})
+    assert writer.flush(timeout=5)
+    assert _contents(session, conversation.id)[-1] == "이후 메시지"
+    writer.close()
+    print("  ✅ poison row만 빠지고 나머지는 순서대로 저장됨")
+
+
+def test_deleted_conversation():
+    """삭제된 대화를 가리키는 행(FK 위반)이 배치 중간에 있어도 앞뒤 메시지가 저장되는지"""
+    print("=" * 60)
+    print("삭제된 대화 (foreign key)")
+    print("=" * 60)
+
+    session, conversation, writer = _setup("deleted-conversation")
+    deleted = Conversation(session_id="deleted")
+    session.add(deleted)
+    session.commit()
+    deleted_id = deleted.id
+    session.delete(deleted)
+    session.commit()
+
+    writer.submit({"conversation_id": conversation.id, "role": "user", "content": "앞"})
+    writer.submit({"conversation_id": deleted_id, "role": "user", "content": "orphan"})
+    writer.submit({"conversation_id": conversation.id, "role": "assistant", "content": "뒤"})
+
+    assert writer.flush(timeout=5), "flush가 시간 안에 끝나지 않음"
+    stats = writer.stats()
+    print(f"  stats: {stats}")
+    assert stats["persisted"] == 2 and stats["dropped"] == 1 and stats["dead_letters"] == 1
+    assert _contents(session, conversation.id) == ["앞", "뒤"]
+    assert writer.dead_letters[0][0]["conversation_id"] == deleted_id
+    writer.close()
+    print("  ✅ FK 위반 행만 빠짐")
+
+
+def test_read_without_flush():
+    """대기 중인 메시지가 flush 없이 로드/검색/개수에 보이고, 저장 후에도 같은 결과인지"""
+    print("=" * 60)
+    print("flush 없이 읽기")
+    print("=" * 60)
+
+    engine = get_engine(DB_URL)
+    # 배치 간격이 길어서 읽는 동안에는 저장되지 않음
+    writer = WriteBehindWriter(sessionmaker(bind=engine), batch_size=1000, flush_interval=30)
+    memory = MemoryManager(session=sessionmaker(bind=engine)(), write_behind=writer)
+    conversation = memory.create_conversation("read-without-flush")
+    for i in range(3):
+        memory.save_message(conversation.id, "user", f"질문 {i} 사과")
+        memory.save_message(conversation.id, "assistant", f"답변 {i}")
+
+    started = time.perf_counter()
+    recent = memory.load_recent_messages(conversation.id, limit=3)
+    within_budget = memory.load_messages_within_budget(conversation.id, token_budget=10000)
+    found = memory.search_messages("사과", conversation_id=conversation.id)
+    count = memory.get_conversation_messages_count(conversation.id)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"  대기 {writer.pending}개, 읽기 {elapsed_ms:.1f}ms")
+    assert writer.pending == 6, "읽기가 flush를 기다림"
+    assert [m["content"] for m in recent] == ["답변 1", "질문 2 사과", "답변 2"]
+    assert len(within_budget) == 6 and all(m["id"] is None for m in within_budget)
+    assert len(found) == 3 and count == 6
+
+    # 저장 후: 같은 내용에 id가 채워짐 (중복 없음)
+    assert memory.flush()
+    saved = memory.load_messages_within_budget(conversation.id, token_budget=10000)
+    assert [m["content"] for m in saved] == [m["content"] for m in within_budget]
+    assert all(m["id"] is not None for m in saved)
+    assert memory.get_conversation_messages_count(conversation.id) == 6
+
+    # 저장된 메시지 + 대기 메시지
+    memory.save_message(conversation.id, "user", "질문 3 사과")
+    mixed = memory.load_messages_within_budget(conversation.id, token_budget=10000)
+    assert [m["content"] for m in mixed] == [m["content"] for m in saved] + ["질문 3 사과"]
+    assert memory.get_conversation_messages_count(conversation.id) == 7
+    writer.close()
+    print("  ✅ 대기 메시지가 flush 없이 합쳐져서 보임")
+
+
+if __name__ == "__main__":
+    test_poison_role()
+    test_deleted_conversation()
+    test_read_without_flush()
+    print("\n모든 테스트 통과")
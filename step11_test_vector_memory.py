@@ -0,0 +1,119 @@
+"""VectorMemory 테스트 (장기 기억 top-k / write-behind 메시지 backfill)
+
+임시 SQLite 파일에 대화를 저장하고
+- retrieve_relevant_messages가 이미 컨텍스트에 있는 메시지(exclude_ids)를 빼고 top-k를 채우는지
+- write-behind로 저장된(임베딩 없이 저장된) 메시지가 검색 시 backfill되고, 새 프로세스는 다시 임베딩하지 않는지
+확인합니다.
+
+실행:
+    python step11_test_vector_memory.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import get_engine
+from src.database.models import MessageEmbedding
+from src.llm.embeddings import HashingEmbedder
+from src.memory.memory_manager import MemoryManager
+from src.memory.vector_memory import VectorMemory
+from src.memory.write_behind import WriteBehindWriter
+
+
+DB_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='step11_'), 'vector_memory.db')}"
+
+FACTS = [
+    "제 이름은 김철수입니다",
+    "고양이 두 마리를 키워요",
+    "부산에 살고 있어요",
+    "커피는 라떼를 좋아해요",
+    "주말마다 등산을 가요",
+    "내년에 일본 여행을 계획 중이에요",
+]
+
+
+def _embedded(session, conversation_id: int) -> int:
+    session.expire_all()
+    return session.query(MessageEmbedding).filter(MessageEmbedding.conversation_id == conversation_id).count()
+
+
+def test_top_k_excludes_window():
+    """최근 기록에 이미 있는 메시지는 빼고, 그 다음으로 가까운 메시지로 k개를 채우는지"""
+    print("=" * 60)
+    print("top-k에서 최근 기록 제외")
+    print("=" * 60)
+
+    engine = get_engine(DB_URL)
+    memory = MemoryManager(
+        session=sessionmaker(bind=engine)(),
+        vector_memory=VectorMemory(HashingEmbedder(dim=256), model="hashing")
+    )
+    conversation = memory.create_conversation("top-k-window")
+    for fact in FACTS:
+        memory.save_message(conversation.id, "user", fact)
+        memory.save_message(conversation.id, "assistant", "기억해 둘게요")
+    # 가장 최근 메시지와 거의 같은 질문
+    memory.save_message(conversation.id, "user", "다음 달 일본 여행 계획을 세우고 있어요")
+
+    query = "일본 여행 계획"
+    top = memory.retrieve_relevant_messages(conversation.id, query, k=3)
+    window = memory.load_messages_within_budget(conversation.id, token_budget=40)
+    window_ids = [m["id"] for m in window]
+    print(f"  window ids={window_ids}")
+    print(f"  top-3 (제외 없음)={[m['content'] for m in top]}")
+    assert top[0]["id"] in window_ids, "가장 가까운 메시지가 최근 기록에 있어야 의미 있는 테스트"
+
+    results = memory.retrieve_relevant_messages(conversation.id, query, k=3, exclude_ids=window_ids)
+    print(f"  top-3 (최근 기록 제외)={[m['content'] for m in results]}")
+    assert len(results) == 3
+    assert not {m["id"] for m in results} & set(window_ids)
+    assert results[0]["content"] == "내년에 일본 여행을 계획 중이에요"
+    scores = [m["score"] for m in results]
+    assert scores == sorted(scores, reverse=True)
+    print("  ✅ 최근 기록 제외 후 k개를 유사도 순으로 채움")
+
+
+def test_backfill_write_behind_rows():
+    """write-behind 메시지는 저장 시 임베딩되지 않고, 첫 검색에서 한 번만 backfill되는지"""
+    print("=" * 60)
+    print("write-behind 메시지 backfill")
+    print("=" * 60)
+
+    engine = get_engine(DB_URL)
+    Session = sessionmaker(bind=engine)
+    writer = WriteBehindWriter(Session, batch_size=50, flush_interval=0.05)
+    vector_memory = VectorMemory(HashingEmbedder(dim=256), model="hashing")
+    memory = MemoryManager(session=Session(), write_behind=writer, vector_memory=vector_memory)
+    conversation = memory.create_conversation("backfill")
+    for fact in FACTS:
+        memory.save_message(conversation.id, "user", fact)
+        memory.save_message(conversation.id, "assistant", "기억해 둘게요")
+    memory.save_message(conversation.id, "system", "검색 결과 (임베딩 대상 아님)")
+    assert memory.flush()
+
+    check = Session()
+    assert _embedded(check, conversation.id) == 0, "write-behind 저장은 임베딩하지 않음"
+
+    results = memory.retrieve_relevant_messages(conversation.id, "고양이", k=1)
+    assert results[0]["content"] == "고양이 두 마리를 키워요"
+    backfilled = _embedded(check, conversation.id)
+    print(f"  backfill: {backfilled}개, stats={vector_memory.stats()}")
+    assert backfilled == len(FACTS) * 2, "user/assistant 메시지만 모두 임베딩"
+    # 메시지 12개 + 질의 1개
+    assert vector_memory.stats()["embedded"] == len(FACTS) * 2 + 1
+
+    # 새 프로세스(빈 VectorMemory)는 DB의 임베딩을 읽고 질의만 임베딩
+    cold_vectors = VectorMemory(HashingEmbedder(dim=256), model="hashing")
+    cold = MemoryManager(session=Session(), vector_memory=cold_vectors)
+    assert cold.retrieve_relevant_messages(conversation.id, "고양이", k=1)[0]["id"] == results[0]["id"]
+    assert cold_vectors.stats()["embedded"] == 1 and cold_vectors.stats()["loaded"] == len(FACTS) * 2
+    writer.close()
+    print("  ✅ 첫 검색에서 한 번만 backfill, 이후에는 저장된 임베딩 사용")
+
+
+if __name__ == "__main__":
+    test_top_k_excludes_window()
+    test_backfill_write_behind_rows()
+    print("\n모든 테스트 통과")
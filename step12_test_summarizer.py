@@ -0,0 +1,147 @@
+"""ConversationSummarizer 테스트 (chunk 단위 진행 / LLM 실패 시 covered_until_id 유지)
+
+임시 SQLite 파일에 대화를 저장하고 가짜 LLM으로 요약해서
+- 밀려난 메시지를 chunk_tokens 단위로 나눠 LLM을 여러 번 호출하고, chunk마다 covered_until_id가 커밋되는지
+- 이전 요약이 다음 호출에 전달되는지 (증분 요약)
+- LLM이 실패하면 covered_until_id가 그대로이고, 다음 요약이 실패한 chunk부터 이어지는지
+확인합니다.
+
+실행:
+    python step12_test_summarizer.py
+"""
+
+import os
+import tempfile
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db import get_engine
+from src.memory.memory_manager import MemoryManager, message_cost
+from src.memory.summarizer import ConversationSummarizer
+
+
+DB_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='step12_'), 'summarizer.db')}"
+
+# 모든 텍스트 = 10 토큰 → chunk 1개에 메시지 2개
+MESSAGE_TOKENS = 10
+
+
+def _tokens(text: str) -> int:
+    return MESSAGE_TOKENS
+
+
+CHUNK_TOKENS = 2 * message_cost(_tokens, "user", "", MESSAGE_TOKENS)
+
+
+class FakeLLM:
+    """요약 요청을 기록하고 "요약 n"을 돌려주는 LLM (fail_on번째 호출은 실패)"""
+
+    def __init__(self, memory: MemoryManager, conversation_id: int, fail_on=None):
+        self.memory = memory
+        self.conversation_id = conversation_id
+        self.fail_on = fail_on
+        self.calls = 0
+        # 호출 시점에 DB에 커밋된 covered_until_id / 받은 이전 요약
+        self.covered_at_call = []
+        self.previous_summaries = []
+
+    def generate(self, messages, temperature=0.7, max_tokens=None):
+        self.calls += 1
+        self.memory.session.expire_all()
+        summary = self.memory.load_summary(self.conversation_id)
+        self.covered_at_call.append(summary["covered_until_id"] if summary else 0)
+        self.previous_summaries.append(messages[-1]["content"].split("\n")[1])
+        if self.calls == self.fail_on:
+            raise ConnectionError("LLM unavailable")
+        return f"요약 {self.calls}"
+
+
+def _setup(session_id: str, messages: int):
+    engine = get_engine(DB_URL)
+    Session = sessionmaker(bind=engine)
+    memory = MemoryManager(session=Session(), token_estimator=_tokens, use_cache=False)
+    conversation = memory.create_conversation(session_id)
+    ids = [
+        memory.save_message(conversation.id, "user" if i % 2 == 0 else "assistant", f"메시지 {i}").id
+        for i in range(messages)
+    ]
+    return Session, memory, conversation, ids
+
+
+def _summarizer(llm, Session):
+    return ConversationSummarizer(
+        llm,
+        Session,
+        token_estimator=_tokens,
+        chunk_tokens=CHUNK_TOKENS,
+        background=False
+    )
+
+
+def test_chunk_by_chunk():
+    """밀려난 메시지 6개 → LLM 3번, 호출마다 직전 chunk까지 커밋되어 있는지"""
+    print("=" * 60)
+    print("chunk 단위 진행")
+    print("=" * 60)
+
+    Session, memory, conversation, ids = _setup("chunks", 8)
+    llm = FakeLLM(memory, conversation.id)
+    result = _summarizer(llm, Session).summarize(conversation.id, keep_from_id=ids[6])
+
+    print(f"  covered_until_id at each call: {llm.covered_at_call}")
+    assert llm.calls == 3
+    assert llm.covered_at_call == [0, ids[1], ids[3]]
+    assert llm.previous_summaries == ["(empty)", "요약 1", "요약 2"]
+    assert result["covered_until_id"] == ids[5] and result["content"] == "요약 3"
+    assert result["llm_calls"] == 3 and result["messages_folded"] == 6
+
+    # 새로 밀려난 메시지가 없으면 LLM을 부르지 않음
+    assert _summarizer(llm, Session).summarize(conversation.id, keep_from_id=ids[6]) is None
+    assert llm.calls == 3
+    print("  ✅ chunk마다 covered_until_id 커밋, 이전 요약을 이어서 사용")
+
+
+def test_llm_failure_keeps_covered_until_id():
+    """첫 호출이 실패하면 요약이 없고, 두 번째 chunk에서 실패하면 첫 chunk까지만 반영되는지"""
+    print("=" * 60)
+    print("LLM 실패")
+    print("=" * 60)
+
+    Session, memory, conversation, ids = _setup("failure", 8)
+
+    llm = FakeLLM(memory, conversation.id, fail_on=1)
+    try:
+        _summarizer(llm, Session).summarize(conversation.id, keep_from_id=ids[6])
+        raise AssertionError("LLM 실패가 전달되어야 함")
+    except ConnectionError:
+        pass
+    memory.session.expire_all()
+    assert memory.load_summary(conversation.id) is None
+    print("  ✅ 첫 chunk 실패: 요약 없음")
+
+    llm = FakeLLM(memory, conversation.id, fail_on=2)
+    summarizer = _summarizer(llm, Session)
+    try:
+        summarizer.summarize(conversation.id, keep_from_id=ids[6])
+        raise AssertionError("LLM 실패가 전달되어야 함")
+    except ConnectionError:
+        pass
+    memory.session.expire_all()
+    summary = memory.load_summary(conversation.id)
+    assert summary["covered_until_id"] == ids[1] and summary["content"] == "요약 1"
+    assert summarizer.stats()["failures"] == 1
+    print(f"  ✅ 두 번째 chunk 실패: covered_until_id={summary['covered_until_id']} (첫 chunk까지)")
+
+    # 다시 시도하면 실패한 chunk부터 이어서
+    llm = FakeLLM(memory, conversation.id)
+    result = _summarizer(llm, Session).summarize(conversation.id, keep_from_id=ids[6])
+    assert llm.covered_at_call == [ids[1], ids[3]]
+    assert llm.previous_summaries == ["요약 1", "요약 1"]
+    assert result["covered_until_id"] == ids[5] and result["messages_folded"] == 6
+    print("  ✅ 재시도는 실패한 chunk부터")
+
+
+if __name__ == "__main__":
+    test_chunk_by_chunk()
+    test_llm_failure_keeps_covered_until_id()
+    print("\n모든 테스트 통과")
@@ -73,6 +73,7 @@ def test_token_limit():
     print(f"선택된 메모리 수: {selected_memories}")
     print(f"최종 컨텍스트 메시지 수: {len(context)}")
     print(f"토큰 추정: {assembler._estimate_messages_tokens(context)}")
+    assert assembler._estimate_messages_tokens(context) <= assembler.max_tokens
 
 
 def test_convenience_function():
@@ -94,10 +95,83 @@ def test_convenience_function():
     print(f"✅ 편의 함수로 생성된 컨텍스트: {len(context)}개 메시지")
 
 
+def test_section_budget():
+    """섹션별 토큰 예산 테스트 (큰 검색 결과가 대화 기록을 밀어내지 않음)"""
+    print("\n" + "=" * 60)
+    print("섹션별 토큰 예산 테스트")
+    print("=" * 60)
+    
+    assembler = ContextAssembler(max_tokens=1024, reserved_output_tokens=128)
+    memories = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"메시지 {i}: 테스트 대화입니다."}
+        for i in range(200)
+    ]
+    search_results = "검색 결과 문서 내용입니다. " * 2000
+    summary = "철수는 파이썬을 배우는 중이다. " * 10
+    
+    context = assembler.build_context(
+        memories=memories,
+        user_message="요약해줘",
+        search_results=search_results,
+        summary=summary
+    )
+    
+    total = assembler._estimate_messages_tokens(context) + assembler.reserved_output_tokens
+    used = assembler.last_allocation["used"]
+    print(f"섹션별 사용량: {used}")
+    print(f"전체 토큰 (응답 예약 포함): {total} / {assembler.max_tokens}")
+    
+    assert total <= assembler.max_tokens
+    # 검색 결과는 쿼터(40%)까지만, 잘린 표시 포함
+    assert used["search"] <= assembler.last_allocation["allocated"]["search"]
+    assert context[0]["content"].count("Search Results:") == 1 and " …" in context[0]["content"]
+    # 대화 기록은 보장분(25%) 이상
+    flexible = sum(assembler.last_allocation["allocated"].values())
+    assert used["history"] >= int(flexible * 0.25) - 30
+    assert len(context) > 3 and context[-2] == memories[-1]
+    print("✅ 모든 섹션이 예산 안에 들어감")
+
+
+def test_stable_prefix():
+    """stable_prefix 테스트 (시스템 프롬프트/이전 대화 기록은 그대로, 검색 결과는 뒤에)"""
+    print("\n" + "=" * 60)
+    print("stable_prefix 테스트")
+    print("=" * 60)
+    
+    assembler = ContextAssembler(max_tokens=1024, reserved_output_tokens=128, stable_prefix=True)
+    history = assembler.new_history()
+    previous_start = None
+    window_moves = 0
+    
+    for turn in range(40):
+        context = assembler.build_context(
+            memories=history,
+            user_message=f"질문 {turn}",
+            search_results=f"검색 결과 {turn} " * 20
+        )
+        assert context[0]["content"] == assembler.system_prompt
+        assert context[-2]["role"] == "system" and context[-2]["content"].startswith("Search Results:")
+        if len(context) > 3:
+            start = context[1]
+            if previous_start is not None and start is not previous_start:
+                window_moves += 1
+            previous_start = start
+        history.extend([
+            {"role": "user", "content": f"질문 {turn}"},
+            {"role": "assistant", "content": f"답변입니다 {turn} " * 8}
+        ])
+    
+    print(f"40턴 동안 대화 기록 창 시작이 바뀐 횟수: {window_moves}")
+    assert window_moves < 20
+    print("✅ 앞부분이 유지됨")
+
+
 if __name__ == "__main__":
     test_basic_context()
     test_token_limit()
     test_convenience_function()
+    test_section_budget()
+    test_stable_prefix()
     print("\n" + "=" * 60)
     print("✅ 모든 테스트 완료!")
     print("=" * 60)
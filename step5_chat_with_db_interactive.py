@@ -27,6 +27,8 @@ step3와 step4의 결합:
 """
 
 # import uuid  # 향후 새 세션 생성 시 사용
+import time
+
 from src.chat.chat_manager_with_db import ChatManagerWithDB
 
 
@@ -79,14 +81,23 @@ def main():
             # step3: 메모리에만 저장 (self.conversation_history.append)
             # step4: Memory Manager로 DB 저장/로드 가능 (하지만 Chat Manager에서 사용 안 함)
             # step5: DB에 저장되고, DB에서 로드됨 (step4의 Memory Manager 사용)
-            response = chat_manager.chat(user_input)
-            
-            # 응답 출력
-            print(response)
+            # 스트리밍: 생성되는 대로 바로 출력 (첫 토큰까지의 대기시간 단축)
+            started = time.perf_counter()
+            first_token_at = None
+            for chunk in chat_manager.chat_stream(user_input):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                print(chunk, end="", flush=True)
+            print()
             
             # 디버그 정보
             message_count = chat_manager.get_message_count()
             print(f"\n[디버그] DB에 저장된 메시지 수: {message_count}개")
+            if first_token_at is not None:
+                print(
+                    f"[디버그] 첫 토큰까지: {first_token_at - started:.2f}s / "
+                    f"전체: {time.perf_counter() - started:.2f}s"
+                )
             
         except KeyboardInterrupt:
             print("\n\n👋 안녕히가세요!")
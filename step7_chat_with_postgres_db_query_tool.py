@@ -8,22 +8,32 @@ Step 7: PostgreSQL + DB 테이블 조회 (자연어 → (query|transform) → 
 """
 
 import json
+import os
 import re
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 
+from src.database.db import DB_DIR
 from src.database.db_postgres import get_engine_postgres, get_session_postgres
+from src.llm.cached_provider import CachingLLMProvider, SQLiteResponseCache
+from src.llm.embeddings import HashingEmbedder, OllamaEmbedder
+from src.llm.llm_provider import LLMProvider
 from src.llm.ollama_provider import OllamaProvider
 from src.memory.memory_manager import MemoryManager
 from src.tools.db_query_tool import (
+    ColumnarQueryResult,
     DBQueryTool,
     QueryResult,
     extract_first_sql_statement,
     is_safe_select_sql,
     make_count_sql_from_select,
 )
+from src.tools.result_transforms import LOCAL_OPERATIONS, apply_transform
+from src.tools.schema_retriever import SchemaRetriever
+from src.tools.sql_cache import SemanticSQLCache
 
 
 SQL_SYSTEM_PROMPT = """You are a PostgreSQL SQL generator.
@@ -50,7 +60,7 @@ ROUTER_SYSTEM_PROMPT = """당신은 DB 질의 라우터입니다.
 사용자 요청을 보고 아래 중 하나를 JSON으로 선택하세요.
 
 1) query: DB를 다시 조회해야 하는 경우 (필터/조건/집계/정확한 카운트/새로운 조건 추가)
-2) transform: 직전 DB 결과를 가공하면 되는 경우 (표현 변경, 특정 컬럼만 보기, 직전 결과의 개수 등)
+2) transform: 직전 DB 결과를 가공하면 되는 경우 (표현 변경, 특정 컬럼만 보기, 직전 결과의 개수, 정렬/상위 N개/필터/고유값/그룹별 집계 등)
 
 출력은 반드시 JSON 1개만. 다른 텍스트 금지.
 
@@ -61,18 +71,45 @@ JSON 스키마:
   {"action":"transform","operation":"pick_column","column":"name"}
 - transform (직전 결과 기반 개수):
   {"action":"transform","operation":"count_last"}
+- transform (직전 결과 정렬, order는 "asc" 또는 "desc"):
+  {"action":"transform","operation":"sort","column":"score","order":"desc"}
+- transform (직전 결과 상위 N개):
+  {"action":"transform","operation":"top_n","column":"score","n":5,"order":"desc"}
+- transform (직전 결과 안에서 필터, op는 "=","!=",">",">=","<","<=","contains"):
+  {"action":"transform","operation":"filter","column":"score","op":"<","value":80}
+- transform (직전 결과의 고유값):
+  {"action":"transform","operation":"distinct","column":"city"}
+- transform (직전 결과 그룹별 집계, agg는 "count","sum","avg","min","max"):
+  {"action":"transform","operation":"group_by","column":"city","agg":"avg","agg_column":"score"}
 
 규칙(중요):
 - "…인/…아래/…이상/…미만/…같은" 등 조건/필터가 있으면 query가 우선입니다.
+- 단, last_result_complete가 True이고 직전 결과 안에서만 거르는 요청이면 filter transform을 사용합니다.
+- sort/top_n/filter/distinct/group_by는 last_result_complete가 True일 때만 사용하고, False면 query를 선택합니다.
 - "이름만/이메일만/ID만"처럼 출력만 바꾸는 요청이면 transform이 우선입니다.
 """
 
+# query 결과 최대 행 수 (이보다 적게 나오면 직전 결과가 "완전"하다고 봄)
+QUERY_MAX_ROWS = 50
+
+# LLM이 한국어로 컬럼을 내보내는 경우를 최소 보정
+COLUMN_ALIASES = {
+    "이름": "name",
+    "성명": "name",
+    "메일": "email",
+    "이메일": "email",
+    "아이디": "id",
+    "점수": "score",
+    "성적": "score",
+}
+
 
 @dataclass
 class RouteDecision:
     action: str  # "query" | "transform"
     operation: Optional[str] = None  # for transform
-    column: Optional[str] = None  # for transform pick_column
+    column: Optional[str] = None  # for transform pick_column / sort / filter ...
+    params: Dict[str, Any] = field(default_factory=dict)  # order, n, op, value, agg, agg_column
 
 def _normalize_col_name(name: str) -> str:
     return (name or "").strip().lower()
@@ -116,19 +153,24 @@ def _extract_json_object(text_out: str) -> Optional[Dict[str, Any]]:
 
 
 def _route_action(
-    llm: OllamaProvider,
+    llm: LLMProvider,
     user_request: str,
-    last_result: Optional[QueryResult],
+    last_result: Optional[Union[QueryResult, ColumnarQueryResult]],
     last_sql: Optional[str],
+    last_result_complete: bool = False,
 ) -> RouteDecision:
     """
     현업식(가까운) 분기: LLM이 JSON으로 query/transform을 명시.
+
+    Args:
+        last_result_complete: 직전 결과가 LIMIT에 잘리지 않은 전체 결과인지
+            (정렬/필터/집계를 로컬에서 해도 되는지)
     """
     last_cols = []
     last_rows = 0
     if last_result is not None:
         last_cols = last_result.columns
-        last_rows = len(last_result.rows)
+        last_rows = last_result.row_count
 
     messages = [
         {
@@ -138,7 +180,8 @@ def _route_action(
             + "Context:\n"
             + f"- last_sql_present: {bool(last_sql)}\n"
             + f"- last_result_rows: {last_rows}\n"
-            + f"- last_result_columns: {last_cols}\n",
+            + f"- last_result_columns: {last_cols}\n"
+            + f"- last_result_complete: {last_result_complete}\n",
         },
         {"role": "user", "content": user_request},
     ]
@@ -148,21 +191,25 @@ def _route_action(
     action = (obj or {}).get("action", "query")
     operation = (obj or {}).get("operation")
     column = (obj or {}).get("column")
+    params = {k: v for k, v in (obj or {}).items() if k not in ("action", "operation", "column")}
 
     if action not in ("query", "transform"):
         action = "query"
 
     # 최소 안전장치: 필터/조건처럼 보이는 문장은 query 우선(LLM 오판 방지)
+    # - 직전 결과가 완전하면 로컬 연산(filter 등)은 그대로 허용
     cond_hints = ("인 ", "인유저", "인 사용자", "아래", "이상", "미만", "같은", "where", "=")
-    if action == "transform" and any(h in user_request for h in cond_hints):
+    local_ok = operation in LOCAL_OPERATIONS and last_result_complete
+    if action == "transform" and not local_ok and any(h in user_request for h in cond_hints):
         action = "query"
         operation = None
         column = None
+        params = {}
 
-    return RouteDecision(action=action, operation=operation, column=column)
+    return RouteDecision(action=action, operation=operation, column=column, params=params)
 
 
-def _generate_sql(llm: OllamaProvider, schema_text: str, user_request: str) -> str:
+def _generate_sql(llm: LLMProvider, schema_text: str, user_request: str) -> str:
     messages = [
         {"role": "system", "content": f"{SQL_SYSTEM_PROMPT}\n\nSchema:\n{schema_text}"},
         {"role": "user", "content": user_request},
@@ -170,7 +217,7 @@ def _generate_sql(llm: OllamaProvider, schema_text: str, user_request: str) -> s
     sql = llm.generate(messages, temperature=0.0)
     return (sql or "").strip()
 
-def _regenerate_sql_with_error(llm: OllamaProvider, schema_text: str, user_request: str, error_reason: str) -> str:
+def _regenerate_sql_with_error(llm: LLMProvider, schema_text: str, user_request: str, error_reason: str) -> str:
     messages = [
         {"role": "system", "content": f"{SQL_SYSTEM_PROMPT}\n\nSchema:\n{schema_text}"},
         {
@@ -186,7 +233,7 @@ def _regenerate_sql_with_error(llm: OllamaProvider, schema_text: str, user_reque
     return (sql or "").strip()
 
 
-def _final_answer(llm: OllamaProvider, user_request: str, sql: Optional[str], result_text: str) -> str:
+def _final_answer(llm: LLMProvider, user_request: str, sql: Optional[str], result_text: str) -> str:
     context = []
     if sql:
         context.append(f"[SQL]\n{sql}")
@@ -226,17 +273,47 @@ def main():
     session_id = "default"
     conversation = memory_manager.get_or_create_conversation(session_id)
 
-    tool = DBQueryTool(engine=engine)
-    llm = OllamaProvider()
+    # 스키마 카탈로그는 1회 bulk 조회 후 TTL 동안 캐시 (+ 디스크 스냅샷으로 재시작 시 재사용)
+    tool = DBQueryTool(
+        engine=engine,
+        catalog_ttl=300.0,
+        catalog_snapshot_path=os.path.join(DB_DIR, "schema_catalog.json"),
+    )
+    ollama = OllamaProvider()
+    # 라우터/SQL 생성은 temperature=0.0 결정적 호출 → 같은 질문은 캐시에서 즉시 응답
+    llm = CachingLLMProvider(
+        ollama,
+        cache=SQLiteResponseCache(os.path.join(DB_DIR, "llm_cache.db"), ttl=24 * 60 * 60),
+    )
+
+    # 표현만 다른 질문(패러프레이즈)은 SQL 생성 LLM 호출 없이 검증된 SQL 재사용
+    # - STEP7_EMBED_MODEL=local 이면 Ollama 없이 문자 n-gram 해싱 임베딩 사용
+    embed_model = os.getenv("STEP7_EMBED_MODEL", "nomic-embed-text")
+    if embed_model == "local":
+        embedder = None
+        sql_cache = SemanticSQLCache(HashingEmbedder(), threshold=0.9)
+    else:
+        embedder = OllamaEmbedder(ollama, model=embed_model)
+        sql_cache = SemanticSQLCache(embedder, threshold=0.92)
 
     # 스키마 요약 (초기 1회)
     schema_text = tool.schema_summary_text(schema="public", max_tables=60, max_cols_per_table=25)
-    last_result: Optional[QueryResult] = None
+    sql_cache.set_schema(schema_text)
+
+    # SQL 생성 프롬프트에는 질문과 관련된 테이블(+FK 이웃)만 토큰 예산 안에서 포함
+    schema_retriever = SchemaRetriever(tool.schema_catalog(schema="public"), embed_fn=embedder)
+    last_result: Optional[Union[QueryResult, ColumnarQueryResult]] = None
     last_sql: Optional[str] = None
+    # 직전 결과가 LIMIT에 잘리지 않았는지 / 로컬 transform으로 만든 결과인지
+    last_result_complete = False
+    last_result_derived = False
 
     while True:
         user_input = input("\n[당신]: ").strip()
         if user_input.lower() in ["quit", "exit", "종료", "q"]:
+            print(f"\n[LLM CACHE] {llm.stats()}")
+            print(f"[SQL CACHE] {sql_cache.stats()}")
+            print(f"[SCHEMA] {schema_retriever.stats()}")
             print("\n안녕히가세요!")
             break
         if not user_input:
@@ -264,19 +341,34 @@ def main():
             memory_manager.save_message(conversation.id, "assistant", msg)
             continue
 
+        # 스키마 요약 갱신 (TTL 내에는 캐시, 구조가 바뀌었으면 SQL 캐시도 폐기)
+        schema_text = tool.schema_summary_text(schema="public", max_tables=60, max_cols_per_table=25)
+        if sql_cache.set_schema(schema_text):
+            print("\n[SQL CACHE] 스키마 변경 감지 - 캐시 초기화")
+        catalog = tool.schema_catalog(schema="public")
+        if catalog.fingerprint != schema_retriever.catalog.fingerprint:
+            schema_retriever = SchemaRetriever(catalog, embed_fn=embedder)
+
         # 사용자 메시지 저장
         memory_manager.save_message(conversation.id, "user", user_input)
 
         # 라우팅: query vs transform (LLM JSON)
-        route = _route_action(llm, user_input, last_result=last_result, last_sql=last_sql)
+        route = _route_action(
+            llm,
+            user_input,
+            last_result=last_result,
+            last_sql=last_sql,
+            last_result_complete=last_result_complete,
+        )
 
         # transform 처리
         if route.action == "transform":
             if route.operation == "count_last":
-                if last_sql:
+                # 로컬 transform 결과는 last_sql과 다르므로 COUNT SQL 대신 로컬 행 수 사용
+                if last_sql and not last_result_derived:
                     try:
                         count_sql = make_count_sql_from_select(last_sql)
-                        result = tool.run_select(count_sql, max_rows=5)
+                        result = tool.run_select(count_sql, max_rows=5, columnar=True)
                         result_text = tool.format_result(result)
                         print("\n[SQL]")
                         print(count_sql)
@@ -286,6 +378,8 @@ def main():
                         print(f"\n[봇]: {answer}")
                         last_result = result
                         last_sql = count_sql
+                        last_result_complete = True
+                        last_result_derived = False
                         memory_manager.save_message(conversation.id, "assistant", answer)
                         continue
                     except Exception as e:
@@ -294,7 +388,7 @@ def main():
                         memory_manager.save_message(conversation.id, "assistant", answer)
                         continue
                 if last_result is not None:
-                    answer_text = f"직전 결과 기준 {len(last_result.rows)}개입니다."
+                    answer_text = f"직전 결과 기준 {last_result.row_count}개입니다."
                     print(f"\n[봇]: {answer_text}")
                     memory_manager.save_message(conversation.id, "assistant", answer_text)
                     continue
@@ -306,15 +400,7 @@ def main():
                 else:
                     cols_lower = [_normalize_col_name(c) for c in last_result.columns]
                     col = (route.column or "").strip().lower()
-                    # LLM이 한국어로 컬럼을 내보내는 경우를 최소 보정
-                    col_alias = {
-                        "이름": "name",
-                        "성명": "name",
-                        "메일": "email",
-                        "이메일": "email",
-                        "아이디": "id",
-                    }
-                    col = col_alias.get(col, col)
+                    col = COLUMN_ALIASES.get(col, col)
                     if not col:
                         col = "name"
                     if col not in cols_lower:
@@ -322,7 +408,8 @@ def main():
                         route = RouteDecision(action="query")
                     else:
                         idx = cols_lower.index(col)
-                        values = [row[idx] for row in last_result.rows]
+                        # 컬럼 단위 결과: 행을 순회하지 않고 컬럼 배열을 바로 가져옴
+                        values = list(last_result.column(last_result.columns[idx]))
                         answer_text = _format_single_column_list(values)
                         print("\n[TRANSFORM]")
                         print(f"operation=pick_column column={col} (DB 재조회 없음)")
@@ -330,13 +417,72 @@ def main():
                         memory_manager.save_message(conversation.id, "assistant", answer_text)
                         continue
 
+            if route.operation in LOCAL_OPERATIONS:
+                if last_result is None or not last_result_complete:
+                    # 직전 결과가 없거나 LIMIT으로 잘렸으면 로컬 결과가 틀릴 수 있음 → query로 폴백
+                    route = RouteDecision(action="query")
+                else:
+                    try:
+                        started = time.perf_counter()
+                        result = apply_transform(
+                            last_result,
+                            route.operation,
+                            column=route.column,
+                            aliases=COLUMN_ALIASES,
+                            **route.params,
+                        )
+                        elapsed_us = (time.perf_counter() - started) * 1_000_000
+                    except (ValueError, TypeError) as e:
+                        # 컬럼/파라미터를 해석하지 못하면 query로 폴백
+                        print(f"\n[TRANSFORM] {route.operation} 실패: {e} - DB 재조회")
+                        route = RouteDecision(action="query")
+                    else:
+                        # LLM(SQL 생성/답변)과 DB를 거치지 않고 가공 결과를 그대로 출력
+                        answer_text = tool.format_result(result)
+                        print("\n[TRANSFORM]")
+                        print(
+                            f"operation={route.operation} column={route.column} params={route.params} "
+                            f"rows={last_result.row_count}->{result.row_count} "
+                            f"elapsed={elapsed_us:.0f}us (DB 재조회 없음)"
+                        )
+                        print(f"\n[봇]:\n{answer_text}")
+                        last_result = result
+                        last_result_derived = True
+                        memory_manager.save_message(conversation.id, "assistant", answer_text)
+                        continue
+
         # 1) SQL 생성
         # 후속 요청일 가능성이 있으면 이전 SQL을 힌트로 제공(재가공/재조회 유도)
         hint = ""
         if last_sql:
             hint = f"\n\nPrevious SQL (for follow-up context):\n{last_sql}\n"
 
-        raw_sql = _generate_sql(llm, schema_text=schema_text + hint, user_request=user_input)
+        # 캐시와 스키마 검색이 같은 임베더를 쓰면 질문 임베딩은 턴마다 한 번만 계산
+        question_vector = None
+        if embedder is not None:
+            try:
+                question_vector = sql_cache.embed_question(user_input)
+            except Exception:
+                question_vector = None
+
+        cache_context = last_sql or ""
+        cache_hit = sql_cache.lookup(user_input, context=cache_context, question_vector=question_vector)
+        sql_schema_text = schema_text
+        if cache_hit is not None:
+            print(
+                f"\n[SQL CACHE] hit similarity={cache_hit.similarity:.3f} "
+                f"(cached: {cache_hit.cached_question}) - SQL 생성 생략"
+            )
+            raw_sql = cache_hit.sql
+        else:
+            schema_ctx = schema_retriever.retrieve(user_input, question_vector=question_vector)
+            sql_schema_text = schema_ctx.text
+            if schema_ctx.pruned:
+                print(
+                    f"\n[SCHEMA] tables={schema_ctx.tables} "
+                    f"tokens {schema_ctx.tokens_full} -> {schema_ctx.tokens_used}"
+                )
+            raw_sql = _generate_sql(llm, schema_text=sql_schema_text + hint, user_request=user_input)
         sql = extract_first_sql_statement(raw_sql)
 
         # 추출 결과가 없으면 NO_SQL 취급
@@ -349,7 +495,7 @@ def main():
         # 1-1) 안전성 체크 (실패 시 1회 재시도)
         ok, reason = is_safe_select_sql(sql)
         if not ok:
-            raw_retry = _regenerate_sql_with_error(llm, schema_text, user_input, error_reason=reason)
+            raw_retry = _regenerate_sql_with_error(llm, sql_schema_text, user_input, error_reason=reason)
             sql_retry = extract_first_sql_statement(raw_retry)
             if sql_retry:
                 sql = sql_retry
@@ -375,7 +521,7 @@ def main():
 
         # 2) SQL 실행 (SELECT-only)
         try:
-            result = tool.run_select(sql, max_rows=50)
+            result = tool.run_select(sql, max_rows=QUERY_MAX_ROWS, columnar=True)
             result_text = tool.format_result(result)
         except Exception as e:
             # 디버그 정보는 콘솔에 그대로
@@ -392,6 +538,10 @@ def main():
             memory_manager.save_message(conversation.id, "assistant", answer)
             continue
 
+        # 실행까지 성공한 SQL만 캐시에 저장
+        if cache_hit is None:
+            sql_cache.store(user_input, sql, context=cache_context, question_vector=question_vector)
+
         # 3) 결과 기반 답변
         print("\n[SQL]")
         print(sql)
@@ -403,6 +553,8 @@ def main():
         # 후속 요청을 위해 직전 결과를 기억 (프로세스 내 메모리)
         last_result = result
         last_sql = sql
+        last_result_complete = result.row_count < QUERY_MAX_ROWS
+        last_result_derived = False
 
         # 응답 저장
         memory_manager.save_message(conversation.id, "assistant", answer)
@@ -0,0 +1,283 @@
+"""AsyncMemoryManager 테스트 (동기 MemoryManager와 결과 비교)
+
+임시 SQLite 파일 하나에 동기(sqlite) / 비동기(sqlite+aiosqlite) 엔진을 함께 연결하고
+같은 작업의 결과가 같은지 확인합니다. (장기 기억 검색 / 요약 조회 포함)
+
+필요 패키지: aiosqlite (pip install aiosqlite)
+
+실행:
+    python step9_test_async_memory_parity.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from src.database.async_db import get_async_engine, get_async_session_factory
+from src.database.db import get_engine
+from src.database.models import ConversationSummary
+from src.llm.embeddings import HashingEmbedder
+from src.llm.generation_metrics import generation_metadata
+from src.llm.llm_provider import GenerationResult
+from src.memory.async_memory_manager import AsyncMemoryManager
+from src.memory.memory_manager import MemoryManager
+from src.memory.vector_memory import VectorMemory
+
+
+DB_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='step9_'), 'parity.db')}"
+
+
+def _managers(use_cache: bool, embed_fn=None):
+    sync_memory = MemoryManager(
+        session=sessionmaker(bind=get_engine(DB_URL))(),
+        use_cache=use_cache,
+        vector_memory=VectorMemory(embed_fn, model="hashing") if embed_fn else None
+    )
+    async_memory = AsyncMemoryManager(
+        session_factory=get_async_session_factory(get_async_engine(DB_URL)),
+        use_cache=use_cache,
+        vector_memory=VectorMemory(embed_fn, model="hashing") if embed_fn else None
+    )
+    return sync_memory, async_memory
+
+
+def _ranked(results):
+    # 유사도는 float32 계산이라 소수점 아래 5자리까지만 비교
+    return [(r["id"], r["role"], r["content"], round(r["score"], 5)) for r in results]
+
+
+def _check(label: str, sync_result, async_result):
+    assert sync_result == async_result, f"{label}: sync={sync_result!r} async={async_result!r}"
+    print(f"  ✅ {label}")
+
+
+async def test_save_and_load_parity():
+    """동기/비동기로 번갈아 저장하고 같은 조회 결과가 나오는지"""
+    print("=" * 60)
+    print("저장/조회 결과 비교 (캐시 없음)")
+    print("=" * 60)
+
+    sync_memory, async_memory = _managers(use_cache=False)
+    conversation = await async_memory.get_or_create_conversation("parity")
+    _check("get_or_create_conversation", sync_memory.get_or_create_conversation("parity").id, conversation.id)
+
+    for i in range(120):
+        if i % 2 == 0:
+            sync_memory.save_message(conversation.id, "user", f"질문 {i} " + "가" * (i % 17))
+        else:
+            await async_memory.save_message(conversation.id, "assistant", f"답변 {i} " + "나" * (i % 23))
+
+    _check(
+        "get_conversation_messages_count",
+        sync_memory.get_conversation_messages_count(conversation.id),
+        await async_memory.get_conversation_messages_count(conversation.id)
+    )
+    for limit in (None, 1, 10, 500):
+        _check(
+            f"load_recent_messages(limit={limit})",
+            sync_memory.load_recent_messages(conversation.id, limit=limit),
+            await async_memory.load_recent_messages(conversation.id, limit=limit)
+        )
+    for budget in (0, 50, 300, 100000):
+        _check(
+            f"load_messages_within_budget({budget})",
+            sync_memory.load_messages_within_budget(conversation.id, budget, chunk_size=7),
+            await async_memory.load_messages_within_budget(conversation.id, budget, chunk_size=7)
+        )
+
+    page = sync_memory.load_messages_page(conversation.id, limit=10)
+    _check("load_messages_page()", page, await async_memory.load_messages_page(conversation.id, limit=10))
+    anchor = page[0]["id"]
+    _check(
+        "load_messages_page(before_id)",
+        sync_memory.load_messages_page(conversation.id, limit=10, before_id=anchor),
+        await async_memory.load_messages_page(conversation.id, limit=10, before_id=anchor)
+    )
+    _check(
+        "load_messages_page(after_id)",
+        sync_memory.load_messages_page(conversation.id, limit=10, after_id=anchor),
+        await async_memory.load_messages_page(conversation.id, limit=10, after_id=anchor)
+    )
+    for query, conversation_id in (("질문 1", conversation.id), ("답변", None), ("가가가", conversation.id), ("?!", None)):
+        _check(
+            f"search_messages({query!r})",
+            sync_memory.search_messages(query, conversation_id=conversation_id, limit=5),
+            await async_memory.search_messages(query, conversation_id=conversation_id, limit=5)
+        )
+    hits = sync_memory.search_messages("질문 11")
+    assert hits and all("질문 11" in hit["content"] for hit in hits), hits
+
+    for i in range(6):
+        result = GenerationResult(
+            text=f"측정 {i}",
+            model="llama3" if i % 2 == 0 else "qwen2.5",
+            prompt_tokens=200,
+            completion_tokens=50,
+            total_ms=2000.0 if i < 2 else 1000.0,
+            load_ms=900.0 if i < 2 else 5.0,
+            prompt_eval_ms=100.0,
+            eval_ms=500.0
+        )
+        save = sync_memory.save_message if i % 2 == 0 else async_memory.save_message
+        saved = save(conversation.id, "assistant", result.text, message_metadata=generation_metadata(result))
+        if asyncio.iscoroutine(saved):
+            await saved
+    report = sync_memory.generation_report(conversation_id=conversation.id)
+    _check("generation_report", report, await async_memory.generation_report(conversation_id=conversation.id))
+    assert set(report) == {"llama3", "qwen2.5"}, report
+    assert report["llama3"]["calls"] == 3 and report["llama3"]["tokens_per_second"] == 100.0
+    assert report["llama3"]["load_stalls"] == 1 and report["qwen2.5"]["load_stalls"] == 1
+
+
+async def test_cache_parity():
+    """캐시를 켠 상태에서도 서로 쓴 메시지를 감지하는지 (verify_cache)"""
+    print("\n" + "=" * 60)
+    print("캐시 사용 시 결과 비교")
+    print("=" * 60)
+
+    sync_memory, async_memory = _managers(use_cache=True)
+    conversation = await async_memory.get_or_create_conversation("parity-cache")
+
+    for i in range(30):
+        await async_memory.save_message(conversation.id, "user", f"메시지 {i}")
+        # 캐시를 채운 뒤 다른 쪽에서 쓴 메시지도 보여야 함
+        sync_memory.load_recent_messages(conversation.id)
+        sync_memory.save_message(conversation.id, "assistant", f"응답 {i}")
+        if i % 10 == 9:
+            _check(
+                f"turn {i:02d} load_messages_within_budget",
+                sync_memory.load_messages_within_budget(conversation.id, 200),
+                await async_memory.load_messages_within_budget(conversation.id, 200)
+            )
+
+
+async def test_long_term_memory_parity():
+    """장기 기억 검색/요약 조회가 동기와 같은지 (임베딩 저장, backfill 포함)"""
+    print("\n" + "=" * 60)
+    print("장기 기억 / 요약 결과 비교")
+    print("=" * 60)
+
+    embedder = HashingEmbedder(dim=256)
+    sync_memory, async_memory = _managers(use_cache=False, embed_fn=embedder)
+    # vector_memory 없이 저장한 메시지는 검색 시 backfill
+    plain_memory, _ = _managers(use_cache=False)
+    conversation = await async_memory.get_or_create_conversation("parity-vector")
+
+    facts = ["제 이름은 김철수입니다", "고양이 두 마리를 키워요", "부산에 살고 있어요", "커피는 라떼를 좋아해요"]
+    for i, fact in enumerate(facts * 3):
+        text = f"{fact} ({i})"
+        if i % 3 == 0:
+            sync_memory.save_message(conversation.id, "user", text)
+        elif i % 3 == 1:
+            await async_memory.save_message(conversation.id, "user", text)
+        else:
+            plain_memory.save_message(conversation.id, "user", text)
+        await async_memory.save_message(conversation.id, "assistant", f"알겠습니다 {i}")
+
+    recent_ids = [m["id"] for m in sync_memory.load_messages_within_budget(conversation.id, 40)]
+    for query, exclude in (("내 이름이 뭐였지?", None), ("반려동물", recent_ids), ("어디 살아?", recent_ids)):
+        sync_result = sync_memory.retrieve_relevant_messages(conversation.id, query, k=3, exclude_ids=exclude)
+        async_result = await async_memory.retrieve_relevant_messages(conversation.id, query, k=3, exclude_ids=exclude)
+        _check(f"retrieve_relevant_messages({query!r})", _ranked(sync_result), _ranked(async_result))
+        assert len(sync_result) == 3 and not set(r["id"] for r in sync_result) & set(exclude or ())
+
+    _check(
+        "load_summary (없음)",
+        sync_memory.load_summary(conversation.id),
+        await async_memory.load_summary(conversation.id)
+    )
+    sync_memory.session.add(ConversationSummary(
+        conversation_id=conversation.id, content="사용자는 김철수, 부산 거주", covered_until_id=4, token_count=12
+    ))
+    sync_memory.session.commit()
+    summary = await async_memory.load_summary(conversation.id)
+    _check("load_summary", sync_memory.load_summary(conversation.id), summary)
+    assert summary["covered_until_id"] == 4
+
+
+async def test_event_loop_not_blocked_by_embedding():
+    """느린 임베딩(네트워크 호출 흉내) 중에도 이벤트 루프가 다른 작업을 처리하는지"""
+    print("\n" + "=" * 60)
+    print("장기 기억 임베딩 중 이벤트 루프 블로킹 확인")
+    print("=" * 60)
+
+    embedder = HashingEmbedder(dim=256)
+
+    def slow_embed(texts):
+        time.sleep(0.05)
+        return embedder(texts)
+
+    _, async_memory = _managers(use_cache=False, embed_fn=slow_embed)
+    conversation = await async_memory.get_or_create_conversation("slow-embed")
+    ticks = 0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    for i in range(3):
+        await async_memory.save_message(conversation.id, "user", f"메시지 {i}")
+    results = await async_memory.retrieve_relevant_messages(conversation.id, "메시지", k=2)
+    done.set()
+    await ticker_task
+
+    # 임베딩 4번 x 50ms 동안 ticker가 돌아야 함
+    assert len(results) == 2 and ticks >= 20, (results, ticks)
+    print(f"  ✅ 임베딩 4회(200ms) 동안 ticker {ticks}회 실행")
+
+
+async def test_event_loop_not_blocked():
+    """여러 대화를 동시에 저장/조회하는 동안 이벤트 루프가 다른 작업을 계속 처리하는지"""
+    print("\n" + "=" * 60)
+    print("동시 대화 처리 (이벤트 루프 블로킹 확인)")
+    print("=" * 60)
+
+    _, async_memory = _managers(use_cache=False)
+    ticks = 0
+    done = asyncio.Event()
+
+    async def ticker():
+        # LLM 스트리밍 대신 10ms마다 깨어나는 작업
+        nonlocal ticks
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def chat(n: int):
+        conversation = await async_memory.get_or_create_conversation(f"concurrent-{n}")
+        for i in range(20):
+            await async_memory.load_messages_within_budget(conversation.id, 500)
+            await async_memory.save_message(conversation.id, "user", f"{n}-{i}")
+        return await async_memory.get_conversation_messages_count(conversation.id)
+
+    started = time.perf_counter()
+    ticker_task = asyncio.create_task(ticker())
+    counts = await asyncio.gather(*(chat(n) for n in range(20)))
+    done.set()
+    await ticker_task
+    elapsed = time.perf_counter() - started
+
+    assert counts == [20] * 20, counts
+    print(f"  ✅ 20개 대화 x 20턴 완료: {elapsed:.2f}s, 그동안 ticker {ticks}회 실행")
+
+
+async def main():
+    await test_save_and_load_parity()
+    await test_cache_parity()
+    await test_long_term_memory_parity()
+    await test_event_loop_not_blocked_by_embedding()
+    await test_event_loop_not_blocked()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    print("\n" + "=" * 60)
+    print("✅ 모든 테스트 완료!")
+    print("=" * 60)